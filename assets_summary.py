@@ -1,64 +1,42 @@
-from bs4 import BeautifulSoup
 import csv
 from datetime import datetime
 import os
-def main():
-    # خواندن فایل HTML
-    with open("page.html", "r", encoding="utf-8") as file:
-        html = file.read()
+from price_parser import load_price_table
 
-    soup = BeautifulSoup(html, "html.parser")
-    targets = [" دلار آمریکا", "تمام امامی", "تمام بهار", "نیم بهار", "ربع بهار"]
-    new_prices = {}
+SUMMARY_FILE = "assets_summary.csv"
+ASSETS_FILE = "user_assets.json"
 
-    # استخراج قیمت‌های جدید
-    for target_text in targets:
-        tables = soup.find_all("table")
-        for table in tables:
-            if target_text in table.text:
-                for row in table.find_all("tr"):
-                    if target_text in row.text:
-                        cells = row.find_all("td")
-                        if len(cells) >= 3:
-                            subject = cells[0].text.strip()
-                            buy_price = int(cells[1].text.strip().replace(",", ""))
-                            new_prices[subject] = buy_price
-                            break
 
-    # موجودی تو (قابل تنظیم)
-    Dollar_you = 0
-    Emami_you = 1
-    Azadi_you = 0
-    nim_Azadi_you = 1
-    rob_Azadi_you = 1
+def compute_assets_summary(new_prices: dict, holdings: dict) -> dict:
+    """
+    Value ``holdings`` at the given buy prices (``{subject: price}``).
 
+    A plain sum over a handful of holdings, so this module stays free of
+    numpy/pandas. Cash (``"ریال"``) counts at face value; subjects without a
+    price count as 0.
+    """
     # استخراج قیمت‌ها از دیکشنری
-    Dollar = new_prices.get("دلار آمریکا", 0)
-    Emami = new_prices.get("تمام امامی(86)", new_prices.get("تمام امامی", 0))
-    Azadi = new_prices.get("تمام بهار آزادی", 0)
-    nim_Azadi = new_prices.get("نیم بهار آزادی", 0)
-    rob_Azadi = new_prices.get("ربع بهار آزادی", 0)
+    prices = dict(new_prices)
+    prices.setdefault("تمام امامی(86)", new_prices.get("تمام امامی", 0))
+    prices["ریال"] = 1
+    Dollar = prices.get("دلار آمریکا", 0)
 
     # محاسبه دارایی
-    assets_rial = (
-        (Dollar_you * Dollar) +
-        (Emami_you * Emami) +
-        (Azadi_you * Azadi) +
-        (nim_Azadi_you * nim_Azadi) +
-        (rob_Azadi_you * rob_Azadi)
-    )
+    assets_rial = int(sum(amount * prices.get(subject, 0) for subject, amount in holdings.items()))
     assets_dollar = round(assets_rial / (Dollar + 10000), 2) if Dollar != 0 else 0
 
-    # ذخیره در فایل
-    summary_row = {
+    return {
         "assets_rial": assets_rial,
         "assets_dollar": assets_dollar,
         "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
 
-    file_exists = os.path.exists("assets_summary.csv")
 
-    with open("assets_summary.csv", "a", newline="", encoding="utf-8") as csvfile:
+def append_assets_summary(summary_row: dict, path: str = SUMMARY_FILE) -> None:
+    # ذخیره در فایل
+    file_exists = os.path.exists(path)
+
+    with open(path, "a", newline="", encoding="utf-8") as csvfile:
         fieldnames = ["assets_rial", "assets_dollar", "date"]
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         if not file_exists:
@@ -66,5 +44,20 @@ def main():
         writer.writerow(summary_row)
 
     print("✅ Asset information was saved successfully.")
+
+
+def main(table=None, assets_json: str = ASSETS_FILE, path: str = SUMMARY_FILE):
+    from holdings_ledger import HoldingsLedger
+
+    # خواندن جدول قیمت (یک بار پارس برای هر اسنپ‌شات)
+    if table is None:
+        table = load_price_table("page.html")
+    # موجودی فعلی از دفتر دارایی‌ها (user_assets.json)
+    holdings = HoldingsLedger(assets_json).latest()
+    summary_row = compute_assets_summary(table.buy_prices(), holdings)
+    append_assets_summary(summary_row, path)
+    return summary_row
+
+
 if __name__ == "__main__":
     main()
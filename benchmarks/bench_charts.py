@@ -0,0 +1,42 @@
+"""
+Chart rendering wall time by process-pool size (``charts.render_all(jobs=N)``).
+
+Usage:
+    python -m benchmarks.bench_charts [--records 20000] [--jobs 1 2 4 8]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import charts
+import rollups
+from benchmarks.synthetic import write_summary_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "portfolio_summary.json")
+        write_summary_log(json_path, args.records)
+        rollup = rollups.update_rollups(json_path)
+        print(f"{args.records} records, {os.cpu_count()} cores")
+
+        baseline = None
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                charts.render_all(rollup, os.path.join(tmp, "out"), jobs=jobs)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"jobs={jobs:<3} {elapsed:>7.2f} s   speedup {baseline / elapsed:>4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare the single-pass row index in ``price_parser`` with the previous
+per-target rescan on synthetic pages.
+
+Both the lookup alone (on an already parsed soup) and the full
+``extract_prices_from_html`` call (parse + lookup) are timed.
+
+Usage:
+    python -m benchmarks.bench_extract_prices [--rows 200 500 1000] [--repeat 5]
+"""
+import argparse
+import time
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from extract_prices import extract_prices_from_html
+from price_parser import TARGETS, build_row_index, get_backend
+from benchmarks.synthetic import make_price_page
+
+
+def legacy_scan(soup: BeautifulSoup) -> list:
+    """The original targets × tables × rows scan, kept here as the baseline."""
+    extracted = []
+
+    for target in TARGETS:
+        for table in soup.find_all("table"):
+            if target in table.text:
+                for row in table.find_all("tr"):
+                    if target in row.text:
+                        cells = row.find_all("td")
+                        if len(cells) >= 3:
+                            extracted.append({
+                                "subject": cells[0].text.strip().replace(" ", " ").strip(),
+                                "buy_price": cells[1].text.strip(),
+                                "sell_price": cells[2].text.strip(),
+                                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            })
+                        break
+    return extracted
+
+
+def legacy_extract_prices_from_html(html_content: str) -> list:
+    return legacy_scan(BeautifulSoup(html_content, "html.parser"))
+
+
+def best_of(func, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def strip_dates(records: list) -> list:
+    return [{k: v for k, v in r.items() if k != "date"} for r in records]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[200, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bs4 = get_backend("bs4")
+    print(f"{'rows':>6} {'scan legacy':>12} {'scan index':>11} {'speedup':>8} "
+          f"{'full legacy':>12} {'full index':>11} {'speedup':>8}   (ms)")
+    for n in args.rows:
+        html = make_price_page(n)
+        assert strip_dates(legacy_extract_prices_from_html(html)) == strip_dates(extract_prices_from_html(html))
+        soup = BeautifulSoup(html, "html.parser")
+        scan_legacy = best_of(legacy_scan, soup, args.repeat)
+        scan_index = best_of(lambda doc: build_row_index(doc, bs4), soup, args.repeat)
+        full_legacy = best_of(legacy_extract_prices_from_html, html, args.repeat)
+        full_index = best_of(extract_prices_from_html, html, args.repeat)
+        print(f"{n:>6} {scan_legacy * 1000:>12.1f} {scan_index * 1000:>11.1f} {scan_legacy / scan_index:>7.1f}x "
+              f"{full_legacy * 1000:>12.1f} {full_index * 1000:>11.1f} {full_legacy / full_index:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
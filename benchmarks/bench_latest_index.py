@@ -0,0 +1,57 @@
+"""
+Latest-price lookups at 1M history rows: full CSV scan versus the
+``latest_index`` sidecar, plus the cost of an indexed append and of a
+full rebuild/verify.
+
+Usage:
+    python -m benchmarks.bench_latest_index [--rows 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import generate_pdf_report
+import latest_index
+import portfo
+from extract_prices import save_prices_to_csv
+from benchmarks.synthetic import SUBJECTS, iter_price_records, write_prices_csv
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<44} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "prices_history.csv")
+        write_prices_csv(csv_path, args.rows // len(SUBJECTS))
+
+        scanned = timed("full scan: generate_pdf_report.load_latest_prices",
+                        lambda: generate_pdf_report.load_latest_prices(csv_path))
+        index = timed("rebuild index (one-shot)", lambda: latest_index.build_index(csv_path))
+        latest_index.write_index(csv_path, index)
+        indexed = timed("index: generate_pdf_report.load_latest_prices",
+                        lambda: generate_pdf_report.load_latest_prices(csv_path))
+        timed("index: portfo.load_latest_snapshot", lambda: portfo.load_latest_snapshot(csv_path))
+        assert scanned == indexed
+
+        new_rows = list(iter_price_records(1, start="2099-01-01 00:00:00"))
+        timed("save_prices_to_csv incl. store migration", lambda: save_prices_to_csv(new_rows, csv_path))
+        new_rows = list(iter_price_records(1, start="2099-01-01 00:10:00"))
+        timed("save_prices_to_csv (steady state)", lambda: save_prices_to_csv(new_rows, csv_path))
+        latest_time, _ = timed("index: portfo.load_latest_snapshot after append",
+                               lambda: portfo.load_latest_snapshot(csv_path))
+        assert str(latest_time) == "2099-01-01 00:10:00"
+        timed("verify (rebuild + compare)", lambda: latest_index.main(["verify", "--csv", csv_path]))
+
+
+if __name__ == "__main__":
+    main()
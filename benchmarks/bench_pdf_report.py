@@ -0,0 +1,119 @@
+"""
+PDF size, wall time and peak RSS of ``generate_pdf_report.create_report`` for many charts.
+
+Each configuration runs in its own process so peak RSS is measured in isolation:
+``original`` embeds the 300-dpi PNGs as before, ``downsampled`` resamples them
+to ``report_images.REPORT_IMAGE_DPI`` first (cold cache, then warm cache).
+
+Usage:
+    python -m benchmarks.bench_pdf_report [--charts 240] [--folders 4] [--jobs 1 4]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_charts(out_root: str, n_charts: int, n_folders: int, seed: int = 0) -> None:
+    """Render ``n_charts`` distinct 12x4 in, 300-dpi bar charts (the notebook format) into ``n_folders`` folders."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    rng = random.Random(seed)
+    for i in range(n_charts):
+        folder = os.path.join(out_root, f"folder{i % n_folders}")
+        os.makedirs(folder, exist_ok=True)
+        values = [rng.uniform(-1, 1) * 1e7 for _ in range(30)]
+        fig, ax = plt.subplots(figsize=(12, 4))
+        ax.bar(range(len(values)), values, color=['green' if v >= 0 else 'red' for v in values])
+        ax.set_title(f"Synthetic chart {i}")
+        ax.grid(axis='y')
+        fig.tight_layout()
+        fig.savefig(os.path.join(folder, f"chart_{i:04d}.png"), bbox_inches='tight', dpi=300)
+        plt.close(fig)
+
+
+def peak_rss_kb() -> int:
+    """
+    Peak RSS of this process in KiB. ``VmHWM`` is used where available because
+    Linux carries ``ru_maxrss`` over from the parent across fork/exec.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_worker(args) -> None:
+    """Build one report in this process and print its measurements as JSON."""
+    import generate_pdf_report
+
+    images = generate_pdf_report.collect_images_by_folder(args.images)
+    start = time.perf_counter()
+    generate_pdf_report.create_report(args.output, images, "Benchmark", "today",
+                                      image_dpi=args.dpi or None, jobs=args.worker_jobs)
+    elapsed = time.perf_counter() - start
+    rss = peak_rss_kb()
+    rss_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "pdf_bytes": os.path.getsize(args.output),
+                      "peak_rss_kb": rss, "peak_child_rss_kb": rss_children}))
+
+
+def measure(tmp: str, dpi: int, jobs: int) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.bench_pdf_report", "--worker",
+           "--images", os.path.join(tmp, "charts"), "--output", os.path.join(tmp, "report.pdf"),
+           "--dpi", str(dpi), "--worker-jobs", str(jobs)]
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    out = subprocess.run(cmd, cwd=tmp, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--charts", type=int, default=240)
+    parser.add_argument("--folders", type=int, default=4)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--images", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("--dpi", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-jobs", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        make_charts(os.path.join(tmp, "charts"), args.charts, args.folders)
+        print(f"{args.charts} charts in {args.folders} folders "
+              f"(rendered in {time.perf_counter() - start:.1f} s), {os.cpu_count()} cores")
+
+        from report_images import CACHE_DIR, REPORT_IMAGE_DPI
+        runs = [("original", 0, 1)]
+        for jobs in args.jobs:
+            runs += [(f"downsampled cold jobs={jobs}", REPORT_IMAGE_DPI, jobs),
+                     (f"downsampled warm jobs={jobs}", REPORT_IMAGE_DPI, jobs)]
+        for label, dpi, jobs in runs:
+            if "cold" in label:
+                shutil.rmtree(os.path.join(tmp, CACHE_DIR), ignore_errors=True)
+            r = measure(tmp, dpi, jobs)
+            print(f"{label:<28} {r['seconds']:>7.2f} s  pdf {r['pdf_bytes'] / 1e6:>7.2f} MB  "
+                  f"peak RSS {r['peak_rss_kb'] / 1024:>6.0f} MB (workers {r['peak_child_rss_kb'] / 1024:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
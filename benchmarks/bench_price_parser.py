@@ -0,0 +1,68 @@
+"""
+CPU time and peak memory per snapshot: three separate ``html.parser`` soups
+(the old refactored_get_html / extract_prices / assets_summary flow) versus
+one shared parse per backend through ``price_parser``.
+
+Peak memory is measured with ``tracemalloc`` and therefore only covers
+Python-level allocations; the C trees built by lxml/selectolax are not
+counted, so compare their RSS externally if that matters.
+
+Usage:
+    python -m benchmarks.bench_price_parser [--rows 1000] [--repeat 3]
+"""
+import argparse
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from price_parser import BACKEND_PREFERENCE, get_backend, parse_price_table
+from benchmarks.synthetic import make_price_page
+
+
+def three_soups(html: str) -> None:
+    for _ in range(3):
+        soup = BeautifulSoup(html, "html.parser")
+        soup.find_all("table")
+
+
+def measure(func, repeat: int):
+    cpu = min(_cpu_time(func) for _ in range(repeat))
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak
+
+
+def _cpu_time(func) -> float:
+    start = time.process_time()
+    func()
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    html = make_price_page(args.rows)
+    print(f"page: {args.rows} rows, {len(html) / 1024:.0f} KiB")
+    print(f"{'variant':<28} {'cpu (ms)':>9} {'peak (MiB)':>11}")
+
+    cpu, peak = measure(lambda: three_soups(html), args.repeat)
+    print(f"{'3 × bs4 html.parser':<28} {cpu * 1000:>9.1f} {peak / 2**20:>11.1f}")
+
+    for name in BACKEND_PREFERENCE:
+        try:
+            backend = get_backend(name)
+        except ImportError:
+            print(f"{'1 × ' + name:<28} {'not installed':>21}")
+            continue
+        cpu, peak = measure(lambda: parse_price_table(html, backend=backend), args.repeat)
+        print(f"{'1 × ' + name:<28} {cpu * 1000:>9.1f} {peak / 2**20:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Latest-price lookups on a large history: full ``prices_history.csv`` scans
+(the old ``portfo`` / ``generate_pdf_report`` paths) versus the columnar
+``price_store``.
+
+Usage:
+    python -m benchmarks.bench_price_store [--rows 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import generate_pdf_report
+import portfo
+from price_store import PriceStore, migrate_csv, store_path_for
+from benchmarks.synthetic import SUBJECTS, write_prices_csv
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<42} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "prices_history.csv")
+        write_prices_csv(csv_path, args.rows // len(SUBJECTS))
+
+        csv_latest = timed("CSV: portfo.load_latest_snapshot", lambda: portfo.load_latest_snapshot(csv_path))
+        timed("CSV: generate_pdf_report.load_latest_prices",
+              lambda: generate_pdf_report.load_latest_prices(csv_path))
+
+        timed("migrate CSV → store (one-shot)", lambda: migrate_csv(csv_path))
+        store_latest = timed("store: portfo.load_latest_snapshot", lambda: portfo.load_latest_snapshot(csv_path))
+        timed("store: generate_pdf_report.load_latest_prices",
+              lambda: generate_pdf_report.load_latest_prices(csv_path))
+        timed("store: open + len()", lambda: len(PriceStore(store_path_for(csv_path))))
+
+        assert csv_latest[0] == store_latest[0] and csv_latest[1] == store_latest[1]
+        print(f"CSV size:   {os.path.getsize(csv_path) / 2**20:>8.1f} MiB")
+        print(f"store size: {dir_size(store_path_for(csv_path)) / 2**20:>8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
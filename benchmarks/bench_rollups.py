@@ -0,0 +1,92 @@
+"""
+Chart aggregations on 10 years of intraday snapshots: the notebooks'
+per-cell ``sort_values`` + ``groupby(...).tail(1)`` versus the persisted
+``rollups`` (full build, incremental update and chart reads).
+
+Usage:
+    python -m benchmarks.bench_rollups [--years 10] [--step-minutes 15]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import chart_specs
+import rollups
+import summary_log
+from benchmarks.synthetic import iter_summary_records, write_summary_log
+
+
+def notebook_aggregations(json_path: str) -> dict:
+    """What the three notebooks compute, cell by cell, from the raw records."""
+    out = {}
+    df = pd.DataFrame(summary_log.read_records(json_path))
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    for spec in chart_specs.CHART_SPECS:
+        col = spec.column
+        df['year'] = df['datetime'].dt.year
+        df['month'] = df['datetime'].dt.to_period('M')
+        df['day'] = df['datetime'].dt.to_period('D')
+        df_sorted = df.sort_values('datetime')
+        if spec.kind in ("year", "month"):
+            s = df_sorted.groupby(spec.kind).tail(1).set_index(spec.kind)[col]
+        elif spec.kind == "day":
+            monthly = df[df['month'] == df['month'].max()].sort_values('datetime')
+            s = monthly.groupby('day').tail(1).set_index('day')[col]
+        elif spec.kind == "monthly_pl":
+            s = df_sorted.groupby('month').tail(1).set_index('month')[col].diff().dropna()
+        else:
+            recent = df_sorted[df_sorted['datetime'] >= df_sorted['datetime'].max() - pd.Timedelta(days=30)]
+            s = recent.groupby('day').tail(1).set_index('day')[col].diff().dropna()
+        out[spec] = s
+    return out
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--step-minutes", type=int, default=15)
+    args = parser.parse_args()
+    n = args.years * 365 * 24 * 60 // args.step_minutes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "portfolio_summary.json")
+        write_summary_log(json_path, n, step_seconds=args.step_minutes * 60)
+        print(f"{n:,} records")
+
+        expected = timed("notebook-style aggregations", lambda: notebook_aggregations(json_path))
+        timed("rollup full build", lambda: rollups.update_rollups(json_path))
+
+        extra = list(iter_summary_records(1, start="2099-01-01 00:00:00", seed=1))
+        with open(summary_log.log_path_for(json_path), "a", encoding="utf-8") as f:
+            f.write(json.dumps(extra[0]) + "\n")
+        timed("rollup incremental update (1 record)", lambda: rollups.update_rollups(json_path))
+
+        rollup = timed("rollup load (no new records)", lambda: rollups.update_rollups(json_path))
+        got = timed("chart series from rollup", lambda: {s: chart_specs.aggregate(rollup, s) for s in chart_specs.CHART_SPECS})
+        print(f"rollup file: {os.path.getsize(rollups.rollup_path_for(json_path)) / 1024:.0f} KiB")
+
+        # Without the far-future record the rollup must reproduce the notebooks exactly.
+        os.remove(rollups.rollup_path_for(json_path))
+        with open(summary_log.log_path_for(json_path), "rb+") as f:
+            f.seek(-len(json.dumps(extra[0])) - 1, os.SEEK_END)
+            f.truncate()
+        rollup = rollups.update_rollups(json_path)
+        for spec, series in expected.items():
+            pd.testing.assert_series_equal(chart_specs.aggregate(rollup, spec), series.astype("float64"),
+                                           check_names=False, check_index_type=False)
+        print("rollup series match the notebook aggregations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Startup cost of the entry points, from ``python -X importtime`` and wall clock.
+
+For each module the cumulative import time of the module itself is taken
+from ``-X importtime`` (median over ``--repeat`` fresh interpreters);
+``cli.py status`` is also timed end to end against a small synthetic data
+directory. ``python -c pass`` is the interpreter baseline.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 7]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import iter_price_records, write_summary_log
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["cli", "latest_index", "summary_log", "portfo", "extract_prices", "pipeline",
+           "generate_pdf_report", "charts", "pandas", "reportlab.pdfgen.canvas"]
+
+
+def import_time_ms(module: str, cwd: str) -> float:
+    """Cumulative import time of ``module`` in a fresh interpreter, in ms."""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=cwd, env=env, capture_output=True, text=True, check=True).stderr
+    for line in reversed(err.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    return 0.0
+
+
+def wall_ms(cmd, cwd: str) -> float:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    start = time.perf_counter()
+    subprocess.run(cmd, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        import extract_prices
+        import logging
+        logging.disable(logging.INFO)
+        extract_prices.save_prices_to_csv(list(iter_price_records(100)), os.path.join(tmp, "prices_history.csv"))
+        write_summary_log(os.path.join(tmp, "portfolio_summary.json"), 1000)
+
+        print(f"{'module':<26} {'import (ms)':>12}")
+        for module in MODULES:
+            times = [import_time_ms(module, tmp) for _ in range(args.repeat)]
+            print(f"{module:<26} {statistics.median(times):>12.1f}")
+
+        print()
+        for label, cmd in (("python -c pass", [sys.executable, "-c", "pass"]),
+                           ("cli.py status", [sys.executable, os.path.join(REPO_ROOT, "cli.py"), "status"])):
+            times = [wall_ms(cmd, tmp) for _ in range(args.repeat)]
+            print(f"{label:<26} {statistics.median(times):>9.1f} ms wall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Peak memory of the history readers: whole-file loads (as before) versus the
+streaming readers, on minute-level synthetic history.
+
+Each reader runs in its own process so peak RSS is measured in isolation:
+
+* ``rollups``: building the year/month/day rollup from the summary log
+  (``pd.DataFrame`` of every record vs ``summary_log.iter_log_chunks``);
+* ``latest``: latest prices from ``prices_history.csv`` with no sidecar index
+  (``pd.read_csv`` of the whole file vs ``latest_index.build_index``);
+* ``compact``: refreshing ``portfolio_summary.json`` (list in memory vs streamed).
+
+Usage:
+    python -m benchmarks.bench_streaming [--days 365] [--step-minutes 1]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_pdf_report import REPO_ROOT, peak_rss_kb
+from benchmarks.synthetic import write_prices_csv, write_summary_log
+
+
+def rollups_whole(tmp):
+    import rollups
+    import summary_log
+    records = summary_log.read_records(os.path.join(tmp, "portfolio_summary.json"))
+    r = rollups.Rollups()
+    r.fold(rollups._frame(records))
+    return len(r.levels["day"])
+
+
+def rollups_streaming(tmp):
+    import rollups
+    return len(rollups.update_rollups(os.path.join(tmp, "portfolio_summary.json")).levels["day"])
+
+
+def latest_whole(tmp):
+    import pandas as pd
+    df = pd.read_csv(os.path.join(tmp, "prices_history.csv"))
+    df["sell_price"] = df["sell_price"].astype(str).str.replace(",", "", regex=False).astype(float)
+    df["date"] = pd.to_datetime(df["date"])
+    return int((df["date"] == df["date"].max()).sum())
+
+
+def latest_streaming(tmp):
+    import latest_index
+    return len(latest_index.latest_snapshot(latest_index.build_index(os.path.join(tmp, "prices_history.csv")))[1])
+
+
+def compact_whole(tmp):
+    import summary_log
+    json_path = os.path.join(tmp, "portfolio_summary.json")
+    records = summary_log.read_records(json_path)
+    summary_log._write_atomic(json_path, json.dumps(records, ensure_ascii=False, indent=2))
+    return len(records)
+
+
+def compact_streaming(tmp):
+    import summary_log
+    return summary_log.compact(os.path.join(tmp, "portfolio_summary.json"))
+
+
+READERS = {
+    "rollups": (rollups_whole, rollups_streaming),
+    "latest": (latest_whole, latest_streaming),
+    "compact": (compact_whole, compact_streaming),
+}
+
+
+def run_worker(args) -> None:
+    whole, streaming = READERS[args.reader]
+    func = streaming if args.streaming else whole
+    import pandas  # noqa: F401 -- imported up front so both variants pay the same baseline
+    baseline = peak_rss_kb()
+    start = time.perf_counter()
+    result = func(args.dir)
+    print(json.dumps({"seconds": time.perf_counter() - start, "peak_rss_kb": peak_rss_kb(),
+                      "baseline_kb": baseline, "result": result}))
+
+
+def measure(tmp: str, reader: str, streaming: bool) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.bench_streaming", "--worker", "--dir", tmp, "--reader", reader]
+    if streaming:
+        cmd.append("--streaming")
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    out = subprocess.run(cmd, cwd=tmp, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--step-minutes", type=int, default=1)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    parser.add_argument("--reader", choices=list(READERS), help=argparse.SUPPRESS)
+    parser.add_argument("--streaming", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args)
+        return
+
+    n = args.days * 24 * 60 // args.step_minutes
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        write_summary_log(os.path.join(tmp, "portfolio_summary.json"), n, step_seconds=args.step_minutes * 60)
+        write_prices_csv(os.path.join(tmp, "prices_history.csv"), n, step_seconds=args.step_minutes * 60)
+        sizes = {name: os.path.getsize(os.path.join(tmp, name)) / 1e6
+                 for name in ("portfolio_summary.jsonl", "prices_history.csv")}
+        print(f"{n:,} snapshots: log {sizes['portfolio_summary.jsonl']:.0f} MB, "
+              f"CSV {sizes['prices_history.csv']:.0f} MB (written in {time.perf_counter() - start:.1f} s)")
+
+        for reader in READERS:
+            for streaming in (False, True):
+                r = measure(tmp, reader, streaming)
+                label = f"{reader} {'streaming' if streaming else 'whole file'}"
+                print(f"{label:<22} {r['seconds']:>7.2f} s  peak RSS {r['peak_rss_kb'] / 1024:>6.0f} MB "
+                      f"(+{(r['peak_rss_kb'] - r['baseline_kb']) / 1024:.0f} MB over imports)")
+
+
+if __name__ == "__main__":
+    main()
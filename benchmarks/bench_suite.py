@@ -0,0 +1,239 @@
+"""
+End-to-end benchmark of every pipeline stage on synthetic data, fully offline.
+
+Inputs are generated once per run at the chosen scale: a sarafiyaran-style
+``page.html`` with ``--rows`` price rows, ``prices_history.csv`` with
+``--snapshots`` snapshots and a ``portfolio_summary`` log with ``--records``
+records. Every stage then runs in its own process (so peak RSS is its own)
+and wall time and peak memory are written to a JSON results file that can
+be compared between commits:
+
+    python -m benchmarks.bench_suite --scale medium --output before.json
+    git checkout <other commit>
+    python -m benchmarks.bench_suite --scale medium --output after.json --compare before.json
+    python -m benchmarks.bench_suite --compare before.json after.json   # compare only
+
+Stages: extract_prices_from_html, load_latest_prices (without and with the
+sidecar index), portfo.main, the notebook aggregations (rollup build plus the
+chart series), chart rendering, create_report and create_vector_report.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_pdf_report import REPO_ROOT, peak_rss_kb
+from benchmarks.synthetic import SUBJECTS, make_price_page, write_prices_csv, write_summary_log
+
+SCALES = {
+    "small": {"rows": 200, "snapshots": 2_000, "records": 2_000},
+    "medium": {"rows": 500, "snapshots": 50_000, "records": 50_000},
+    "large": {"rows": 2_000, "snapshots": 500_000, "records": 500_000},
+}
+
+
+# ---- stages ------------------------------------------------------------------
+# Each stage prepares its inputs in ``tmp`` (untimed) and returns the call to time.
+
+def stage_extract_prices(tmp):
+    from extract_prices import extract_prices_from_html
+    with open(os.path.join(tmp, "page.html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    return lambda: extract_prices_from_html(html)
+
+
+def stage_load_latest_prices_cold(tmp):
+    import generate_pdf_report
+    import latest_index
+    csv_path = os.path.join(tmp, "prices_history.csv")
+    if os.path.exists(latest_index.index_path_for(csv_path)):
+        os.remove(latest_index.index_path_for(csv_path))
+    return lambda: generate_pdf_report.load_latest_prices(csv_path)
+
+
+def stage_load_latest_prices(tmp):
+    import generate_pdf_report
+    import latest_index
+    csv_path = os.path.join(tmp, "prices_history.csv")
+    latest_index.load_index(csv_path)
+    return lambda: generate_pdf_report.load_latest_prices(csv_path)
+
+
+def stage_portfo(tmp):
+    import latest_index
+    import portfo
+    csv_path = os.path.join(tmp, "prices_history.csv")
+    latest_index.load_index(csv_path)
+    return lambda: portfo.main(csv_path, os.path.join(tmp, "user_assets.json"),
+                               os.path.join(tmp, "portfolio_summary.json"))
+
+
+def stage_notebook_aggregations(tmp):
+    import chart_specs
+    import rollups
+    json_path = os.path.join(tmp, "portfolio_summary.json")
+    if os.path.exists(rollups.rollup_path_for(json_path)):
+        os.remove(rollups.rollup_path_for(json_path))
+
+    def run():
+        rollup = rollups.update_rollups(json_path)
+        return {spec: chart_specs.aggregate(rollup, spec) for spec in chart_specs.CHART_SPECS}
+    return run
+
+
+def stage_render_charts(tmp):
+    import charts
+    import rollups
+    out_root = os.path.join(tmp, "charts")
+    shutil.rmtree(out_root, ignore_errors=True)
+    rollup = rollups.update_rollups(os.path.join(tmp, "portfolio_summary.json"))
+    return lambda: charts.render_all(rollup, out_root)
+
+
+def stage_create_report(tmp):
+    import charts
+    import generate_pdf_report
+    import report_images
+    import rollups
+    out_root = os.path.join(tmp, "charts")
+    if not os.path.isdir(out_root):
+        charts.render_all(rollups.update_rollups(os.path.join(tmp, "portfolio_summary.json")), out_root)
+    shutil.rmtree(os.path.join(tmp, report_images.CACHE_DIR), ignore_errors=True)
+    images = generate_pdf_report.collect_images_by_folder(out_root)
+    return lambda: generate_pdf_report.create_report(os.path.join(tmp, "report.pdf"), images, "Benchmark", "today")
+
+
+def stage_create_vector_report(tmp):
+    import generate_pdf_report
+    import rollups
+    rollup = rollups.update_rollups(os.path.join(tmp, "portfolio_summary.json"))
+    return lambda: generate_pdf_report.create_vector_report(os.path.join(tmp, "vector.pdf"), rollup,
+                                                            "Benchmark", "today")
+
+
+STAGES = {
+    "extract_prices_from_html": stage_extract_prices,
+    "load_latest_prices_no_index": stage_load_latest_prices_cold,
+    "load_latest_prices": stage_load_latest_prices,
+    "portfo_main": stage_portfo,
+    "notebook_aggregations": stage_notebook_aggregations,
+    "render_charts": stage_render_charts,
+    "create_report": stage_create_report,
+    "create_vector_report": stage_create_vector_report,
+}
+
+
+# ---- harness -----------------------------------------------------------------
+
+def make_inputs(tmp: str, rows: int, snapshots: int, records: int) -> None:
+    with open(os.path.join(tmp, "page.html"), "w", encoding="utf-8") as f:
+        f.write(make_price_page(n_rows=rows))
+    write_prices_csv(os.path.join(tmp, "prices_history.csv"), snapshots)
+    write_summary_log(os.path.join(tmp, "portfolio_summary.json"), records)
+    with open(os.path.join(tmp, "user_assets.json"), "w", encoding="utf-8") as f:
+        json.dump({**{name: 1 for name in SUBJECTS}, "ریال": 1_000_000}, f, ensure_ascii=False)
+
+
+def run_worker(args) -> None:
+    """Run one stage in this process and print its measurements as JSON."""
+    os.chdir(args.dir)  # stages that write next to their inputs stay inside the temp dir
+    call = STAGES[args.stage](args.dir)
+    baseline = peak_rss_kb()
+    start = time.perf_counter()
+    call()
+    seconds = time.perf_counter() - start
+    print(json.dumps({"seconds": seconds, "peak_rss_kb": peak_rss_kb(), "setup_rss_kb": baseline}))
+
+
+def measure(tmp: str, stage: str) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.bench_suite", "--worker", stage, "--dir", tmp]
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, MPLBACKEND="Agg")
+    proc = subprocess.run(cmd, cwd=tmp, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> dict:
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+        except OSError:
+            return ""
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+
+def compare(base: dict, new: dict) -> None:
+    print(f"\n{'stage':<30} {'time (s)':<27} peak RSS (MB)")
+    for stage, r in new["stages"].items():
+        b = base["stages"].get(stage)
+        if not b or "error" in b or "error" in r:
+            print(f"{stage:<30} {'(not comparable)':>21}")
+            continue
+        ratio = r["seconds"] / b["seconds"] if b["seconds"] else float("inf")
+        flag = " ⚠️" if ratio > 1.2 else ""
+        print(f"{stage:<30} {b['seconds']:>7.3f} → {r['seconds']:>7.3f} ({ratio:>4.2f}x)  "
+              f"{b['peak_rss_kb'] / 1024:>6.0f} → {r['peak_rss_kb'] / 1024:>6.0f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--rows", type=int, help="price rows in page.html (overrides --scale)")
+    parser.add_argument("--snapshots", type=int, help="snapshots in prices_history.csv (overrides --scale)")
+    parser.add_argument("--records", type=int, help="portfolio summary records (overrides --scale)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the fastest is kept")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS",
+                        help="baseline results to compare with; with two files, only compare them")
+    parser.add_argument("--worker", choices=list(STAGES), dest="stage", help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.stage:
+        run_worker(args)
+        return
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0], encoding="utf-8") as f, open(args.compare[1], encoding="utf-8") as g:
+            compare(json.load(f), json.load(g))
+        return
+
+    sizes = {key: getattr(args, key) or value for key, value in SCALES[args.scale].items()}
+    results = {"created": datetime.now().isoformat(timespec="seconds"), **git_commit(),
+               "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+               "scale": args.scale, "sizes": sizes, "stages": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        make_inputs(tmp, **sizes)
+        print(f"Inputs {sizes} generated in {time.perf_counter() - start:.1f} s")
+        for stage in args.stages:
+            runs = [measure(tmp, stage) for _ in range(max(1, args.repeat))]
+            ok = [r for r in runs if "error" not in r]
+            r = min(ok, key=lambda r: r["seconds"]) if ok else runs[0]
+            results["stages"][stage] = r
+            if "error" in r:
+                print(f"❌ {stage:<30} {r['error']}")
+            else:
+                print(f"{stage:<32} {r['seconds']:>8.3f} s  peak RSS {r['peak_rss_kb'] / 1024:>6.0f} MB "
+                      f"(+{(r['peak_rss_kb'] - r['setup_rss_kb']) / 1024:.0f} MB in the stage)")
+
+    tmp_path = args.output + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp_path, args.output)
+    print(f"✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
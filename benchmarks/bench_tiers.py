@@ -0,0 +1,94 @@
+"""
+Range queries on the price history: raw rows versus the OHLC tiers.
+
+Minute-level synthetic history is written, migrated to the columnar store
+and indexed. Each query range is then read from the raw store
+(``price_tiers.load_raw``), the history is compacted (``price_tiers.compact``
+with the default retention) and the same ranges are read through
+``price_tiers.load_bars``, which returns raw rows where they are still kept
+and the finest bars left before that. Ranges longer than the raw days kept
+can only be answered from the tiers after compaction; per row, the tiers
+are slower to read than the raw store and only pay off in storage, which
+is reported before and after compaction.
+
+Usage:
+    python -m benchmarks.bench_tiers [--days 90] [--step-minutes 1] [--repeat 3]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import latest_index
+import price_store
+import price_tiers
+from benchmarks.synthetic import write_prices_csv
+
+RANGES = [("1 hour", timedelta(hours=1)), ("1 day", timedelta(days=1)), ("7 days", timedelta(days=7)),
+          ("30 days", timedelta(days=30)), ("all", None)]
+
+
+def dir_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def storage_bytes(csv_path: str) -> dict:
+    return {"csv": os.path.getsize(csv_path),
+            "store": dir_bytes(price_store.store_path_for(csv_path)),
+            "tiers": dir_bytes(price_tiers.tiers_path_for(csv_path))}
+
+
+def best_of(repeat: int, func):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--step-minutes", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    n = args.days * 24 * 60 // args.step_minutes
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "prices_history.csv")
+        write_prices_csv(csv_path, n, step_seconds=args.step_minutes * 60)
+        price_store.migrate_csv(csv_path)
+        latest_index.write_index(csv_path, latest_index.build_index(csv_path))
+        last = datetime.strptime(latest_index.load_index(csv_path)["latest_date"], price_store.DATE_FORMAT)
+        ranges = [(label, None if span is None else last - span) for label, span in RANGES]
+
+        before = storage_bytes(csv_path)
+        raw = {label: best_of(args.repeat, lambda: len(price_tiers.load_raw(csv_path, start, last)))
+               for label, start in ranges}
+
+        start_time = time.perf_counter()
+        price_tiers.compact(csv_path, now=last)
+        compact_seconds = time.perf_counter() - start_time
+        after = storage_bytes(csv_path)
+
+        print(f"{n:,} snapshots over {args.days} days; compaction took {compact_seconds:.2f} s")
+        print(f"storage before: {sum(before.values()) / 1e6:>7.1f} MB "
+              f"(CSV {before['csv'] / 1e6:.1f}, store {before['store'] / 1e6:.1f})")
+        print(f"storage after:  {sum(after.values()) / 1e6:>7.1f} MB "
+              f"(CSV {after['csv'] / 1e6:.1f}, store {after['store'] / 1e6:.1f}, tiers {after['tiers'] / 1e6:.1f})")
+        print(f"{'range':<9} {'raw':>9} {'rows':>9}   {'compacted':>9} {'rows':>9}  tier")
+        for label, start in ranges:
+            seconds, (tier, bars) = best_of(args.repeat, lambda: price_tiers.load_bars(csv_path, start, last))
+            print(f"{label:<9} {raw[label][0] * 1000:>7.1f}ms {raw[label][1]:>9,}   "
+                  f"{seconds * 1000:>7.1f}ms {len(bars):>9,}  {tier}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Vectorized revaluation of many portfolios against the full price history.
+
+Each synthetic portfolio changes its holdings ``--changes`` times; every
+portfolio is valued at every snapshot (``valuation.revalue``). The loop
+baseline values one portfolio per snapshot with ``portfo.build_summary``,
+the per-run path, on a sample of snapshots and is extrapolated.
+
+Usage:
+    python -m benchmarks.bench_valuation [--snapshots 20000] [--portfolios 500] [--changes 5]
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import portfo
+import valuation
+from benchmarks.synthetic import SUBJECTS, write_prices_csv
+
+
+def make_holdings(times, n_portfolios: int, n_changes: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    rows = []
+    for p in range(n_portfolios):
+        for _ in range(n_changes):
+            effective = times[rng.randrange(len(times))]
+            for subject in SUBJECTS:
+                rows.append((f"client{p}", subject, rng.randint(0, 5), effective))
+            rows.append((f"client{p}", valuation.CASH, rng.randint(0, 500) * 1_000_000, effective))
+    return pd.DataFrame(rows, columns=valuation.HOLDINGS_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshots", type=int, default=20_000)
+    parser.add_argument("--portfolios", type=int, default=500)
+    parser.add_argument("--changes", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "prices_history.csv")
+        write_prices_csv(csv_path, args.snapshots)
+
+        start = time.perf_counter()
+        prices = valuation.price_matrix(valuation.load_price_history(csv_path))
+        load_s = time.perf_counter() - start
+        holdings = make_holdings(prices.times, args.portfolios, args.changes)
+
+        start = time.perf_counter()
+        result = valuation.revalue(holdings, prices)
+        vec_s = time.perf_counter() - start
+
+        sample = 200
+        assets = {subject: 1 for subject in SUBJECTS}
+        start = time.perf_counter()
+        for i in range(sample):
+            row = dict(zip(prices.subjects, prices.values[i]))
+            portfo.build_summary(assets, datetime(2020, 1, 1), row)
+        loop_s = (time.perf_counter() - start) / sample * len(result)
+
+        print(f"{args.snapshots:,} snapshots x {args.portfolios} portfolios ({args.changes} changes each)")
+        print(f"load + pivot prices   {load_s:>8.2f} s")
+        print(f"vectorized revalue    {vec_s:>8.2f} s   {len(result):,} valuations")
+        print(f"per-snapshot loop     {loop_s:>8.2f} s   (extrapolated from {sample} calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Report generation time and PDF size: PNG charts vs. vector charts.
+
+``png`` renders every chart with Matplotlib at 300 dpi and embeds the images
+(``charts.render_all`` + ``generate_pdf_report.create_report``); ``vector``
+draws the same charts from the rollup with ReportLab graphics
+(``generate_pdf_report.create_vector_report``).
+
+Usage:
+    python -m benchmarks.bench_vector_report [--records 20000] [--repeat 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import charts
+import generate_pdf_report
+import rollups
+from benchmarks.synthetic import write_summary_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "portfolio_summary.json")
+        write_summary_log(json_path, args.records)
+        rollup = rollups.update_rollups(json_path)
+        out_root = os.path.join(tmp, "executed_notebooks")
+        cwd = os.getcwd()
+        os.chdir(tmp)  # the title page and image cache use paths relative to the working directory
+        try:
+            def png():
+                shutil.rmtree(out_root, ignore_errors=True)
+                shutil.rmtree(os.path.join(tmp, ".report_images"), ignore_errors=True)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    charts.render_all(rollup, out_root)
+                    generate_pdf_report.create_report("png.pdf", generate_pdf_report.collect_images_by_folder(out_root),
+                                                      "Benchmark", "today")
+                return "png.pdf"
+
+            def vector():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    generate_pdf_report.create_vector_report("vector.pdf", rollup, "Benchmark", "today")
+                return "vector.pdf"
+
+            print(f"{args.records} records, best of {args.repeat}")
+            for label, build in (("png", png), ("vector", vector)):
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    path = build()
+                    best = min(best, time.perf_counter() - start)
+                print(f"{label:<8} {best:>7.2f} s   pdf {os.path.getsize(path) / 1024:>8.1f} KiB")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Synthetic input generators used by the benchmarks.
+
+Everything here is generated offline and deterministically from a seed.
+"""
+import random
+
+SUBJECTS = ["دلار آمریکا", "تمام امامی(86)", "تمام بهار آزادی", "نیم بهار آزادی", "ربع بهار آزادی"]
+
+
+def make_price_page(n_rows: int = 500, n_tables: int = 5, seed: int = 0) -> str:
+    """
+    Build a sarafiyaran-style page with ``n_rows`` price rows spread over ``n_tables`` tables.
+
+    The real subjects are placed near the end of the last tables so that a
+    naive scan has to walk most of the document before finding them.
+    """
+    rng = random.Random(seed)
+    filler = [f"ارز نمونه {i}" for i in range(n_rows)]
+    per_table = max(1, n_rows // n_tables)
+    parts = ["<html><head><title>sarafiyaran</title></head><body>"]
+
+    for t in range(n_tables):
+        parts.append('<table class="price-table"><tr><th>نام</th><th>خرید</th><th>فروش</th></tr>')
+        for name in filler[t * per_table:(t + 1) * per_table]:
+            buy = rng.randint(10_000, 90_000_000)
+            parts.append(f"<tr><td>{name}</td><td>{buy:,}</td><td>{buy + 500:,}</td></tr>")
+        if t >= n_tables - 2:
+            for name in SUBJECTS:
+                buy = rng.randint(50_000, 90_000_000)
+                parts.append(f"<tr><td> {name}</td><td>{buy:,}</td><td>{buy + 1_000:,}</td></tr>")
+        parts.append("</table>")
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def iter_price_records(n_snapshots: int, start: str = "2020-01-01 09:00:00", step_seconds: int = 600, seed: int = 0):
+    """
+    Yield ``prices_history.csv`` records for ``n_snapshots`` snapshots of all subjects.
+
+    Prices follow a small random walk and are formatted with thousands
+    separators like the scraped values.
+    """
+    from datetime import datetime, timedelta
+    rng = random.Random(seed)
+    now = datetime.strptime(start, "%Y-%m-%d %H:%M:%S")
+    step = timedelta(seconds=step_seconds)
+    prices = {name: rng.randint(50_000, 90_000_000) for name in SUBJECTS}
+    for _ in range(n_snapshots):
+        date = now.strftime("%Y-%m-%d %H:%M:%S")
+        for name in SUBJECTS:
+            prices[name] = max(1_000, prices[name] + rng.randint(-prices[name] // 200, prices[name] // 200))
+            yield {"subject": name, "buy_price": f"{prices[name]:,}", "sell_price": f"{prices[name] + 1_000:,}",
+                   "date": date}
+        now += step
+
+
+def write_prices_csv(path: str, n_snapshots: int, **kwargs) -> None:
+    """Write a synthetic ``prices_history.csv`` with ``n_snapshots × len(SUBJECTS)`` rows."""
+    import csv
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["subject", "buy_price", "sell_price", "date"])
+        writer.writeheader()
+        writer.writerows(iter_price_records(n_snapshots, **kwargs))
+
+
+def iter_summary_records(n_records: int, start: str = "2020-01-01 09:00:00", step_seconds: int = 3600 * 6,
+                         seed: int = 0):
+    """Yield ``portfolio_summary`` records (datetime, total_toman, total_dollar, cash_toman)."""
+    from datetime import datetime, timedelta
+    rng = random.Random(seed)
+    now = datetime.strptime(start, "%Y-%m-%d %H:%M:%S")
+    step = timedelta(seconds=step_seconds)
+    total, cash = 500_000_000, 100_000_000
+    for _ in range(n_records):
+        total = max(0, total + rng.randint(-5_000_000, 5_200_000))
+        cash = max(0, cash + rng.randint(-1_000_000, 1_000_000))
+        yield {"datetime": now.strftime("%Y-%m-%d %H:%M:%S"), "total_toman": total,
+               "total_dollar": round(total / 600_000, 2), "cash_toman": cash}
+        now += step
+
+
+def write_summary_log(json_path: str, n_records: int, **kwargs) -> None:
+    """Write a synthetic ``portfolio_summary.jsonl`` log (and no JSON list) for ``json_path``."""
+    import json
+    import summary_log
+    with open(summary_log.log_path_for(json_path), "w", encoding="utf-8") as f:
+        for record in iter_summary_records(n_records, **kwargs):
+            f.write(json.dumps(record) + "\n")
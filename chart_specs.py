@@ -0,0 +1,117 @@
+"""
+The charts the notebooks draw, as data: one ``ChartSpec`` per chart and the
+series each one plots, read from the year/month/day rollup.
+
+Kept free of Matplotlib so the vector (ReportLab) renderer and the
+benchmarks can use the specs without importing it; ``charts.py`` draws them
+as PNGs.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from rollups import Rollups
+
+
+def millions_1f(x, pos):
+    return f'{x * 1e-6:.1f} million'
+
+
+def millions_int(x, pos):
+    return f'{int(x/1e6)}M'
+
+
+FORMATTERS = {"millions_1f": millions_1f, "millions_int": millions_int}
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """
+    One chart from the notebooks.
+
+    ``kind`` is one of ``year``, ``month``, ``day`` (days of the latest month),
+    ``monthly_pl`` or ``daily_pl`` (last 30 days). ``title`` and ``filename``
+    may contain ``{month}``, replaced by the latest month.
+    """
+    category: str
+    kind: str
+    column: str
+    title: str
+    ylabel: str
+    xlabel: str
+    filename: str
+    color: Optional[str] = None  # None → green/red by sign
+    figsize: Tuple[float, float] = (12, 4)
+    formatter: Optional[str] = None
+    zero_line: bool = False
+    rotate_xticks: bool = False
+
+
+# Same charts, titles, colours and file names as the three notebooks.
+CHART_SPECS: List[ChartSpec] = [
+    # Display profit and loss_toman.ipynb
+    ChartSpec("toman", "year", "total_toman", "Amount of assets per year(toman)", "Amount of assets", "year",
+              "Amount of assets per year(toman).png", "tomato", formatter="millions_1f"),
+    ChartSpec("toman", "month", "total_toman", "Amount of assets per month (toman)", "assets per month", "month",
+              "Amount of assets per month (toman).png", "slateblue", formatter="millions_1f"),
+    ChartSpec("toman", "day", "total_toman", "Amount of assets per day(month {month})", "assets per day", "day",
+              "Amount of assets per day(toman).png", "seagreen", formatter="millions_1f"),
+    ChartSpec("toman", "monthly_pl", "total_toman", "Monthly net profit/loss(toman) ", "Change from previous month",
+              "month", "monthly_profit_loss.png", formatter="millions_int", zero_line=True),
+    ChartSpec("toman", "daily_pl", "total_toman", "Daily net profit/loss (toman)", "Change from the previous day",
+              "day", "daily_profit_loss.png", figsize=(14, 5), formatter="millions_int", zero_line=True,
+              rotate_xticks=True),
+    # Display profit and loss_dollar.ipynb
+    ChartSpec("dollar", "year", "total_dollar", "Amount of assets per year(dollar)", "assets per year", "year",
+              "Amount of assets per year(dollar).png", "tomato", figsize=(10, 4)),
+    ChartSpec("dollar", "month", "total_dollar", "Amount of assets per month (dollar)", "assets per month", "month",
+              "Amount of assets per month (dollar).png", "slateblue"),
+    ChartSpec("dollar", "day", "total_dollar", "Amount of assets per day(month  {month})(dollar)", "total_dollar",
+              "day", "The latest total_dollar value per day (month{month}).png", "seagreen"),
+    ChartSpec("dollar", "monthly_pl", "total_dollar", "Monthly net profit/loss(dollar)", "Change from previous month",
+              "month", "monthly_profit_loss.png", zero_line=True),
+    ChartSpec("dollar", "daily_pl", "total_dollar", "Daily net profit/loss (dollar)", "Change from the previous day",
+              "day", "daily_profit_loss.png", figsize=(14, 5), zero_line=True, rotate_xticks=True),
+    # cash.ipynb
+    ChartSpec("cash", "year", "cash_toman", "Amount of cash per year(toman)", "Amount of cash", "year",
+              "Amount of cash per year(toman).png", "tomato", formatter="millions_1f"),
+    ChartSpec("cash", "month", "cash_toman", "Amount of cash per month(toman)", "Amount of cash", "month",
+              "Amount of cash per month(toman).png", "slateblue", formatter="millions_1f"),
+    ChartSpec("cash", "day", "cash_toman", "Amount of cash per day(month{month})", "cash_toman", "day",
+              "Amount of cash per day(month{month}).png", "seagreen", formatter="millions_1f"),
+]
+
+
+def aggregate(rollup: Rollups, spec: ChartSpec) -> pd.Series:
+    """Return the series a chart plots, read from the year/month/day rollup."""
+    column = spec.column
+    if spec.kind in ("year", "month"):
+        return rollup.series(spec.kind, column)
+    if spec.kind == "day":
+        days = rollup.series("day", column)
+        latest_month = days.index.max().asfreq("M")
+        return days[days.index.asfreq("M") == latest_month]
+    if spec.kind == "monthly_pl":
+        return rollup.diffs("month", column)
+    if spec.kind == "daily_pl":
+        # Days whose last record falls within 30 days of the newest record.
+        cutoff = (pd.Timestamp(rollup.latest_datetime) - pd.Timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
+        recent = sorted(k for k, r in rollup.levels["day"].items() if r["datetime"] >= cutoff)
+        days = rollup.series("day", column)
+        return days[days.index.isin(pd.PeriodIndex(recent, freq="D"))].diff().dropna()
+    raise ValueError(f"Unknown chart kind: {spec.kind}")
+
+
+def plan_charts(rollup: Rollups, categories: Optional[List[str]] = None) -> List[Tuple[ChartSpec, pd.Series]]:
+    """Aggregate every chart's series up front; charts with nothing to plot yet are left out."""
+    work = []
+    for spec in CHART_SPECS:
+        if categories and spec.category not in categories:
+            continue
+        series = aggregate(rollup, spec)
+        if series.empty:
+            print(f"ℹ️ {spec.category}/{spec.kind}: no comparison yet, skipped")
+            continue
+        work.append((spec, series))
+    return work
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+import matplotlib
+matplotlib.use("Agg")  # no display needed
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+import pandas as pd
+
+import metrics
+from chart_specs import FORMATTERS, ChartSpec, plan_charts
+from rollups import Rollups, update_rollups
+
+BASE_OUTPUT_DIR = "executed_notebooks"
+PORTFOLIO_SUMMARY_FILE = "portfolio_summary.json"
+DPI = 300
+IMAGE_EXTENSIONS = (".png", ".jpg")
+CACHE_MANIFEST = ".chart_cache.json"
+
+
+def render_chart(series: pd.Series, spec: ChartSpec, out_dir: str, latest_month) -> str:
+    """
+    Draw one bar chart and save it to ``out_dir``. Returns the image path.
+
+    Uses a standalone ``Figure`` rather than pyplot's global figure manager,
+    so charts can be drawn from several threads at once.
+    """
+    fig = Figure(figsize=spec.figsize)
+    ax = fig.add_subplot()
+    colors = spec.color or ['green' if val >= 0 else 'red' for val in series]
+    series.plot(kind='bar', color=colors, ax=ax)
+    ax.set_title(spec.title.format(month=latest_month))
+    ax.set_ylabel(spec.ylabel)
+    ax.set_xlabel(spec.xlabel)
+    ax.grid(axis='y')
+    if spec.zero_line:
+        ax.axhline(0, color='black', linestyle='--')
+    if spec.rotate_xticks:
+        ax.tick_params(axis='x', labelrotation=90)
+    if spec.formatter:
+        ax.yaxis.set_major_formatter(FuncFormatter(FORMATTERS[spec.formatter]))
+    fig.tight_layout()
+    path = os.path.join(out_dir, spec.filename.format(month=latest_month))
+    fig.savefig(path, bbox_inches='tight', dpi=DPI)
+    return path
+
+
+def clear_stale_images(out_dir: str, keep: List[str]) -> None:
+    """Remove images in ``out_dir`` that were not produced by this run."""
+    keep = {os.path.basename(p) for p in keep}
+    for name in os.listdir(out_dir):
+        if name.endswith(IMAGE_EXTENSIONS) and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+
+
+def chart_key(spec: ChartSpec, series: pd.Series, latest_month) -> str:
+    """
+    Content hash of everything that determines a chart image: the plotted
+    slice (index labels and values), the spec (title, colours, formatter, …),
+    the resolution and the Matplotlib version.
+    """
+    payload = {
+        "spec": asdict(spec),
+        "month": str(latest_month),
+        "dpi": DPI,
+        "matplotlib": matplotlib.__version__,
+        "index": [str(i) for i in series.index],
+        "values": [float(v) for v in series],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_manifest(out_dir: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(out_dir, CACHE_MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(out_dir: str, manifest: Dict[str, str]) -> None:
+    path = os.path.join(out_dir, CACHE_MANIFEST)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Set in each pool worker by _init_worker: the pre-aggregated series, shared by all its jobs.
+_worker_state: Dict = {}
+
+
+def _init_worker(work, out_root, latest_month):
+    _worker_state.update(work=work, out_root=out_root, latest_month=latest_month)
+
+
+def _render_job(i: int) -> str:
+    spec, series = _worker_state["work"][i]
+    out_dir = os.path.join(_worker_state["out_root"], spec.category)
+    return render_chart(series, spec, out_dir, _worker_state["latest_month"])
+
+
+@metrics.timed("render_charts")
+def render_all(rollup: Rollups, out_root: str = BASE_OUTPUT_DIR,
+               categories: Optional[List[str]] = None, jobs: int = 1) -> Dict[str, List[str]]:
+    """
+    Render every chart in ``chart_specs.CHART_SPECS`` from the year/month/day rollup.
+
+    Images go to ``<out_root>/<category>/``, the layout
+    ``generate_pdf_report.collect_images_by_folder`` expects. Profit/loss
+    charts are skipped while there is nothing to compare yet.
+
+    With ``jobs > 1`` the charts are drawn by a process pool. The series are
+    aggregated once here and handed to each worker when it starts, so workers
+    only draw and encode PNGs.
+
+    Images are cached by ``chart_key``: a chart whose data slice and spec are
+    unchanged since the last run keeps its existing file and is not redrawn
+    (``<out_root>/<category>/.chart_cache.json`` records the key of every
+    image, so categories can be rendered independently).
+    """
+    result: Dict[str, List[str]] = {}
+    if not rollup.levels["day"]:
+        print("⚠️ No portfolio records to chart yet.")
+        return result
+    latest_month = pd.Period(rollup.latest_datetime[:7], freq="M")
+    work = plan_charts(rollup, categories)
+
+    manifests: Dict[str, Dict[str, str]] = {}
+    new_manifests: Dict[str, Dict[str, str]] = {}
+    todo = []
+    for spec, series in work:
+        out_dir = os.path.join(out_root, spec.category)
+        os.makedirs(out_dir, exist_ok=True)
+        if spec.category not in manifests:
+            manifests[spec.category] = load_manifest(out_dir)
+            new_manifests[spec.category] = {}
+        name = spec.filename.format(month=latest_month)
+        path = os.path.join(out_dir, name)
+        key = chart_key(spec, series, latest_month)
+        new_manifests[spec.category][name] = key
+        result.setdefault(spec.category, []).append(path)
+        if manifests[spec.category].get(name) == key and os.path.exists(path):
+            print(f"♻️ {path} (unchanged)")
+        else:
+            todo.append((spec, series))
+
+    metrics.count("charts", len(work))
+    metrics.count("redrawn", len(todo))
+    jobs = max(1, min(jobs, len(todo)))
+    if jobs == 1:
+        _init_worker(todo, out_root, latest_month)
+        paths = [_render_job(i) for i in range(len(todo))]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(todo, out_root, latest_month)) as pool:
+            paths = list(pool.map(_render_job, range(len(todo))))
+
+    for path in paths:
+        print(f"📊 {path}")
+    for category, paths in result.items():
+        clear_stale_images(os.path.join(out_root, category), paths)
+        save_manifest(os.path.join(out_root, category), new_manifests[category])
+    return result
+
+
+def main(json_path: str = PORTFOLIO_SUMMARY_FILE, out_root: str = BASE_OUTPUT_DIR,
+         jobs: int = 1) -> Dict[str, List[str]]:
+    return render_all(update_rollups(json_path), out_root, jobs=jobs)
+
+
+if __name__ == "__main__":
+    main()
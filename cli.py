@@ -0,0 +1,125 @@
+"""
+Single entry point for the project's commands.
+
+Only the standard library and the small sidecar readers are imported at
+startup; pandas, ReportLab, Matplotlib and the HTML parsers are imported by
+the subcommands that use them, so ``python cli.py status`` starts in tens of
+milliseconds.
+
+    python cli.py status [--json]     latest totals and prices (no heavy imports)
+    python cli.py update [...]        fetch prices and update the portfolio (pipeline.py)
+    python cli.py report [...]        render charts and the PDF (get_report.py)
+    python cli.py pdf                 rebuild the PDF from the existing charts
+    python cli.py prices [...]        latest-prices index tools (latest_index.py)
+    python cli.py summary [...]       portfolio summary log tools (summary_log.py)
+    python cli.py valuation [...]     revalue holdings over the price history (valuation.py)
+    python cli.py assets [...]        update holdings: NAME=AMOUNT / --from-file (update_assets.py)
+    python cli.py holdings [...]      holdings ledger: show [--at] / history (holdings_ledger.py)
+    python cli.py metrics show        per-stage time, memory and item counts (metrics.py)
+    python cli.py poll [...]          keep polling; store snapshots only when prices change (poller.py)
+    python cli.py tiers [...]         OHLC history tiers: compact / info / query (price_tiers.py)
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+PRICES_CSV = "prices_history.csv"
+PORTFOLIO_SUMMARY_FILE = "portfolio_summary.json"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _age(date_str):
+    try:
+        delta = datetime.now() - datetime.strptime(date_str, DATE_FORMAT)
+    except (TypeError, ValueError):
+        return "?"
+    minutes = int(delta.total_seconds() // 60)
+    if minutes < 60:
+        return f"{minutes} min ago"
+    if minutes < 48 * 60:
+        return f"{minutes // 60} h ago"
+    return f"{minutes // (24 * 60)} days ago"
+
+
+def status(args) -> int:
+    """Print the newest portfolio record and latest prices from the sidecar files only."""
+    import latest_index
+    import summary_log
+
+    record = summary_log.last_record(args.summary)
+    index = latest_index.read_index(args.prices)
+    prices = latest_index.latest_prices(index) if index else {}
+
+    if args.json:
+        print(json.dumps({"portfolio": record,
+                          "prices_date": index["latest_date"] if index else None,
+                          "prices": {subject: {"buy": buy, "sell": sell} for subject, (buy, sell) in prices.items()}},
+                         ensure_ascii=False))
+        return 0
+
+    if record:
+        print(f"📈 Portfolio at {record.get('datetime')} ({_age(record.get('datetime'))})")
+        print(f"  • total_toman   = {record.get('total_toman', 0):,} toman (incl. cash)")
+        print(f"  • total_dollar  = {record.get('total_dollar', 0):,} USD")
+        print(f"  • cash_toman    = {record.get('cash_toman', 0):,} toman")
+    else:
+        print("⚠️ No portfolio records yet.")
+
+    if index is None:
+        print(f"⚠️ Latest-prices index for {args.prices} is missing or stale (python cli.py prices rebuild).")
+        return 0 if record else 1
+    print(f"💱 Prices at {index['latest_date']} ({_age(index['latest_date'])})")
+    for subject, (buy, sell) in prices.items():
+        print(f"  • {subject}: buy {buy:,} / sell {sell:,}")
+    return 0
+
+
+def _passthrough(module_name: str, func: str = "main"):
+    def run(args) -> int:
+        module = __import__(module_name)
+        getattr(module, func)(args.rest)
+        return 0
+    return run
+
+
+def pdf(args) -> int:
+    import generate_pdf_report
+    generate_pdf_report.main(vector=args.vector)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("status", help="latest totals and prices")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("--prices", default=PRICES_CSV)
+    p.add_argument("--summary", default=PORTFOLIO_SUMMARY_FILE)
+    p.set_defaults(func=status)
+
+    for name, module, help_text in (("update", "pipeline", "fetch prices and update the portfolio"),
+                                    ("report", "get_report", "render charts and the PDF report"),
+                                    ("prices", "latest_index", "latest-prices index: rebuild / verify / show"),
+                                    ("summary", "summary_log", "summary log: migrate / compact / last"),
+                                    ("valuation", "valuation", "revalue holdings over the full price history"),
+                                    ("assets", "update_assets", "update holdings (NAME=AMOUNT, --from-file, --at)"),
+                                    ("holdings", "holdings_ledger", "holdings ledger: show / history"),
+                                    ("metrics", "metrics", "per-stage timings recorded by the pipeline"),
+                                    ("poll", "poller", "poll prices, storing a snapshot only when they change"),
+                                    ("tiers", "price_tiers", "roll old prices into minute/hour/day OHLC tiers")):
+        p = sub.add_parser(name, help=help_text, add_help=False)
+        p.add_argument("rest", nargs=argparse.REMAINDER)
+        p.set_defaults(func=_passthrough(module))
+
+    p = sub.add_parser("pdf", help="rebuild the PDF from the existing charts")
+    p.add_argument("--vector", action="store_true", help="draw the charts as vector graphics")
+    p.set_defaults(func=pdf)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import metrics
+
+STATE_FILE = ".pipeline_state.json"
+
+
+@dataclass
+class Node:
+    """
+    One step of the pipeline.
+
+    ``func`` receives the results of the nodes that ran before it (by name)
+    and returns its own result. ``inputs`` and ``outputs`` are files or
+    directories; a node whose inputs and outputs still have the fingerprints
+    recorded after its last successful run is skipped, make-style. ``always``
+    nodes (e.g. the network fetch) are never skipped.
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    after: List[str] = field(default_factory=list)
+    always: bool = False
+
+
+@dataclass
+class DagRun:
+    results: Dict[str, Any] = field(default_factory=dict)
+    # (node, status, seconds); status is ran / skipped / failed / blocked
+    timings: List[Tuple[str, str, float]] = field(default_factory=list)
+
+    @property
+    def failed(self) -> List[str]:
+        return [name for name, status, _ in self.timings if status == "failed"]
+
+
+def _stat_entry(path: str) -> List:
+    st = os.stat(path)
+    return [path, st.st_size, st.st_mtime_ns]
+
+
+def fingerprint(paths: List[str]) -> str:
+    """Hash of size and mtime of every file in ``paths`` (directories are walked); missing paths count too."""
+    entries = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                entries.extend(_stat_entry(os.path.join(root, name)) for name in sorted(files))
+        elif os.path.exists(path):
+            entries.append(_stat_entry(path))
+        else:
+            entries.append([path, None])
+    return hashlib.sha256(json.dumps(entries).encode("utf-8")).hexdigest()
+
+
+def _check(nodes: List[Node]) -> None:
+    names = {node.name for node in nodes}
+    if len(names) != len(nodes):
+        raise ValueError("Duplicate node names")
+    for node in nodes:
+        unknown = set(node.after) - names
+        if unknown:
+            raise ValueError(f"Node '{node.name}' depends on unknown nodes: {sorted(unknown)}")
+    # Kahn's algorithm: every node must become ready eventually
+    remaining = {node.name: set(node.after) for node in nodes}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def load_state(path: str = STATE_FILE) -> Dict[str, Dict[str, str]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: Dict[str, Dict[str, str]], path: str = STATE_FILE) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def execute(nodes: List[Node], jobs: int = 4, force: bool = False,
+            state_path: Optional[str] = STATE_FILE) -> DagRun:
+    """
+    Run ``nodes`` in dependency order, up to ``jobs`` at a time (threads).
+
+    Nodes are skipped when their fingerprints are unchanged (unless ``force``);
+    a failed node blocks everything that depends on it but not its siblings.
+    ``state_path=None`` disables fingerprinting altogether.
+    """
+    _check(nodes)
+    by_name = {node.name: node for node in nodes}
+    state = load_state(state_path) if state_path else {}
+    lock = threading.Lock()
+    run = DagRun()
+    done: Dict[str, str] = {}  # name → status
+
+    def run_node(node: Node) -> str:
+        with metrics.span(f"node:{node.name}") as s:
+            s.status = _run_node(node)
+            return s.status
+
+    def _run_node(node: Node) -> str:
+        inputs_fp = fingerprint(node.inputs)
+        recorded = state.get(node.name)
+        if (state_path and not force and not node.always and recorded
+                and recorded.get("inputs") == inputs_fp and recorded.get("outputs") == fingerprint(node.outputs)):
+            return "skipped"
+        with lock:
+            ctx = dict(run.results)
+        result = node.func(ctx)
+        with lock:
+            run.results[node.name] = result
+            if state_path:
+                # Inputs are fingerprinted before the run so a change made meanwhile is picked up next time.
+                state[node.name] = {"inputs": inputs_fp, "outputs": fingerprint(node.outputs)}
+                save_state(state, state_path)
+        return "ran"
+
+    pending = list(nodes)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for node in list(pending):
+                statuses = [done.get(dep) for dep in node.after]
+                if any(s in ("failed", "blocked") for s in statuses):
+                    pending.remove(node)
+                    done[node.name] = "blocked"
+                    run.timings.append((node.name, "blocked", 0.0))
+                    logging.warning(f"⛔ {node.name}: blocked by a failed dependency")
+                elif all(s is not None for s in statuses):
+                    pending.remove(node)
+                    running[pool.submit(run_node, node)] = (node, time.perf_counter())
+            if not running:
+                continue
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                node, start = running.pop(future)
+                try:
+                    status = future.result()
+                except Exception:
+                    logging.exception(f"❌ {node.name} failed")
+                    status = "failed"
+                done[node.name] = status
+                seconds = time.perf_counter() - start
+                run.timings.append((node.name, status, seconds))
+                print(f"{'⏭️' if status == 'skipped' else '✅' if status == 'ran' else '❌'} "
+                      f"{node.name}: {status} ({seconds:.3f} s)")
+    return run
+
+
+def print_timings(run: DagRun) -> None:
+    total = sum(seconds for _, _, seconds in run.timings)
+    print("\n⏱️ Stage timings:")
+    for name, status, seconds in run.timings:
+        print(f"  • {name:<16} {status:<8} {seconds:>7.3f} s")
+    print(f"  • {'sum':<16} {'':<8} {total:>7.3f} s")
@@ -1,61 +1,92 @@
 import csv
+import io
 import os
 import logging
-from datetime import datetime
-from bs4 import BeautifulSoup
 from typing import List, Dict
+import metrics
+from file_lock import lock_file
+from price_parser import load_price_table, parse_price_table
+from latest_index import apply_records, build_index, load_index, write_index
 
-TARGETS = [" دلار آمریکا", "تمام امامی", "تمام بهار", "نیم بهار", "ربع بهار"]
 FIELDNAMES = ["subject", "buy_price", "sell_price", "date"]
 
 
+def _csv_lines(records: List[Dict]) -> List[str]:
+    """Each record as the CSV line ``csv.DictWriter`` writes for it."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES)
+    lines = []
+    for record in records:
+        writer.writerow(record)
+        lines.append(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+    return lines
 
 
+@metrics.timed("extract_prices_from_html")
 def extract_prices_from_html(html_content: str) -> List[Dict]:
-
     """
     Parse HTML and extract prices for defined targets.
 
+    Parsing goes through ``price_parser``, which uses the fastest installed
+    backend (selectolax, lxml or BeautifulSoup).
+
     Args:
         html_content (str): Raw HTML content.
 
     Returns:
         list[dict]: List of extracted price records.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-    extracted = []
-
-    for target in TARGETS:
-        for table in soup.find_all("table"):
-            if target in table.text:
-                for row in table.find_all("tr"):
-                    if target in row.text:
-                        cells = row.find_all("td")
-                        if len(cells) >= 3:
-                            extracted.append({
-                                "subject": cells[0].text.strip().replace(" ", " ").strip(),
-                                "buy_price": cells[1].text.strip(),
-                                "sell_price": cells[2].text.strip(),
-                                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
-                        break
-    return extracted
+    records = parse_price_table(html_content).to_records()
+    metrics.count("rows", len(records))
+    return records
 
 
+@metrics.timed("save_prices_to_csv")
 def save_prices_to_csv(prices: list[dict], file_path: str = "prices_history.csv") -> None:
     """
-    Save extracted prices to a CSV file.
+    Save extracted prices to a CSV file and its columnar store.
+
+    The store (``<name>_store/``, see ``price_store``) is created from the
+    existing CSV the first time, then appended in step with the CSV. The
+    latest-prices sidecar (``<name>.latest.json``, see ``latest_index``) is
+    replaced atomically after each write. If the store append fails, the
+    rows just appended to the CSV are truncated again. The write holds
+    ``file_lock.lock_file`` so it never interleaves with a ``price_tiers``
+    compaction rewriting the CSV.
 
     Args:
         prices (list[dict]): List of price records.
         file_path (str): Path to the CSV file.
     """
-    file_exists = os.path.exists(file_path)
-    with open(file_path, "a", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
-        if not file_exists:
-            writer.writeheader()
-        writer.writerows(prices)
+    with lock_file(file_path):
+        from price_store import open_store  # numpy; only needed when writing
+        store = open_store(file_path)
+        file_exists = os.path.exists(file_path)
+        index = load_index(file_path) if file_exists else build_index(file_path)
+        with open(file_path, "a", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+            if not file_exists:
+                writer.writeheader()
+            csvfile.flush()
+            offset = os.fstat(csvfile.fileno()).st_size
+            lines = _csv_lines(prices)
+            csvfile.write("".join(lines))
+        offsets, position = [], offset  # where each record's line starts, for the index
+        for line in lines:
+            offsets.append(position)
+            position += len(line.encode("utf-8"))
+        try:
+            store.append(prices)
+        except Exception:
+            # Roll the CSV back so it stays in step with the store (a partial store append is
+            # trimmed by the next one)
+            os.truncate(file_path, offset)
+            raise
+        metrics.count("rows", len(prices))
+        metrics.count("bytes", os.path.getsize(file_path) - offset)
+        write_index(file_path, apply_records(index, prices, offsets, os.path.getsize(file_path)))
     logging.info(f"✅ {len(prices)} records saved to {file_path}")
 
 
@@ -71,10 +102,7 @@ def main():
         logging.error(f"HTML file not found: {html_path}")
         return
 
-    with open(html_path, "r", encoding="utf-8") as f:
-        html = f.read()
-
-    prices = extract_prices_from_html(html)
+    prices = load_price_table(html_path).to_records()
     if not prices:
         logging.warning("No prices extracted from HTML.")
     else:
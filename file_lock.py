@@ -0,0 +1,28 @@
+"""
+Advisory locks shared by the writers of the history files.
+
+``save_prices_to_csv`` and ``price_tiers.compact`` both change
+``prices_history.csv`` (and its index and store), ``summary_log`` appends to
+and compacts the portfolio log; each holds ``lock_file`` on the file it
+changes so writers in other processes (e.g. ``poller.py`` next to a cron
+job or ``get_report.py``) never interleave.
+"""
+from contextlib import contextmanager
+
+LOCK_SUFFIX = ".lock"
+
+
+@contextmanager
+def lock_file(file_path: str):
+    """Hold an exclusive advisory lock on ``<file_path>.lock`` (a no-op where ``fcntl`` is unavailable)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(file_path + LOCK_SUFFIX, "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
@@ -1,12 +1,14 @@
 import os
 import datetime
 import json
-import csv
 from math import ceil
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
 from reportlab.lib import colors
+import latest_index
+import metrics
+import summary_log
+from report_images import CACHE_DIR, REPORT_IMAGE_DPI, fit, image_size, pixel_box, prepare_images, prune_cache
 
 # Configuration
 INPUT_IMAGES_DIR = "executed_notebooks"
@@ -17,6 +19,8 @@ IMAGE_EXTENSIONS = [".png", ".jpg", ".jpeg"]
 PORTFOLIO_SUMMARY_FILE = "portfolio_summary.json"
 USER_ASSETS_FILE = "user_assets.json"
 PRICE_HISTORY_FILE = "prices_history.csv"
+PAGE_MARGIN = 50
+CELL_PADDING = 10
 
 # Asset name translations (Persian → English)
 ASSET_TRANSLATIONS = {
@@ -58,15 +62,13 @@ def load_user_assets(json_path: str):
 
 def load_portfolio_summary(json_path: str):
     """
-    Load latest total_toman and total_dollar from a list of portfolio summaries.
-    Assumes the last item is the most recent.
+    Load latest total_toman and total_dollar from the portfolio summary log.
+    Only the last record is read (see summary_log.last_record).
     """
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if isinstance(data, list) and data:
-                latest = data[-1]
-                return latest.get("total_toman", 0), latest.get("total_dollar", 0)
+        latest = summary_log.last_record(json_path)
+        if latest:
+            return latest.get("total_toman", 0), latest.get("total_dollar", 0)
     except Exception as e:
         print(f"⚠️ Error loading portfolio summary: {e}")
     return 0, 0
@@ -75,31 +77,89 @@ def load_portfolio_summary(json_path: str):
 def load_latest_prices(csv_path: str):
     """
     Read the price history CSV and return a dict of latest buy/sell price per asset.
+    Uses the latest-prices sidecar index or the columnar store's tail when
+    available; otherwise the index is rebuilt from the CSV.
     """
-    latest = {}
+    index = latest_index.read_index(csv_path)
+    if index is not None:
+        return {asset: (float(buy), float(sell)) for asset, (buy, sell) in latest_index.latest_prices(index).items()}
+
+    from price_store import PriceStore, store_path_for
+    store = PriceStore(store_path_for(csv_path))
+    if store.exists:
+        return {asset: (float(buy), float(sell)) for asset, (buy, sell, _) in store.latest().items()}
+
     if not os.path.exists(csv_path):
-        return latest
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if not row or row[0].startswith('نام'):  # skip header if present
-                continue
-            asset = row[0]
-            buy = row[1].replace(',', '').replace('"', '')
-            sell = row[2].replace(',', '').replace('"', '')
-            date = row[3]
-            # overwrite so last occurrence remains
+        return {}
+    # Rebuild the index in one streaming pass so the next report reads it directly
+    index = latest_index.load_index(csv_path)
+    return {asset: (float(buy), float(sell)) for asset, (buy, sell) in latest_index.latest_prices(index).items()}
+
+
+def grid_cells(n: int, width: float, height: float):
+    """
+    Return the ``(x0, y0, cell_w, cell_h)`` boxes of an ``n``-item grid page,
+    row by row, below the page title.
+    """
+    usable_w = width - 2 * PAGE_MARGIN
+    usable_h = height - 2 * PAGE_MARGIN - 30
+    rows, cols = determine_grid(n)
+    cell_w = usable_w / cols
+    cell_h = usable_h / rows
+    cells = []
+    for idx in range(n):
+        col = idx % cols
+        row = idx // cols
+        x0 = PAGE_MARGIN + col * cell_w
+        y0 = height - PAGE_MARGIN - 30 - (row + 1) * cell_h
+        cells.append((x0, y0, cell_w, cell_h))
+    return cells
+
+
+def place_in_cell(cell, iw: float, ih: float):
+    """Centre an ``iw x ih`` item in a grid cell, scaled to fit. Returns ``(x, y, draw_w, draw_h)``."""
+    x0, y0, cell_w, cell_h = cell
+    draw_w, draw_h = fit(iw, ih, cell_w - 2 * CELL_PADDING, cell_h - 2 * CELL_PADDING)
+    return x0 + (cell_w - draw_w) / 2, y0 + (cell_h - draw_h) / 2, draw_w, draw_h
+
+
+def layout_image_pages(images_by_folder: dict, width: float, height: float):
+    """
+    Place every image on its folder's page without decoding any of them.
+
+    Returns a list of ``(folder, n_images, [(img_path, x, y, draw_w, draw_h), ...])``
+    pages; image sizes come from the file headers (see ``report_images.image_size``).
+    """
+    pages = []
+    for folder, img_paths in images_by_folder.items():
+        if not img_paths:
+            continue
+        placed = []
+        for img_path, cell in zip(img_paths, grid_cells(len(img_paths), width, height)):
             try:
-                buy_val = float(buy)
-                sell_val = float(sell)
-            except:
+                iw, ih = image_size(img_path)
+            except Exception as e:
+                print(f"⚠️ Failed to load image {img_path}: {e}")
                 continue
-            latest[asset] = (buy_val, sell_val)
-    return latest
+            placed.append((img_path, *place_in_cell(cell, iw, ih)))
+        pages.append((folder, len(img_paths), placed))
+    return pages
+
+
+def draw_page_header(c, folder: str, n: int, width: float, height: float):
+    # Background
+    c.setFillColor(colors.whitesmoke)
+    c.rect(0, 0, width, height, fill=True, stroke=False)
+    # Folder title
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 18)
+    title_str = f"{folder} ({n} images)"
+    t_w = c.stringWidth(title_str, "Helvetica-Bold", 18)
+    c.drawString((width - t_w) / 2, height - PAGE_MARGIN + 10, title_str)
 
 
-def create_report(output_path: str, images_by_folder: dict, title: str, date_str: str):
-    c = canvas.Canvas(output_path, pagesize=letter)
+def draw_title_page(c, title: str, date_str: str):
+    """Title page: date, totals, the user's assets and the latest prices."""
     width, height = letter
 
     # Load data
@@ -173,56 +233,77 @@ def create_report(output_path: str, images_by_folder: dict, title: str, date_str
     c.drawString((width - text_width) / 2, height / 2, title)
     c.showPage()
 
+
+@metrics.timed("create_report")
+def create_report(output_path: str, images_by_folder: dict, title: str, date_str: str,
+                  image_dpi: int = REPORT_IMAGE_DPI, jobs: int = 1):
+    """
+    Write the PDF: a title page with totals and prices, then one page of charts per folder.
+
+    Images are downsampled to ``image_dpi`` at the size they are drawn
+    (``None`` embeds the originals), using ``jobs`` worker processes, and
+    pages are written one after another as their images become ready.
+    """
+    c = canvas.Canvas(output_path, pagesize=letter, pageCompression=1)
+    width, height = letter
+
+    draw_title_page(c, title, date_str)
+
     # Image pages
-    margin = 50
-    padding = 10
-    usable_w = width - 2 * margin
-    usable_h = height - 2 * margin - 30
+    pages = layout_image_pages(images_by_folder, width, height)
+    placements = [p for _, _, placed in pages for p in placed]
+    if image_dpi:
+        jobs_list = [(path, pixel_box(w, h, image_dpi), CACHE_DIR) for path, _, _, w, h in placements]
+        embed_paths = prepare_images(jobs_list, workers=jobs)
+    else:
+        embed_paths = iter([path for path, _, _, _, _ in placements])
 
-    for folder, img_paths in images_by_folder.items():
-        if not img_paths:
-            continue
-        n = len(img_paths)
-        rows, cols = determine_grid(n)
-        cell_w = usable_w / cols
-        cell_h = usable_h / rows
-
-        # Background
-        c.setFillColor(colors.whitesmoke)
-        c.rect(0, 0, width, height, fill=True, stroke=False)
-        # Folder title
-        c.setFillColor(colors.black)
-        c.setFont("Helvetica-Bold", 18)
-        title_str = f"{folder} ({n} images)"
-        t_w = c.stringWidth(title_str, "Helvetica-Bold", 18)
-        c.drawString((width - t_w) / 2, height - margin + 10, title_str)
+    used = []
+    for folder, n, placed in pages:
+        draw_page_header(c, folder, n, width, height)
 
         # Images grid
-        for idx, img_path in enumerate(img_paths):
+        for (img_path, x, y, draw_w, draw_h), embed_path in zip(placed, embed_paths):
+            used.append(embed_path)
             try:
-                img = ImageReader(img_path)
-                iw, ih = img.getSize()
-                aspect = iw / ih
-                col = idx % cols
-                row = idx // cols
-                x0 = margin + col * cell_w
-                y0 = height - margin - 30 - (row + 1) * cell_h
-                max_w = cell_w - 2 * padding
-                max_h = cell_h - 2 * padding
-                if (max_w / max_h) > aspect:
-                    draw_h = max_h
-                    draw_w = draw_h * aspect
-                else:
-                    draw_w = max_w
-                    draw_h = draw_w / aspect
-                x = x0 + (cell_w - draw_w) / 2
-                y = y0 + (cell_h - draw_h) / 2
-                c.drawImage(img, x, y, width=draw_w, height=draw_h)
+                c.drawImage(embed_path, x, y, width=draw_w, height=draw_h)
             except Exception as e:
                 print(f"⚠️ Failed to load image {img_path}: {e}")
         c.showPage()
 
+    if image_dpi:
+        prune_cache(CACHE_DIR, used)
     c.save()
+    metrics.count("images", len(used))
+    metrics.count("bytes", os.path.getsize(output_path))
+
+
+@metrics.timed("create_vector_report")
+def create_vector_report(output_path: str, rollup, title: str, date_str: str):
+    """
+    Same report as ``create_report``, but the charts are drawn straight from the
+    rollup as vector graphics (``vector_charts.chart_drawing``) instead of
+    embedding rendered images: no PNGs are needed and the pages stay sharp at any zoom.
+    """
+    from reportlab.graphics import renderPDF
+    import vector_charts
+
+    c = canvas.Canvas(output_path, pagesize=letter, pageCompression=1)
+    width, height = letter
+
+    draw_title_page(c, title, date_str)
+
+    latest_month, charts_by_category = vector_charts.plan_vector_charts(rollup)
+    for category, items in charts_by_category.items():
+        draw_page_header(c, category, len(items), width, height)
+        for (spec, series), cell in zip(items, grid_cells(len(items), width, height)):
+            x, y, draw_w, draw_h = place_in_cell(cell, *spec.figsize)
+            drawing = vector_charts.chart_drawing(spec, series, latest_month, draw_w, draw_h)
+            renderPDF.draw(drawing, c, x, y)
+            metrics.count("charts")
+        c.showPage()
+    c.save()
+    metrics.count("bytes", os.path.getsize(output_path))
 
 
 def collect_images_by_folder(base_dir: str) -> dict:
@@ -240,12 +321,34 @@ def collect_images_by_folder(base_dir: str) -> dict:
     return result
 
 
-if __name__ == "__main__":
+def main(jobs: int = 1, vector: bool = False):
     print("🖼️ Generating PDF report ...")
     today = datetime.date.today().strftime(DATE_FORMAT)
+    if vector:
+        import rollups
+        create_vector_report(REPORT_FILE, rollups.update_rollups(PORTFOLIO_SUMMARY_FILE), TITLE, today)
+        print(f"✅ PDF report created: {REPORT_FILE}")
+        return
     images_by_folder = collect_images_by_folder(INPUT_IMAGES_DIR)
     if not images_by_folder:
         print(f"⚠️ No image folders found in '{INPUT_IMAGES_DIR}'.")
     else:
-        create_report(REPORT_FILE, images_by_folder, TITLE, today)
+        create_report(REPORT_FILE, images_by_folder, TITLE, today, jobs=jobs)
         print(f"✅ PDF report created: {REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the PDF report from the rendered charts.")
+    parser.add_argument("--vector", action="store_true", help="draw the charts as vector graphics")
+    parser.add_argument("--jobs", type=int, default=1, help="processes used to downsample the images")
+    parser.add_argument("--profile", action="store_true", help="profile each stage (cProfile) into profiles/<run>/")
+    parser.add_argument("--profile-dir", default=None, help=argparse.SUPPRESS)  # set by get_report.py --profile
+    parser.add_argument("--profile-top", type=int, default=15, help="hot functions listed after a --profile run")
+    args = parser.parse_args()
+    metrics.enable(PORTFOLIO_SUMMARY_FILE)
+    if args.profile or args.profile_dir:
+        import profiling
+        profiling.enable(args.profile_dir, top=args.profile_top)
+    main(jobs=args.jobs, vector=args.vector)
@@ -1,8 +1,13 @@
+import argparse
+import hashlib
 import os
 import subprocess
 import shutil
 import sys
 from typing import List
+import metrics
+import profiling
+import summary_log
 
 NOTEBOOKS: List[str] = [
     "Display profit and loss_toman.ipynb",
@@ -12,6 +17,7 @@ NOTEBOOKS: List[str] = [
 ]
 
 BASE_OUTPUT_DIR = "executed_notebooks"
+PORTFOLIO_SUMMARY_FILE = "portfolio_summary.json"
 FILE_EXTENSIONS_TO_MOVE = [".png", ".jpg"]  # Adjustable
 
 def get_category_dir(notebook_name: str) -> str:
@@ -31,13 +37,21 @@ def execute_notebook(notebook_path: str) -> bool:
 
     print(f"🔄 Running notebook: {filename}")
 
-    result = subprocess.run([
-        "jupyter", "nbconvert",
-        "--to", "notebook",
-        "--execute",
-        "--inplace",
-        filename
-    ], cwd=notebook_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    command = ["jupyter", "nbconvert"]
+    env = None
+    if profiling.enabled():
+        # nbconvert under cProfile; the kernel it starts profiles itself via an IPython startup script
+        command = profiling.python_command(["-m", "nbconvert"], f"nbconvert-{filename}")
+        env = profiling.child_env(filename)
+    with metrics.span("execute_notebook", notebook=filename) as s:
+        result = subprocess.run(command + [
+            "--to", "notebook",
+            "--execute",
+            "--inplace",
+            filename
+        ], cwd=notebook_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            s.status = "error"
 
     if result.returncode != 0:
         print(f"❌ Failed: {filename}")
@@ -47,32 +61,52 @@ def execute_notebook(notebook_path: str) -> bool:
     print(f"✅ Executed: {filename}")
     return True
 
+def _same_content(a: str, b: str) -> bool:
+    if os.path.getsize(a) != os.path.getsize(b):
+        return False
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        return hashlib.sha256(fa.read()).digest() == hashlib.sha256(fb.read()).digest()
+
 def move_generated_files(notebook_path: str, category: str):
+    """
+    Move the images a notebook produced into its category folder.
+
+    Images identical to the ones already there are dropped instead of
+    replacing them, and only images the notebook no longer produces are
+    deleted from the destination.
+    """
     notebook_dir = os.path.dirname(notebook_path) or "."
     dest_dir = os.path.join(BASE_OUTPUT_DIR, category)
     os.makedirs(dest_dir, exist_ok=True)
 
-    # Delete previous files in the destination
-    for f in os.listdir(dest_dir):
-        f_path = os.path.join(dest_dir, f)
-        if os.path.isfile(f_path):
-            os.remove(f_path)
-
-    # Transfer new files
+    produced = set()
     for file_name in os.listdir(notebook_dir):
         file_path = os.path.join(notebook_dir, file_name)
         if not os.path.isfile(file_path):
             continue
         if any(file_name.endswith(ext) for ext in FILE_EXTENSIONS_TO_MOVE):
+            produced.add(file_name)
             dest_path = os.path.join(dest_dir, file_name)
+            if os.path.exists(dest_path) and _same_content(file_path, dest_path):
+                os.remove(file_path)
+                continue
             print(f"📦 Moving: {file_name} ➡️ {dest_dir}")
             shutil.move(file_path, dest_path)
 
+    # Delete images from earlier runs that this notebook no longer produces
+    for f in os.listdir(dest_dir):
+        f_path = os.path.join(dest_dir, f)
+        if os.path.isfile(f_path) and f not in produced:
+            os.remove(f_path)
+
 def run_report_script():
     print("📝 Running generate_pdf_report.py...")
 
+    command = [sys.executable, "generate_pdf_report.py"]
+    if profiling.enabled():
+        command += ["--profile-dir", os.environ[profiling.PROFILE_ENV]]
     result = subprocess.run(
-        [sys.executable, "generate_pdf_report.py"],
+        command,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True
@@ -84,7 +118,8 @@ def run_report_script():
     else:
         print("✅ PDF report generated.")
 
-def main():
+def run_notebooks():
+    """Legacy engine: execute each notebook with nbconvert and move its images."""
     print("🚀 Starting notebook execution...")
 
     for notebook in NOTEBOOKS[:-1]:  # Exclude the PDF generator
@@ -99,9 +134,48 @@ def main():
             move_generated_files(notebook, category)
         else:
             print("⛔ Execution failed. Stopping.")
-            break
+            return False
+    return True
 
-    run_report_script()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render charts and build the PDF report.")
+    parser.add_argument("--engine", choices=["charts", "vector", "notebooks"], default="charts",
+                        help="charts: render PNGs in this process (default); vector: draw the charts as "
+                             "vector graphics straight into the PDF; notebooks: run the .ipynb files via nbconvert")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="charts engine: processes drawing the charts and downsampling the images "
+                             "(default: all cores)")
+    parser.add_argument("--force", action="store_true",
+                        help="charts engine: redo every step even if its inputs are unchanged")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile every step separately (cProfile, incl. notebook kernels) into profiles/<run>/")
+    parser.add_argument("--profile-top", type=int, default=15, help="hot functions listed after a --profile run")
+    args = parser.parse_args(argv)
+
+    metrics.enable(PORTFOLIO_SUMMARY_FILE)
+    if args.profile:
+        profiling.enable(top=args.profile_top)
+
+    if args.engine == "notebooks":
+        # The notebooks read the summary as a list; refresh portfolio_summary.json from the log first.
+        n = summary_log.compact(PORTFOLIO_SUMMARY_FILE)
+        print(f"🗜️ Compacted {n} portfolio records into {PORTFOLIO_SUMMARY_FILE}")
+        run_notebooks()
+        run_report_script()
+    elif args.engine == "vector":
+        import generate_pdf_report
+
+        print("🚀 Drawing vector charts into the report...")
+        generate_pdf_report.main(vector=True)
+    else:
+        import dag
+        import pipeline
+
+        print("🚀 Rendering charts in-process...")
+        run = dag.execute(pipeline.report_nodes(jobs=args.jobs), jobs=profiling.dag_jobs(4), force=args.force)
+        dag.print_timings(run)
+        if run.failed:
+            sys.exit(1)
     print("✅ All done.")
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+import argparse
+import json
+import logging
+import os
+from bisect import bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+LEDGER_SUFFIX = ".ledger.jsonl"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Holdings found in user_assets.json when the ledger is created count as held since this time
+SEED_EFFECTIVE = "1970-01-01 00:00:00"
+
+
+def ledger_path_for(assets_json: str) -> str:
+    """Ledger next to ``assets_json`` (``user_assets.json`` → ``user_assets.ledger.jsonl``)."""
+    return os.path.splitext(assets_json)[0] + LEDGER_SUFFIX
+
+
+def _now() -> str:
+    return datetime.now().strftime(DATE_FORMAT)
+
+
+class HoldingsLedger:
+    """
+    Append-only history of the user's holdings.
+
+    Each line of the ledger sets the amount of one subject from ``effective``
+    on. In memory every subject keeps its change times sorted next to the
+    amounts, so the holdings at any moment are one ``bisect`` per subject:
+    O(log n) in the number of changes. ``user_assets.json`` is kept as the
+    latest snapshot for readers that only need the current holdings.
+    """
+
+    def __init__(self, assets_json: str = "user_assets.json"):
+        self.assets_json = assets_json
+        self.path = ledger_path_for(assets_json)
+        self._times: Dict[str, List[str]] = {}
+        self._amounts: Dict[str, List[Tuple[str, int, float]]] = {}
+        self._seq = 0
+        if not os.path.exists(self.path):
+            self._seed()
+        self._load()
+
+    # ---- persistence --------------------------------------------------------
+
+    def _seed(self) -> None:
+        assets = {}
+        if os.path.exists(self.assets_json):
+            with open(self.assets_json, "r", encoding="utf-8") as f:
+                assets = json.load(f)
+        lines = "".join(json.dumps({"effective": SEED_EFFECTIVE, "subject": subject, "amount": amount},
+                                   ensure_ascii=False) + "\n" for subject, amount in assets.items())
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        logging.info(f"✅ Created {self.path} from {self.assets_json} ({len(assets)} holdings)")
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logging.warning(f"⚠️ Skipping corrupt line in {self.path}")
+                    continue
+                self._insert(entry["effective"], entry["subject"], entry["amount"])
+
+    def _insert(self, effective: str, subject: str, amount) -> None:
+        # (effective, seq) keeps entries with the same timestamp in ledger order
+        times = self._times.setdefault(subject, [])
+        entries = self._amounts.setdefault(subject, [])
+        self._seq += 1
+        key = (effective, self._seq, amount)
+        if not entries or key >= entries[-1]:
+            entries.append(key)
+            times.append(effective)
+        else:  # back-dated change
+            i = bisect_right(times, effective)
+            entries.insert(i, key)
+            insort(times, effective)
+
+    def record(self, changes: Dict[str, int], effective: Optional[str] = None) -> Dict[str, int]:
+        """
+        Append the subjects whose amount differs from the holdings at ``effective`` (default: now).
+
+        Returns the entries written and refreshes ``user_assets.json`` with the latest holdings.
+        """
+        effective = effective or _now()
+        current = self.as_of(effective)
+        written = {subject: amount for subject, amount in changes.items() if current.get(subject) != amount}
+        if written:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for subject, amount in written.items():
+                    f.write(json.dumps({"effective": effective, "subject": subject, "amount": amount},
+                                       ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            for subject, amount in written.items():
+                self._insert(effective, subject, amount)
+        self._write_latest()
+        return written
+
+    def _write_latest(self) -> None:
+        tmp_path = self.assets_json + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.latest(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.assets_json)
+
+    # ---- lookups ------------------------------------------------------------
+
+    @property
+    def subjects(self) -> List[str]:
+        return list(self._times)
+
+    def amount_as_of(self, subject: str, when: str) -> int:
+        """Amount of ``subject`` held at ``when`` (``%Y-%m-%d %H:%M:%S``); 0 before its first entry."""
+        i = bisect_right(self._times.get(subject, []), when)
+        return self._amounts[subject][i - 1][2] if i else 0
+
+    def as_of(self, when: str) -> Dict[str, int]:
+        """Holdings of every subject at ``when``."""
+        return {subject: self.amount_as_of(subject, when) for subject in self._times}
+
+    @property
+    def newest_effective(self) -> Optional[str]:
+        """Time of the most recent change in the ledger (``None`` when it is empty)."""
+        return max((times[-1] for times in self._times.values() if times), default=None)
+
+    def latest(self) -> Dict[str, int]:
+        return {subject: entries[-1][2] for subject, entries in self._amounts.items()}
+
+    def to_frame(self, portfolio: str = "default"):
+        """All entries in the ``valuation.HOLDINGS_COLUMNS`` layout (for historical revaluation)."""
+        import pandas as pd
+        rows = [(portfolio, subject, amount, effective)
+                for subject, entries in self._amounts.items() for effective, _, amount in entries]
+        df = pd.DataFrame(rows, columns=["portfolio", "subject", "amount", "effective"])
+        df["effective"] = pd.to_datetime(df["effective"], format=DATE_FORMAT)
+        return df
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Append-only holdings ledger.")
+    parser.add_argument("command", choices=["show", "history"])
+    parser.add_argument("--assets", default="user_assets.json")
+    parser.add_argument("--at", default=None, help="show holdings at this time (%%Y-%%m-%%d %%H:%%M:%%S)")
+    args = parser.parse_args(argv)
+
+    ledger = HoldingsLedger(args.assets)
+    if args.command == "show":
+        when = args.at or _now()
+        print(f"Holdings at {when}:")
+        for subject, amount in ledger.as_of(when).items():
+            print(f"  • {subject}: {amount:,}")
+    else:
+        for subject in ledger.subjects:
+            print(subject)
+            for effective, _, amount in ledger._amounts[subject]:
+                print(f"  {effective}  {amount:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import urllib3
+
+import metrics
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+STATE_SUFFIX = ".http.json"
+HTTP_TIMEOUT = 10  # seconds
+
+_pool: Optional[urllib3.PoolManager] = None
+
+
+def get_pool() -> urllib3.PoolManager:
+    """Return the process-wide connection pool (keep-alive connections are reused between fetches)."""
+    global _pool
+    if _pool is None:
+        _pool = urllib3.PoolManager(
+            num_pools=8,
+            maxsize=4,
+            headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"},
+            retries=urllib3.Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+            timeout=urllib3.Timeout(total=HTTP_TIMEOUT),
+        )
+    return _pool
+
+
+def decode_body(data: bytes, content_type: str) -> str:
+    """Decode a response body in the charset its ``Content-Type`` names, or UTF-8 if none (or an unknown one)."""
+    charset = content_type.partition("charset=")[2].split(";")[0].strip().strip('"') or "utf-8"
+    try:
+        return data.decode(charset, errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    modified: bool
+    size: int = 0  # decoded body size in bytes (0 when not modified)
+
+
+def _load_state(state_path: str) -> dict:
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: str, data: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@metrics.timed("fetch_page")
+def fetch_page_http(url: str, output_path: str, timeout: float = HTTP_TIMEOUT) -> FetchResult:
+    """
+    Fetch a page over plain HTTP and save it to ``output_path`` if it changed.
+
+    The ETag / Last-Modified validators of the previous response are kept in
+    ``<output_path>.http.json`` and sent back as If-None-Match /
+    If-Modified-Since. On ``304 Not Modified`` the saved file is left untouched,
+    so its cached price table (see ``price_parser.load_price_table``) stays
+    valid and nothing is re-parsed.
+
+    Raises:
+        urllib3.exceptions.HTTPError: On connection errors.
+    """
+    state_path = output_path + STATE_SUFFIX
+    state = _load_state(state_path)
+    headers = {}
+    if os.path.exists(output_path) and state.get("url") == url:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+    logging.info(f"🌐 GET {url}")
+    response = get_pool().request("GET", url, headers=headers, timeout=timeout)
+
+    if response.status == 304:
+        logging.info("♻️ Page not modified, keeping saved snapshot")
+        return FetchResult(url, 304, modified=False)
+    if response.status != 200:
+        return FetchResult(url, response.status, modified=False)
+
+    metrics.count("bytes", len(response.data))
+    html = decode_body(response.data, response.headers.get("Content-Type", ""))
+    _write_atomic(output_path, html)
+    _write_atomic(state_path, json.dumps({
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }))
+    logging.info(f"💾 Saved page HTML to {output_path} ({len(response.data):,} bytes)")
+    return FetchResult(url, 200, modified=True, size=len(response.data))
@@ -0,0 +1,147 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+INDEX_SUFFIX = ".latest.json"
+
+
+def index_path_for(csv_path: str) -> str:
+    """Sidecar index next to ``csv_path`` (``prices_history.csv`` → ``prices_history.latest.json``)."""
+    return os.path.splitext(csv_path)[0] + INDEX_SUFFIX
+
+
+def _price(value: str) -> int:
+    return int(float(value.replace(",", "").replace('"', "")))
+
+
+def _empty_index() -> Dict:
+    return {"csv_size": 0, "latest_date": None, "subjects": {}}
+
+
+def apply_records(index: Dict, records: List[Dict], offsets: List[int], csv_size: int) -> Dict:
+    """
+    Fold newly appended records into ``index``.
+
+    ``offsets`` are the byte offsets in the CSV where each record's line
+    starts and ``csv_size`` the file size after writing them. Records with
+    unparsable prices are ignored, like in ``generate_pdf_report.load_latest_prices``.
+    """
+    subjects = index["subjects"]
+    for record, offset in zip(records, offsets):
+        try:
+            buy, sell = _price(record["buy_price"]), _price(record["sell_price"])
+        except (TypeError, ValueError, KeyError):
+            continue
+        subjects.pop(record["subject"], None)  # keep dict order = order of last update
+        subjects[record["subject"]] = {"buy": buy, "sell": sell, "date": record["date"], "offset": offset}
+        if index["latest_date"] is None or record["date"] >= index["latest_date"]:
+            index["latest_date"] = record["date"]
+    index["csv_size"] = csv_size
+    return index
+
+
+def write_index(csv_path: str, index: Dict) -> None:
+    """Replace the sidecar atomically so readers never see a partial file."""
+    path = index_path_for(csv_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def build_index(csv_path: str) -> Dict:
+    """Scan the whole CSV once and return a fresh index (used by rebuild/verify)."""
+    index = _empty_index()
+    if not os.path.exists(csv_path):
+        return index
+    span = [0, 0]  # byte offsets [start, end) of the line the reader is on
+
+    def lines(f):
+        for raw in f:
+            span[0], span[1] = span[1], span[1] + len(raw)
+            yield raw.decode("utf-8")
+
+    with open(csv_path, "rb") as f:
+        reader = csv.reader(lines(f))
+        header = next(reader, None)
+        for row in reader:
+            if row:
+                apply_records(index, [dict(zip(header, row))], [span[0]], span[1])
+    index["csv_size"] = os.path.getsize(csv_path)
+    return index
+
+
+def read_index(csv_path: str) -> Optional[Dict]:
+    """
+    Return the sidecar index, or None if it is missing or stale.
+
+    The index is stale when the CSV size no longer matches the size recorded
+    at the last indexed write (e.g. the CSV was edited by hand).
+    """
+    try:
+        with open(index_path_for(csv_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("csv_size") != os.path.getsize(csv_path):
+            return None
+        return index
+    except (OSError, ValueError):
+        return None
+
+
+def load_index(csv_path: str) -> Dict:
+    """Return a valid index, rebuilding the sidecar first if needed."""
+    index = read_index(csv_path)
+    if index is None:
+        index = build_index(csv_path)
+        write_index(csv_path, index)
+    return index
+
+
+def latest_snapshot(index: Dict) -> Tuple[Optional[str], Dict[str, Tuple[int, int]]]:
+    """Return ``(date, {subject: (buy, sell)})`` for the subjects priced at the newest timestamp."""
+    latest_date = index["latest_date"]
+    return latest_date, {subject: (entry["buy"], entry["sell"])
+                         for subject, entry in index["subjects"].items() if entry["date"] == latest_date}
+
+
+def latest_prices(index: Dict) -> Dict[str, Tuple[int, int]]:
+    """Return ``{subject: (buy, sell)}`` from each subject's last row."""
+    return {subject: (entry["buy"], entry["sell"]) for subject, entry in index["subjects"].items()}
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Latest-prices sidecar index for prices_history.csv.")
+    parser.add_argument("command", choices=["rebuild", "verify", "show"])
+    parser.add_argument("--csv", default="prices_history.csv")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        index = build_index(args.csv)
+        write_index(args.csv, index)
+        logging.info(f"✅ Rebuilt {index_path_for(args.csv)} ({len(index['subjects'])} subjects)")
+    elif args.command == "verify":
+        stored = read_index(args.csv)
+        fresh = build_index(args.csv)
+        if stored is None:
+            logging.error("❌ Index missing or stale (CSV size changed).")
+            sys.exit(1)
+        if stored != fresh:
+            logging.error("❌ Index does not match the CSV; run 'rebuild'.")
+            sys.exit(1)
+        logging.info("✅ Index matches the CSV.")
+    else:
+        index = load_index(args.csv)
+        print(f"Latest snapshot: {index['latest_date']}")
+        for subject, entry in index["subjects"].items():
+            print(f"  • {subject}: buy {entry['buy']:,} / sell {entry['sell']:,} ({entry['date']}, offset {entry['offset']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Timing spans, counters and peak-RSS sampling for the pipeline stages.
+
+    with metrics.span("execute_notebook", notebook=filename) as s:
+        ...
+        if failed:
+            s.status = "error"                # also set when the block raises
+
+    @metrics.timed("save_prices_to_csv")
+    def save_prices_to_csv(...):
+        ...
+        metrics.count("rows", len(prices))   # counts go to the innermost open span
+
+Recording is off until an entry point (update.py, get_report.py,
+generate_pdf_report.py, poller.py) calls ``enable(data_path)``; spans are
+then kept in memory and written when the process exits: one JSON line per
+span is appended to ``metrics.jsonl`` and ``metrics.prom`` is rewritten in
+the Prometheus text format (for node_exporter's textfile collector), both
+next to the data files. Only light standard-library modules are imported up
+front, so instrumented modules stay cheap to import. ``AUTOINVEST_METRICS=off``
+keeps recording off everywhere; ``=on`` turns it on for any process (files in
+the working directory).
+
+Memory is the resident set of the whole process sampled while a span is
+open (``process_peak_rss_kb``), so spans running at the same time in other
+threads (DAG nodes) count towards each other's peak.
+
+    python metrics.py show [--last N]     per-stage time and memory from metrics.jsonl
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+METRICS_FILE = "metrics.jsonl"
+PROM_FILE = "metrics.prom"
+PROM_PREFIX = "autoinvest"
+SAMPLE_INTERVAL = 0.05  # seconds between RSS samples while a span is open
+
+_setting = os.environ.get("AUTOINVEST_METRICS", "").lower()
+_enabled = _setting in ("1", "on", "true", "yes")
+_metrics_path = METRICS_FILE
+_prom_path = PROM_FILE
+_lock = threading.Lock()
+_local = threading.local()
+_open: List["Span"] = []
+_finished: List[Dict] = []
+_sampler: Optional[threading.Thread] = None
+_exit_registered = False
+_run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+profiler = None  # set by profiling.enable(): outermost spans are then profiled one by one
+
+
+def enable(data_path: str = METRICS_FILE) -> bool:
+    """
+    Record spans in this process, writing the metrics files into the directory
+    of ``data_path``. Returns whether recording is on (``AUTOINVEST_METRICS=off`` wins).
+    """
+    global _enabled, _metrics_path, _prom_path
+    if _setting in ("0", "off", "false", "no"):
+        return False
+    directory = os.path.dirname(data_path)
+    _metrics_path = os.path.join(directory, METRICS_FILE)
+    _prom_path = os.path.join(directory, PROM_FILE)
+    _enabled = True
+    return True
+
+
+def _page_size() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+_PAGE = _page_size()
+
+
+def rss_bytes() -> int:
+    """
+    Current resident set size of the process; its peak so far where /proc is
+    not available (macOS), 0 where neither is (Windows).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _sample_loop() -> None:
+    global _sampler
+    while True:
+        time.sleep(SAMPLE_INTERVAL)
+        rss = rss_bytes()
+        with _lock:
+            if not _open:
+                _sampler = None
+                return
+            for s in _open:
+                s.peak_rss = max(s.peak_rss, rss)
+
+
+class Span:
+    """One timed stage. ``count`` adds to a per-span counter (rows, bytes, ...)."""
+
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self.counts: Dict[str, float] = {}
+        self.status = "ok"
+        self.parent: Optional[str] = None
+        self.peak_rss = 0
+        self._start = 0.0
+        self._wall = 0.0
+        self._profile = None
+
+    def count(self, key: str, value: float = 1) -> None:
+        self.counts[key] = self.counts.get(key, 0) + value
+
+    def label(self, key: str, value) -> None:
+        self.labels[key] = str(value)
+
+    def __enter__(self) -> "Span":
+        global _sampler, _exit_registered
+        if not _enabled:
+            if profiler is not None:
+                self._profile = profiler.start(self.name, self.labels)
+            return self
+        stack = _local.__dict__.setdefault("stack", [])
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.peak_rss = rss_bytes()
+        with _lock:
+            _open.append(self)
+            if _sampler is None:
+                _sampler = threading.Thread(target=_sample_loop, name="metrics-rss", daemon=True)
+                _sampler.start()
+            if not _exit_registered:
+                atexit.register(flush)
+                _exit_registered = True
+        self._wall = time.time()
+        self._start = time.perf_counter()
+        if profiler is not None:
+            self._profile = profiler.start(self.name, self.labels)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profile is not None:
+            profiler.stop(self._profile)
+        if not _enabled:
+            return
+        seconds = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.status = "error"
+        _local.stack.remove(self)
+        rss = rss_bytes()
+        with _lock:
+            _open.remove(self)
+            self.peak_rss = max(self.peak_rss, rss)
+            _finished.append({
+                "run": _run_id, "span": self.name, "parent": self.parent,
+                "start": datetime.fromtimestamp(self._wall).isoformat(timespec="milliseconds"),
+                "seconds": round(seconds, 6), "status": self.status,
+                "process_peak_rss_kb": self.peak_rss // 1024, "counts": self.counts, "labels": self.labels,
+            })
+
+
+def span(name: str, **labels) -> Span:
+    return Span(name, {key: str(value) for key, value in labels.items()})
+
+
+def current() -> Optional[Span]:
+    """Innermost open span of this thread, if any."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def count(key: str, value: float = 1) -> None:
+    """Add to a counter of the innermost open span (no-op outside spans)."""
+    s = current()
+    if s is not None:
+        s.count(key, value)
+
+
+def timed(name: Optional[str] = None):
+    """Decorator: run the function inside a span named ``name`` (default: module.function)."""
+    def decorate(func):
+        span_name = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---- export ----------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _rss_kb(span_record: Dict) -> int:
+    # Lines written before the field was renamed carry "peak_rss_kb"
+    return span_record.get("process_peak_rss_kb", span_record.get("peak_rss_kb", 0))
+
+
+def _prom_lines(spans: List[Dict]) -> Dict[str, List[str]]:
+    """Samples per metric name for the stages in ``spans`` (values of this run)."""
+    stages: Dict[str, Dict] = {}
+    for s in spans:
+        st = stages.setdefault(s["span"], {"seconds": 0.0, "calls": 0, "errors": 0, "rss": 0, "counts": {},
+                                           "end": 0.0})
+        st["seconds"] += s["seconds"]
+        st["calls"] += 1
+        st["errors"] += s["status"] == "error"
+        st["rss"] = max(st["rss"], _rss_kb(s) * 1024)
+        st["end"] = max(st["end"], datetime.fromisoformat(s["start"]).timestamp() + s["seconds"])
+        for key, value in s["counts"].items():
+            st["counts"][key] = st["counts"].get(key, 0) + value
+
+    samples: Dict[str, List[str]] = {}
+
+    def add(metric, labels, value):
+        text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        samples.setdefault(metric, []).append(f"{PROM_PREFIX}_{metric}{{{text}}} {value:g}")
+
+    for stage, st in stages.items():
+        add("stage_duration_seconds", {"stage": stage}, round(st["seconds"], 6))
+        add("stage_calls", {"stage": stage}, st["calls"])
+        add("stage_errors", {"stage": stage}, st["errors"])
+        add("stage_process_peak_rss_bytes", {"stage": stage}, st["rss"])
+        add("stage_last_run_timestamp_seconds", {"stage": stage}, round(st["end"], 3))
+        for key, value in sorted(st["counts"].items()):
+            add("stage_items", {"stage": stage, "item": key}, value)
+    return samples
+
+
+PROM_HELP = {
+    "stage_duration_seconds": "Wall time of the stage in its last run (summed over calls)",
+    "stage_calls": "Times the stage ran in its last run",
+    "stage_errors": "Calls of the stage that raised in its last run",
+    "stage_process_peak_rss_bytes": "Peak resident memory of the whole process while the stage ran "
+                                    "(includes stages running at the same time)",
+    "stage_last_run_timestamp_seconds": "When the stage last finished (Unix time)",
+    "stage_items": "Rows, bytes and other items handled by the stage in its last run",
+}
+_STAGE_LABEL = r'stage="((?:[^"\\]|\\.)*)"'
+
+
+def write_prom(spans: List[Dict], path: str = PROM_FILE) -> None:
+    """
+    Rewrite ``path`` with the stages in ``spans``; stages from other processes'
+    runs (e.g. the report after the update) are kept as they were.
+    """
+    import re
+    stage_label = re.compile(_STAGE_LABEL)
+    samples = _prom_lines(spans)
+    fresh = {stage for lines in samples.values() for line in lines for stage in stage_label.findall(line)}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                m = stage_label.search(line)
+                if line.startswith("#") or not m or m.group(1) in fresh:
+                    continue
+                metric = line.split("{", 1)[0][len(PROM_PREFIX) + 1:]
+                samples.setdefault(metric, []).append(line.rstrip("\n"))
+    except OSError:
+        pass
+    out = []
+    for metric in PROM_HELP:
+        if metric in samples:
+            out += [f"# HELP {PROM_PREFIX}_{metric} {PROM_HELP[metric]}", f"# TYPE {PROM_PREFIX}_{metric} gauge"]
+            out += sorted(samples[metric])
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+    os.replace(tmp_path, path)
+
+
+def flush(jsonl_path: Optional[str] = None, prom_path: Optional[str] = None) -> int:
+    """
+    Append the finished spans to ``jsonl_path`` and refresh ``prom_path``
+    (default: the files chosen by ``enable``). Returns the number written.
+    """
+    jsonl_path = jsonl_path or _metrics_path
+    prom_path = prom_path or _prom_path
+    with _lock:
+        spans = list(_finished)
+        _finished.clear()
+    if not spans:
+        return 0
+    try:
+        with open(jsonl_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in spans))
+        write_prom(spans, prom_path)
+    except OSError as e:
+        print(f"⚠️ Could not write metrics: {e}")
+    return len(spans)
+
+
+def discard() -> int:
+    """Drop the finished spans without writing them (a long-running caller's uneventful iterations)."""
+    with _lock:
+        n = len(_finished)
+        _finished.clear()
+    return n
+
+
+# ---- summary ---------------------------------------------------------------
+
+def summarize(jsonl_path: str = METRICS_FILE, last: Optional[int] = None) -> Dict[str, Dict]:
+    """Per-span call count, median / max seconds and max process peak RSS over the last ``last`` runs."""
+    per_run: Dict[str, List[Dict]] = {}
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                s = json.loads(line)
+            except ValueError:
+                continue
+            per_run.setdefault(s["run"], []).append(s)
+    runs = sorted(per_run)[-last:] if last else sorted(per_run)
+    stats: Dict[str, Dict] = {}
+    for run in runs:
+        for s in per_run[run]:
+            st = stats.setdefault(s["span"], {"seconds": [], "rss_kb": 0, "errors": 0, "counts": {}})
+            st["seconds"].append(s["seconds"])
+            st["rss_kb"] = max(st["rss_kb"], _rss_kb(s))
+            st["errors"] += s["status"] == "error"
+            for key, value in s["counts"].items():
+                st["counts"][key] = st["counts"].get(key, 0) + value
+    return stats
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Stage metrics recorded by the pipeline.")
+    parser.add_argument("command", choices=["show"])
+    parser.add_argument("--file", default=METRICS_FILE)
+    parser.add_argument("--last", type=int, default=None, help="only the last N runs (processes)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file):
+        print(f"⚠️ No metrics yet ({args.file})")
+        return
+    stats = summarize(args.file, args.last)
+    print(f"{'stage':<28} {'calls':>6} {'median s':>9} {'max s':>9} {'total s':>9} {'proc RSS':>9}  items")
+    for name, st in sorted(stats.items(), key=lambda kv: -sum(kv[1]["seconds"])):
+        seconds = sorted(st["seconds"])
+        items = ", ".join(f"{k}={v:,.0f}" for k, v in st["counts"].items())
+        errors = f"  ❌ {st['errors']} failed" if st["errors"] else ""
+        print(f"{name:<28} {len(seconds):>6} {seconds[len(seconds) // 2]:>9.3f} {seconds[-1]:>9.3f} "
+              f"{sum(seconds):>9.3f} {st['rss_kb'] / 1024:>7.0f}MB  {items}{errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import urllib3
+
+from http_fetch import HTTP_TIMEOUT, decode_body, get_pool
+from price_parser import TARGETS, PriceRow, PriceTable, parse_price_table
+
+SPREAD_WARNING = 0.02  # warn when sources disagree by more than 2% of the median
+READ_CHUNK = 64 * 1024  # most bytes taken per socket read; the deadline is checked in between
+
+
+@dataclass
+class ExtractionProfile:
+    """
+    How to read prices from one source: the row fragments to look for and how
+    to map that source's subject names onto the canonical ones used in
+    ``prices_history.csv`` (e.g. ``"USD" → "دلار آمریکا"``).
+    """
+    targets: List[str] = field(default_factory=lambda: list(TARGETS))
+    aliases: Dict[str, str] = field(default_factory=dict)
+
+    def canonical(self, subject: str) -> str:
+        return self.aliases.get(subject, subject)
+
+
+@dataclass
+class Source:
+    name: str
+    url: str
+    profile: ExtractionProfile = field(default_factory=ExtractionProfile)
+    timeout: float = HTTP_TIMEOUT
+
+
+SOURCES = [
+    Source("sarafiyaran", "https://www.sarafiyaran.com/"),
+]
+
+
+def load_sources(path: str) -> List[Source]:
+    """
+    Load sources from a JSON list such as::
+
+        [{"name": "sarafiyaran", "url": "https://www.sarafiyaran.com/",
+          "targets": [" دلار آمریکا"], "aliases": {}, "timeout": 5}]
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    sources = []
+    for item in data:
+        profile = ExtractionProfile(targets=item.get("targets", list(TARGETS)), aliases=item.get("aliases", {}))
+        sources.append(Source(item["name"], item["url"], profile, item.get("timeout", HTTP_TIMEOUT)))
+    return sources
+
+
+def _fetch_source_sync(source: Source) -> PriceTable:
+    """
+    Blocking fetch that gives up by itself after about ``source.timeout``.
+
+    urllib3's total timeout bounds connecting and every socket read by the
+    time left, and the body is read in chunks against the same deadline, so
+    a stalled or slowly trickling server cannot keep the worker thread alive
+    much past the timeout.
+    """
+    deadline = time.monotonic() + source.timeout
+    response = get_pool().request("GET", source.url, timeout=urllib3.Timeout(total=source.timeout),
+                                  retries=False, preload_content=False)
+    try:
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        chunks = []
+        while True:
+            chunk = response.read1(READ_CHUNK)  # returns whatever one socket read brings
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"body not received within {source.timeout}s")
+    finally:
+        response.release_conn()
+    html = decode_body(b"".join(chunks), response.headers.get("Content-Type", ""))
+    table = parse_price_table(html, source.profile.targets)
+    table.rows = [PriceRow(source.profile.canonical(r.subject), r.buy_price, r.sell_price) for r in table.rows]
+    return table
+
+
+async def fetch_source(source: Source) -> Optional[PriceTable]:
+    """
+    Fetch and parse one source; returns None on error or timeout.
+
+    The blocking urllib3 request runs in a worker thread. ``wait_for`` stops
+    waiting for it at the timeout, and the thread itself ends shortly after
+    (see ``_fetch_source_sync``), so ``asyncio.run`` does not hang at
+    shutdown waiting for a stalled source.
+    """
+    start = time.perf_counter()
+    try:
+        table = await asyncio.wait_for(asyncio.to_thread(_fetch_source_sync, source), source.timeout)
+    except asyncio.TimeoutError:  # also the deadline TimeoutError raised in the thread
+        logging.warning(f"⏰ {source.name}: timed out after {source.timeout}s")
+        return None
+    except Exception as e:
+        logging.warning(f"⚠️ {source.name}: {e}")
+        return None
+    logging.info(f"✅ {source.name}: {len(table.rows)} prices in {time.perf_counter() - start:.2f}s")
+    return table
+
+
+async def fetch_all(sources: List[Source]) -> Dict[str, PriceTable]:
+    """Fetch every source concurrently; wall time is bounded by the slowest (or its timeout)."""
+    tables = await asyncio.gather(*(fetch_source(s) for s in sources))
+    return {s.name: t for s, t in zip(sources, tables) if t is not None}
+
+
+def reconcile(tables: Dict[str, PriceTable], strategy: str = "median",
+              preferred: Optional[str] = None) -> PriceTable:
+    """
+    Merge per-source tables into one.
+
+    ``strategy="median"`` takes the median buy/sell across sources;
+    ``strategy="preferred"`` takes ``preferred``'s price when it has the
+    subject and falls back to the median of the others. The first row per
+    subject in each source is used. Large disagreements are logged.
+    """
+    if strategy not in ("median", "preferred"):
+        raise ValueError(f"Unknown reconcile strategy: {strategy}")
+
+    quotes: Dict[str, Dict[str, PriceRow]] = {}
+    for name, table in tables.items():
+        for row in table.rows:
+            quotes.setdefault(row.subject, {}).setdefault(name, row)
+
+    rows = []
+    for subject, by_source in quotes.items():
+        buys = [r.buy_price for r in by_source.values()]
+        sells = [r.sell_price for r in by_source.values()]
+        mid = statistics.median(sells)
+        if len(sells) > 1 and mid and (max(sells) - min(sells)) / mid > SPREAD_WARNING:
+            logging.warning(f"⚠️ Sources disagree on '{subject}': "
+                            + ", ".join(f"{n}={r.sell_price:,}" for n, r in by_source.items()))
+        if strategy == "preferred" and preferred in by_source:
+            rows.append(by_source[preferred])
+        else:
+            rows.append(PriceRow(subject, int(statistics.median(buys)), int(mid)))
+
+    dates = sorted(t.date for t in tables.values())
+    return PriceTable(rows=rows, date=dates[-1] if dates else "", backend=f"reconciled:{strategy}")
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    parser = argparse.ArgumentParser(description="Fetch prices from several sources concurrently and reconcile them.")
+    parser.add_argument("--sources", help="JSON file with the source list (default: built-in SOURCES)")
+    parser.add_argument("--strategy", choices=["median", "preferred"], default="median")
+    parser.add_argument("--preferred", help="source name used by --strategy preferred")
+    parser.add_argument("--save", action="store_true", help="append the reconciled prices to prices_history.csv")
+    args = parser.parse_args(argv)
+
+    sources = load_sources(args.sources) if args.sources else SOURCES
+    start = time.perf_counter()
+    tables = asyncio.run(fetch_all(sources))
+    logging.info(f"⏱️ {len(tables)}/{len(sources)} sources answered in {time.perf_counter() - start:.2f}s")
+    if not tables:
+        logging.error("No source returned prices.")
+        return None
+
+    table = reconcile(tables, args.strategy, args.preferred)
+    for row in table.rows:
+        logging.info(f"  • {row.subject}: buy {row.buy_price:,} / sell {row.sell_price:,}")
+    if args.save:
+        from extract_prices import save_prices_to_csv
+        save_prices_to_csv(table.to_records())
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import dag
+import metrics
+
+DEFAULT_HTML = "page.html"
+PRICES_CSV = "prices_history.csv"
+ASSETS_FILE = "user_assets.json"
+ASSETS_SUMMARY_FILE = "assets_summary.csv"
+PORTFOLIO_SUMMARY_FILE = "portfolio_summary.json"
+CHARTS_DIR = "executed_notebooks"
+CHART_CATEGORIES = ["toman", "dollar", "cash"]
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _table(ctx: Dict, html_path: str):
+    """The price table fetched in this run, or the (cached) parse of the saved page."""
+    from price_parser import load_price_table
+    return ctx.get("fetch") or load_price_table(html_path)
+
+
+def update_nodes(interactive: bool = True, fetcher: str = "auto", url: Optional[str] = None,
+                 html_path: str = DEFAULT_HTML, prices_csv: str = PRICES_CSV,
+                 assets_json: str = ASSETS_FILE, output_json: str = PORTFOLIO_SUMMARY_FILE) -> List[dag.Node]:
+    """
+    The ``update.py`` steps as DAG nodes.
+
+    ``extract_prices`` and ``assets_summary`` both need only the parsed page
+    (and the settled holdings) and run side by side. The parsed table and the holdings are passed along
+    in memory; files are written only where the steps persist data. Nothing
+    downstream of the fetch runs again while the page is unchanged.
+    """
+    import latest_index
+    import summary_log
+    from holdings_ledger import ledger_path_for
+
+    def update_assets(ctx):
+        import update_assets
+        return update_assets.interactive(assets_json)
+
+    def holdings_ledger(ctx):
+        # Creates the ledger from user_assets.json on first use
+        from holdings_ledger import HoldingsLedger
+        HoldingsLedger(assets_json)
+
+    def fetch(ctx):
+        import refactored_get_html
+        try:
+            table = refactored_get_html.fetch_snapshot(url or refactored_get_html.DEFAULT_URL, html_path, fetcher)
+        except Exception:
+            logging.exception("❌ Fetch failed")
+            if not os.path.exists(html_path):
+                raise
+            logging.warning(f"⚠️ Continuing with the previous {html_path}")
+            return None
+        if table is None:
+            logging.info("✅ Page unchanged since last fetch")
+        return table
+
+    def extract(ctx):
+        import extract_prices
+        records = _table(ctx, html_path).to_records()
+        if records:
+            extract_prices.save_prices_to_csv(records, prices_csv)
+        else:
+            logging.warning("No prices extracted from HTML.")
+
+    def assets_summary(ctx):
+        import assets_summary
+        return assets_summary.main(_table(ctx, html_path), assets_json)
+
+    def portfo(ctx):
+        import portfo
+        table = ctx.get("fetch")
+        snapshot = None  # read the newest saved prices
+        if table is not None and table.rows:
+            snapshot = (datetime.strptime(table.date, DATE_FORMAT), table.sell_prices())
+        # Holdings come from the ledger: the newest ones, even if changed after the snapshot
+        return portfo.main(prices_csv, assets_json, output_json, snapshot=snapshot)
+
+    # The ledger is created (or changed) here, before anything reads it; user_assets.json is
+    # rewritten with every change, so it alone tells portfo that the holdings moved.
+    if interactive:
+        holdings = dag.Node("update_assets", update_assets, outputs=[assets_json, ledger_path_for(assets_json)],
+                            always=True)
+    else:
+        holdings = dag.Node("holdings_ledger", holdings_ledger, outputs=[ledger_path_for(assets_json)])
+    nodes = [
+        holdings,
+        # After the prompts, so the snapshot is taken once the holdings are settled
+        dag.Node("fetch", fetch, outputs=[html_path], always=True, after=[holdings.name]),
+        dag.Node("extract_prices", extract, inputs=[html_path],
+                 outputs=[prices_csv, latest_index.index_path_for(prices_csv)], after=["fetch"]),
+        dag.Node("assets_summary", assets_summary, inputs=[html_path, assets_json], outputs=[ASSETS_SUMMARY_FILE],
+                 after=["fetch", holdings.name]),
+        dag.Node("portfo", portfo, inputs=[latest_index.index_path_for(prices_csv), assets_json],
+                 outputs=[summary_log.log_path_for(output_json)], after=["extract_prices", holdings.name]),
+    ]
+    return nodes
+
+
+def report_nodes(after: Optional[List[str]] = None, json_path: str = PORTFOLIO_SUMMARY_FILE,
+                 prices_csv: str = PRICES_CSV, assets_json: str = ASSETS_FILE,
+                 out_root: str = CHARTS_DIR, jobs: int = 1) -> List[dag.Node]:
+    """
+    ``get_report.py``'s chart engine as DAG nodes: the rollup, the charts,
+    then the PDF.
+
+    All chart categories are rendered by one node so that ``jobs`` worker
+    processes draw them in parallel (threads would serialise on the GIL);
+    the PDF downsamples its images with ``jobs`` processes as well.
+    """
+    import generate_pdf_report
+    import latest_index
+    import rollups
+    import summary_log
+
+    log_path = summary_log.log_path_for(json_path)
+
+    def update_rollups(ctx):
+        return rollups.update_rollups(json_path)
+
+    def render(ctx):
+        import charts
+        rollup = ctx.get("rollups") or rollups.load_rollups(json_path)
+        return charts.render_all(rollup, out_root, categories=CHART_CATEGORIES, jobs=jobs)
+
+    def report(ctx):
+        generate_pdf_report.main(jobs=jobs)
+
+    chart_dirs = [os.path.join(out_root, category) for category in CHART_CATEGORIES]
+    nodes = [dag.Node("rollups", update_rollups, inputs=[log_path],
+                      outputs=[rollups.rollup_path_for(json_path)], after=list(after or []))]
+    nodes.append(dag.Node("charts", render, inputs=[log_path], outputs=chart_dirs, after=["rollups"]))
+    nodes.append(dag.Node("report", report,
+                          inputs=chart_dirs + [log_path, assets_json, latest_index.index_path_for(prices_csv)],
+                          outputs=[generate_pdf_report.REPORT_FILE], after=["charts"]))
+    return nodes
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Fetch prices and update the portfolio in one process.")
+    parser.add_argument("--no-prompt", dest="interactive", action="store_false",
+                        help="do not ask about changed holdings")
+    parser.add_argument("--fetcher", choices=["auto", "http", "selenium"], default="auto")
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--report", action="store_true", help="also render the charts and the PDF report")
+    parser.add_argument("--jobs", type=int, default=4, help="steps run at the same time")
+    parser.add_argument("--report-jobs", type=int, default=os.cpu_count() or 1,
+                        help="with --report: processes drawing the charts and downsampling the images")
+    parser.add_argument("--force", action="store_true", help="run every step even if its inputs are unchanged")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile every step separately (cProfile) into profiles/<run>/")
+    parser.add_argument("--profile-top", type=int, default=15, help="hot functions listed after a --profile run")
+    args = parser.parse_args(argv)
+
+    metrics.enable(PRICES_CSV)
+    if args.profile:
+        import profiling
+        profiling.enable(top=args.profile_top)
+    start = time.perf_counter()
+    nodes = update_nodes(interactive=args.interactive, fetcher=args.fetcher, url=args.url)
+    if args.report:
+        nodes += report_nodes(after=["portfo"], jobs=args.report_jobs)
+    jobs = args.jobs
+    if args.profile:
+        jobs = profiling.dag_jobs(jobs)
+    run = dag.execute(nodes, jobs=jobs, force=args.force)
+    dag.print_timings(run)
+    print(f"✅ Done in {time.perf_counter() - start:.2f} s (including imports)")
+    if run.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Long-running price poller: fetch the page every ``--interval`` seconds and
+store a snapshot only when a price actually moved.
+
+Each poll fetches the page (a ``304 Not Modified`` ends the poll right
+there), parses the price table and compares it with the newest stored
+snapshot (read from the tail of ``prices_history.csv`` at start-up, then
+kept in memory). Only when a buy or sell price differs are
+``prices_history.csv``, ``assets_summary.csv`` and the portfolio summary
+appended and the holdings revalued; an unchanged poll only rewrites the
+small ``poller_heartbeat.json``. Storage and everything downstream (index,
+rollups, charts) therefore grow with price changes, not with the poll rate.
+
+The delay between polls is jittered (``--jitter``, a fraction of the
+interval) so several pollers do not hit the site in lockstep, and doubles
+after every failed poll up to ``--max-backoff``.
+
+    python poller.py --interval 60 --jitter 0.1 --max-backoff 900
+    kill -USR1 <pid>      poll now
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import metrics
+from price_parser import PriceTable
+
+HEARTBEAT_FILE = "poller_heartbeat.json"
+DEFAULT_INTERVAL = 60  # seconds
+DEFAULT_JITTER = 0.1  # ± fraction of the delay
+DEFAULT_MAX_BACKOFF = 15 * 60  # seconds
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def next_delay(interval: float, failures: int = 0, jitter: float = DEFAULT_JITTER,
+               max_backoff: float = DEFAULT_MAX_BACKOFF) -> float:
+    """Seconds until the next poll: ``interval`` doubled per consecutive failure (capped), ± ``jitter``."""
+    delay = min(interval * 2 ** min(failures, 32), max(interval, max_backoff))
+    return max(0.0, delay * random.uniform(1 - jitter, 1 + jitter))
+
+
+PriceKey = Dict[str, Tuple[Tuple[int, int], ...]]
+
+
+def price_key(rows: Iterable[Tuple[str, int, int]]) -> PriceKey:
+    """``{subject: ((buy, sell), ...)}`` with every row of a snapshot, in page order (a subject can have several)."""
+    key: Dict[str, list] = {}
+    for subject, buy, sell in rows:
+        key.setdefault(subject, []).append((buy, sell))
+    return {subject: tuple(prices) for subject, prices in key.items()}
+
+
+def table_key(table: PriceTable) -> PriceKey:
+    return price_key((row.subject, row.buy_price, row.sell_price) for row in table.rows)
+
+
+def stored_key(prices_csv: str) -> PriceKey:
+    """
+    Price key of the newest snapshot in ``prices_csv``.
+
+    Only the tail is read: the sidecar index records the byte offset of each
+    subject's last line, so reading starts at the first line of the newest snapshot.
+    """
+    import latest_index
+    if not os.path.exists(prices_csv):
+        return {}
+    index = latest_index.load_index(prices_csv)
+    latest_date = index["latest_date"]
+    offsets = [entry["offset"] for entry in index["subjects"].values() if entry["date"] == latest_date]
+    if not offsets:
+        return {}
+    with open(prices_csv, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]))
+        f.seek(max(min(offsets), f.tell()))
+        lines = f.read().decode("utf-8").splitlines()
+    rows = []
+    for record in csv.DictReader(lines, fieldnames=header):
+        if record.get("date") != latest_date:
+            continue
+        try:
+            rows.append((record["subject"], int(float(record["buy_price"].replace(",", ""))),
+                         int(float(record["sell_price"].replace(",", "")))))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    return price_key(rows)
+
+
+def changed_subjects(key: PriceKey, last: PriceKey) -> List[str]:
+    """Subjects in ``key`` whose prices differ from ``last`` (or that are new)."""
+    return [subject for subject, prices in key.items() if last.get(subject) != prices]
+
+
+class Poller:
+    """
+    Fetch, compare and persist. ``poll()`` runs one poll and returns
+    ``"changed"``, ``"unchanged"`` or ``"not-modified"``; it raises when the
+    fetch or a write fails.
+    """
+
+    def __init__(self, url: Optional[str] = None, fetcher: str = "auto", html_path: str = "page.html",
+                 prices_csv: str = "prices_history.csv", assets_json: str = "user_assets.json",
+                 output_json: str = "portfolio_summary.json", heartbeat_path: str = HEARTBEAT_FILE):
+        import refactored_get_html
+
+        self.url = url or refactored_get_html.DEFAULT_URL
+        self.fetcher = fetcher
+        self.html_path = html_path
+        self.prices_csv = prices_csv
+        self.assets_json = assets_json
+        self.output_json = output_json
+        self.heartbeat_path = heartbeat_path
+        self.browser = None
+        if fetcher == "selenium":
+            # Keep one browser for the whole run instead of starting Chrome per poll
+            self.browser = refactored_get_html.WarmFetcher(self.url, html_path)
+        self.last = stored_key(prices_csv)
+        self.state = {"pid": os.getpid(), "started": datetime.now().strftime(DATE_FORMAT), "polls": 0,
+                      "changes": 0, "unchanged": 0, "failures": 0, "last_poll": None, "last_change": None,
+                      "last_error": None, "next_poll": None}
+
+    def fetch(self) -> Optional[PriceTable]:
+        import refactored_get_html
+        if self.browser is not None:
+            return self.browser.fetch()
+        return refactored_get_html.fetch_snapshot(self.url, self.html_path, self.fetcher)
+
+    def persist(self, table: PriceTable) -> None:
+        """Append the snapshot to the price history and asset summary and revalue the portfolio."""
+        import assets_summary
+        import extract_prices
+        import portfo
+
+        extract_prices.save_prices_to_csv(table.to_records(), self.prices_csv)
+        assets_summary.main(table, self.assets_json)
+        snapshot = (datetime.strptime(table.date, DATE_FORMAT), table.sell_prices())
+        portfo.main(self.prices_csv, self.assets_json, self.output_json, snapshot=snapshot)
+
+    def poll(self) -> str:
+        self.state["polls"] += 1
+        self.state["last_poll"] = datetime.now().strftime(DATE_FORMAT)
+        table = self.fetch()
+        if table is None:
+            result = "not-modified"
+        elif not table.rows:
+            raise RuntimeError(f"No prices found in {self.html_path}")
+        else:
+            key = table_key(table)
+            changed = changed_subjects(key, self.last)
+            result = "changed" if changed else "unchanged"
+            if changed:
+                self.persist(table)
+                self.last.update(key)
+                self.state["changes"] += 1
+                self.state["last_change"] = table.date
+                logging.info(f"💾 Prices changed ({', '.join(s.strip() for s in changed)}), snapshot stored")
+        if result != "changed":
+            self.state["unchanged"] += 1
+        return result
+
+    def write_heartbeat(self) -> None:
+        tmp_path = self.heartbeat_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.heartbeat_path)
+
+    def close(self) -> None:
+        if self.browser is not None:
+            self.browser.close()
+
+
+def run(poller: Poller, interval: float = DEFAULT_INTERVAL, jitter: float = DEFAULT_JITTER,
+        max_backoff: float = DEFAULT_MAX_BACKOFF, max_polls: Optional[int] = None) -> None:
+    """
+    Poll until SIGINT/SIGTERM (or ``max_polls`` polls). SIGUSR1 polls immediately.
+
+    Metrics of polls that stored nothing are dropped rather than appended to
+    ``metrics.jsonl``, so the metrics file does not grow with the poll rate either.
+    """
+    wake = threading.Event()
+    stop = threading.Event()
+
+    def _request_stop(*_):
+        stop.set()
+        wake.set()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *_: wake.set())
+
+    logging.info(f"🔁 Polling {poller.url} every {interval}s ±{jitter:.0%} (SIGUSR1 to poll now)")
+    failures = 0
+    try:
+        while not stop.is_set():
+            try:
+                result = poller.poll()
+                failures = 0
+                poller.state["last_error"] = None
+            except Exception as e:
+                failures += 1
+                poller.state["failures"] += 1
+                poller.state["last_error"] = f"{type(e).__name__}: {e}"
+                logging.exception(f"❌ Poll failed ({failures} in a row)")
+                result = "error"
+            if result in ("changed", "error"):
+                metrics.flush()
+            else:
+                metrics.discard()
+                logging.info(f"✅ No price change ({result})")
+
+            delay = next_delay(interval, failures, jitter, max_backoff)
+            poller.state["next_poll"] = datetime.fromtimestamp(time.time() + delay).strftime(DATE_FORMAT)
+            poller.write_heartbeat()
+            if max_polls is not None and poller.state["polls"] >= max_polls:
+                break
+            wake.wait(delay)
+            wake.clear()
+    finally:
+        poller.close()
+    logging.info(f"👋 Poller stopped after {poller.state['polls']} polls, {poller.state['changes']} with changes.")
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                        handlers=[logging.StreamHandler(sys.stdout)])
+    parser = argparse.ArgumentParser(description="Poll the prices and store a snapshot only when they change.")
+    parser.add_argument("--url", default=None, help="page to poll (default: the exchange site)")
+    parser.add_argument("--fetcher", choices=["auto", "http", "selenium"], default="auto",
+                        help="auto: plain HTTP first, browser only if the price table is missing")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER,
+                        help="random spread of each delay as a fraction of it (0.1 = ±10%%)")
+    parser.add_argument("--max-backoff", type=float, default=DEFAULT_MAX_BACKOFF,
+                        help="longest delay after repeated failures, in seconds")
+    parser.add_argument("--polls", type=int, default=None, help="stop after this many polls")
+    parser.add_argument("--heartbeat", default=HEARTBEAT_FILE, help="status file rewritten after every poll")
+    args = parser.parse_args(argv)
+    if not 0 <= args.jitter < 1:
+        parser.error("--jitter must be in [0, 1)")
+
+    poller = Poller(args.url, args.fetcher, heartbeat_path=args.heartbeat)
+    metrics.enable(poller.prices_csv)
+    run(poller, args.interval, args.jitter, args.max_backoff, args.polls)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,44 @@
-import pandas as pd
-import json
 from datetime import datetime
-import os
+import latest_index
+import metrics
+import summary_log
 
-def main(
-    prices_csv: str = "prices_history.csv",
-    assets_json: str = "user_assets.json",
-    output_json: str = "portfolio_summary.json"
-):
-    # 1) Load user assets
-    with open(assets_json, 'r', encoding='utf-8') as f:
-        assets: dict[str, float] = json.load(f)
-    
-    # 2) Load price history (long format) and clean numeric columns
-    df = pd.read_csv(prices_csv)
-    # Ensure sell_price is float (remove commas if present)
-    df['sell_price'] = (
-        df['sell_price']
-        .astype(str)
-        .str.replace(',', '', regex=False)
-        .astype(float)
-    )
-    # Parse dates
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # 3) Find the timestamp of the latest prices
-    latest_time = df['date'].max()
-    latest_df = df[df['date'] == latest_time]
-    
-    # 4) Build a dict: subject → latest sell_price
-    latest_prices = dict(zip(latest_df['subject'], latest_df['sell_price']))
-    
+# numpy (price_store) and the rollups (pandas) are imported where they are used,
+# so importing this module for build_summary stays cheap.
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def load_latest_snapshot(prices_csv: str):
+    """
+    Return (latest_time, {subject: sell_price}) for the newest snapshot.
+
+    Uses the latest-prices sidecar index when it is up to date, then the
+    tail of the columnar store, and only falls back to rebuilding the index
+    from the CSV.
+    """
+    index = latest_index.read_index(prices_csv)
+    if index is not None and index["latest_date"] is not None:
+        latest_date, prices = latest_index.latest_snapshot(index)
+        latest_time = datetime.strptime(latest_date, DATE_FORMAT)
+        return latest_time, {subject: sell for subject, (buy, sell) in prices.items()}
+
+    from price_store import PriceStore, from_epoch, store_path_for
+    store = PriceStore(store_path_for(prices_csv))
+    if store.exists:
+        ts, prices = store.latest_snapshot()
+        if ts is None:
+            raise ValueError(f"No prices in {store.path}")
+        latest_time = datetime.strptime(from_epoch(ts), DATE_FORMAT)
+        return latest_time, {subject: sell for subject, (buy, sell) in prices.items()}
+
+    # Neither is available: rebuild the index in one streaming pass over the CSV
+    # (constant memory) so the next run reads it directly.
+    latest_date, prices = latest_index.latest_snapshot(latest_index.load_index(prices_csv))
+    if latest_date is None:
+        raise ValueError(f"No prices in {prices_csv}")
+    return datetime.strptime(latest_date, DATE_FORMAT), {subject: sell for subject, (buy, sell) in prices.items()}
+
+def build_summary(assets: dict, latest_time: datetime, latest_prices: dict) -> dict:
+    """Value ``assets`` at ``latest_prices`` (subject → sell price) and return the summary record."""
     # 5) Compute assets_rial (skip cash "ریال")
     assets_rial = 0.0
     for asset_name, amount in assets.items():
@@ -53,30 +61,68 @@ def main(
     total_dollar = round(total_toman / (dollar_price + 10_000), 2)
     
     # 9) Build the new summary record
-    summary = {
+    return {
         "datetime": latest_time.strftime("%Y-%m-%d %H:%M:%S"),
         "total_toman": total_toman,
         "total_dollar": total_dollar,
         "cash_toman": cash_toman
     }
-    
-    # 10) Load existing portfolio_summary.json (or start fresh)
-    data = []
-    if os.path.exists(output_json) and os.path.getsize(output_json) > 0:
-        with open(output_json, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    
-    # 11) Append new record and save
-    data.append(summary)
-    with open(output_json, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def record_summary(summary: dict, output_json: str = "portfolio_summary.json"):
+    # 10-11) Append the new record to the summary log (O(1), fsynced);
+    # portfolio_summary.json itself is refreshed by summary_log.compact()
+    summary_log.append_record(output_json, summary)
+    # Fold the new record into the year/month/day rollup the charts read
+    import rollups
+    rollups.update_rollups(output_json)
     
     # 12) Print feedback
     print(f"[{summary['datetime']}] New record added:")
     print(f"  • total_toman   = {summary['total_toman']:,} toman (incl. cash)")
     print(f"  • total_dollar  = {summary['total_dollar']:,} USD")
     print(f"  • cash_toman    = {summary['cash_toman']:,} toman")
+
+@metrics.timed("portfo.main")
+def main(
+    prices_csv: str = "prices_history.csv",
+    assets_json: str = "user_assets.json",
+    output_json: str = "portfolio_summary.json",
+    assets: dict = None,
+    snapshot=None
+):
+    """
+    Append a portfolio summary for the newest prices.
+
+    The holdings are the newest ones in the ledger next to ``assets_json``
+    (see ``holdings_ledger.py``), including changes recorded after the
+    snapshot, e.g. when the page was unchanged and an older snapshot is
+    revalued; the record is then dated at that change. Historical
+    revaluation (``valuation.py``) uses the holdings in effect at each
+    snapshot instead. ``assets`` and ``snapshot`` (``(latest_time,
+    {subject: sell_price})``) let an in-process caller such as
+    ``pipeline.py`` pass data it already holds instead of having it re-read
+    from disk.
+    """
+    # 1-4) Latest timestamp and subject → latest sell_price
+    latest_time, latest_prices = snapshot or load_latest_snapshot(prices_csv)
+
+    # 5) Current holdings from the append-only ledger: as of the snapshot time,
+    # or of the newest change when it was recorded after the snapshot
+    if assets is None:
+        from holdings_ledger import HoldingsLedger
+        ledger = HoldingsLedger(assets_json)
+        valued_at = max(latest_time.strftime(DATE_FORMAT), ledger.newest_effective or "")
+        assets = ledger.as_of(valued_at)
+        # The record is dated at the valuation time, so a holdings change on an unchanged page gets its own record
+        latest_time = datetime.strptime(valued_at, DATE_FORMAT)
     
+    summary = build_summary(assets, latest_time, latest_prices)
+    # Same record as the last one (e.g. a forced rerun): nothing new to log. A back-dated holdings
+    # change keeps the datetime but changes the values, so it is recorded.
+    if summary_log.last_record(output_json) == summary:
+        print(f"[{summary['datetime']}] Already recorded, summary unchanged.")
+        return summary
+    record_summary(summary, output_json)
     return summary
 
 if __name__ == "__main__":
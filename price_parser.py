@@ -0,0 +1,291 @@
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import metrics
+
+TARGETS = [" دلار آمریکا", "تمام امامی", "تمام بهار", "نیم بهار", "ربع بهار"]
+BACKEND_ENV = "PRICE_PARSER_BACKEND"
+BACKEND_PREFERENCE = ["selectolax", "lxml", "bs4"]
+SIDECAR_SUFFIX = ".prices.json"
+
+
+@dataclass(frozen=True)
+class PriceRow:
+    subject: str
+    buy_price: int
+    sell_price: int
+
+
+@dataclass
+class PriceTable:
+    """
+    Typed prices extracted from one page snapshot.
+
+    Rows keep the order of ``TARGETS`` and then document order, exactly like
+    the records produced by ``extract_prices.extract_prices_from_html``.
+    """
+    rows: List[PriceRow]
+    date: str
+    backend: str = ""
+
+    def get(self, subject: str) -> Optional[PriceRow]:
+        for row in self.rows:
+            if row.subject == subject:
+                return row
+        return None
+
+    def buy_prices(self) -> Dict[str, int]:
+        return {row.subject: row.buy_price for row in self.rows}
+
+    def sell_prices(self) -> Dict[str, int]:
+        return {row.subject: row.sell_price for row in self.rows}
+
+    def to_records(self) -> List[Dict]:
+        """Return rows in the ``prices_history.csv`` record format (comma-grouped price strings)."""
+        return [{
+            "subject": row.subject,
+            "buy_price": f"{row.buy_price:,}",
+            "sell_price": f"{row.sell_price:,}",
+            "date": self.date
+        } for row in self.rows]
+
+    def to_dict(self) -> Dict:
+        return {"date": self.date, "backend": self.backend, "rows": [asdict(row) for row in self.rows]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PriceTable":
+        return cls(rows=[PriceRow(**row) for row in data["rows"]], date=data["date"], backend=data.get("backend", ""))
+
+
+###########################################################
+# Parser backends
+#
+# A backend exposes the handful of tree operations the row index needs, so
+# the extraction logic is written once and runs on any of them.
+
+class _Bs4Backend:
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def parse(self, html: str):
+        return self._soup(html, "html.parser")
+
+    def tables(self, doc):
+        return doc.find_all("table")
+
+    def rows(self, table):
+        return table.find_all("tr")
+
+    def cells(self, row):
+        return row.find_all("td")
+
+    def text(self, node) -> str:
+        return node.text
+
+
+class _LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.etree
+        import lxml.html
+        self._fromstring = lxml.html.fromstring
+        self._parser_error = lxml.etree.ParserError
+
+    def parse(self, html: str):
+        # lxml refuses documents without elements ("Document is empty"); the
+        # other backends return an empty document, so do the same here.
+        try:
+            return self._fromstring(html)
+        except self._parser_error:
+            return self._fromstring("<html></html>")
+
+    def tables(self, doc):
+        return doc.iter("table")
+
+    def rows(self, table):
+        return table.iter("tr")
+
+    def cells(self, row):
+        return list(row.iter("td"))
+
+    def text(self, node) -> str:
+        return node.text_content()
+
+
+class _SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        except ImportError:
+            from selectolax.parser import HTMLParser
+        self._parser = HTMLParser
+
+    def parse(self, html: str):
+        return self._parser(html)
+
+    def tables(self, doc):
+        return doc.css("table")
+
+    def rows(self, table):
+        return table.css("tr")
+
+    def cells(self, row):
+        return row.css("td")
+
+    def text(self, node) -> str:
+        return node.text(deep=True)
+
+
+_BACKENDS = {
+    "bs4": _Bs4Backend,
+    "lxml": _LxmlBackend,
+    "selectolax": _SelectolaxBackend,
+}
+_backend_cache: Dict[str, object] = {}
+
+
+def get_backend(name: Optional[str] = None):
+    """
+    Return a parser backend by name, or the fastest installed one.
+
+    The choice can be forced with the ``PRICE_PARSER_BACKEND`` environment
+    variable. BeautifulSoup is always available as the fallback.
+    """
+    name = name or os.environ.get(BACKEND_ENV)
+    candidates = [name] if name else BACKEND_PREFERENCE
+    for candidate in candidates:
+        if candidate not in _BACKENDS:
+            raise ValueError(f"Unknown parser backend: {candidate}")
+        if candidate in _backend_cache:
+            return _backend_cache[candidate]
+        try:
+            backend = _BACKENDS[candidate]()
+        except ImportError:
+            if name:
+                raise
+            continue
+        _backend_cache[candidate] = backend
+        return backend
+    raise ImportError("No HTML parser backend available")
+
+
+###########################################################
+# Extraction
+
+def build_row_index(doc, backend, targets: List[str] = TARGETS) -> Dict[str, list]:
+    """
+    Walk the document's tables once and index the first matching row per table for each target.
+
+    Each table's text is computed a single time and checked against all
+    targets; only tables that contain at least one target have their rows
+    visited, and only until every target found in that table is answered.
+
+    Args:
+        doc: Document returned by ``backend.parse``.
+        backend: Parser backend from ``get_backend``.
+        targets (list[str]): Subject fragments to look for.
+
+    Returns:
+        dict[str, list]: Target → list of cell lists, in document order.
+    """
+    index = {target: [] for target in targets}
+
+    for table in backend.tables(doc):
+        table_text = backend.text(table)
+        pending = [target for target in targets if target in table_text]
+        for row in backend.rows(table) if pending else ():
+            row_text = backend.text(row)
+            matched = [target for target in pending if target in row_text]
+            if not matched:
+                continue
+            cells = backend.cells(row)
+            for target in matched:
+                pending.remove(target)
+                if len(cells) >= 3:
+                    index[target].append(cells)
+            if not pending:
+                break
+    return index
+
+
+def _to_int(text: str) -> int:
+    return int(text.strip().replace(",", ""))
+
+
+@metrics.timed("parse_price_table")
+def parse_price_table(html_content: str, targets: List[str] = TARGETS, backend=None) -> PriceTable:
+    """
+    Parse HTML once and return the typed price table for ``targets``.
+
+    Args:
+        html_content (str): Raw HTML content.
+        targets (list[str]): Subject fragments to look for.
+        backend: Parser backend or backend name; defaults to ``get_backend()``.
+
+    Returns:
+        PriceTable: Extracted prices.
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_backend(backend)
+    doc = backend.parse(html_content)
+    index = build_row_index(doc, backend, targets)
+    rows = []
+
+    for target in targets:
+        for cells in index[target]:
+            subject = backend.text(cells[0]).strip().replace("\u00a0", " ").strip()
+            try:
+                rows.append(PriceRow(subject, _to_int(backend.text(cells[1])), _to_int(backend.text(cells[2]))))
+            except ValueError:
+                logging.warning(f"⚠️ Skipping non-numeric price row for '{subject}'")
+    metrics.count("chars", len(html_content))
+    metrics.count("rows", len(rows))
+    return PriceTable(rows=rows, date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"), backend=backend.name)
+
+
+def _source_stamp(html_path: str) -> Dict:
+    st = os.stat(html_path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def load_price_table(html_path: str = "page.html", targets: List[str] = TARGETS) -> PriceTable:
+    """
+    Return the price table for a saved snapshot, parsing it at most once.
+
+    The parsed table is stored next to the snapshot in ``<html_path>.prices.json``
+    together with the snapshot's mtime and size. Later callers (in this or
+    another process) reuse it as long as the snapshot file is unchanged.
+    """
+    stamp = _source_stamp(html_path)
+    sidecar = html_path + SIDECAR_SUFFIX
+
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("source") == stamp and cached.get("targets") == targets:
+                return PriceTable.from_dict(cached["table"])
+        except (ValueError, KeyError, TypeError):
+            logging.warning(f"⚠️ Ignoring unreadable price cache {sidecar}")
+
+    with open(html_path, "r", encoding="utf-8") as f:
+        table = parse_price_table(f.read(), targets)
+
+    # A private temp file: steps running side by side may parse the same snapshot at once
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(sidecar) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(os.path.abspath(sidecar)))
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"source": stamp, "targets": targets, "table": table.to_dict()}, f, ensure_ascii=False)
+    os.replace(tmp_path, sidecar)
+    return table
@@ -0,0 +1,303 @@
+import argparse
+import calendar
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+SUBJECTS_FILE = "subjects.json"
+TAIL_CHUNK = 4096  # rows read by the first step when scanning backwards for the latest prices
+
+# column name → dtype; each column is one raw little-endian file "<name>.bin"
+COLUMNS = {
+    "ts": np.dtype("<i8"),       # epoch seconds of the snapshot's local wall-clock time
+    "subject": np.dtype("<u2"),  # index into subjects.json
+    "buy": np.dtype("<i8"),
+    "sell": np.dtype("<i8"),
+}
+
+
+def to_epoch(date_str: str) -> int:
+    """Encode a naive ``%Y-%m-%d %H:%M:%S`` timestamp as seconds, treating it as UTC so it round-trips exactly."""
+    return calendar.timegm(time.strptime(date_str, DATE_FORMAT))
+
+
+def from_epoch(ts: int) -> str:
+    return time.strftime(DATE_FORMAT, time.gmtime(int(ts)))
+
+
+def store_path_for(csv_path: str) -> str:
+    """Directory of the columnar store that mirrors ``csv_path`` (``prices_history.csv`` → ``prices_history_store``)."""
+    return os.path.splitext(csv_path)[0] + "_store"
+
+
+def _to_int(value) -> int:
+    return int(float(str(value).replace(",", "").replace('"', "")))
+
+
+class PriceStore:
+    """
+    Append-only columnar price history on top of memory-mapped NumPy files.
+
+    Each row is (ts, subject code, buy, sell) with integer prices. Appends
+    only touch the end of four small files; readers memory-map them, so the
+    "latest prices" lookup reads just the tail regardless of history length.
+    Rows are expected to be appended in time order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._subjects: Optional[List[str]] = None
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, SUBJECTS_FILE))
+
+    # ---- subjects -----------------------------------------------------------
+
+    @property
+    def subjects(self) -> List[str]:
+        if self._subjects is None:
+            try:
+                with open(os.path.join(self.path, SUBJECTS_FILE), "r", encoding="utf-8") as f:
+                    self._subjects = json.load(f)
+            except FileNotFoundError:
+                self._subjects = []
+        return self._subjects
+
+    def _codes(self, names: List[str]) -> np.ndarray:
+        subjects = self.subjects
+        lookup = {name: i for i, name in enumerate(subjects)}
+        added = False
+        codes = []
+        for name in names:
+            if name not in lookup:
+                lookup[name] = len(subjects)
+                subjects.append(name)
+                added = True
+            codes.append(lookup[name])
+        if added or not self.exists:
+            os.makedirs(self.path, exist_ok=True)
+            tmp_path = os.path.join(self.path, SUBJECTS_FILE + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(subjects, f, ensure_ascii=False)
+            os.replace(tmp_path, os.path.join(self.path, SUBJECTS_FILE))
+        return np.asarray(codes, dtype=COLUMNS["subject"])
+
+    # ---- writing ------------------------------------------------------------
+
+    def append(self, records: List[Dict]) -> int:
+        """Append price records in the ``prices_history.csv`` format. Returns the number of rows written."""
+        if not records:
+            return 0
+        columns = {
+            "ts": np.asarray([to_epoch(r["date"]) for r in records], dtype=COLUMNS["ts"]),
+            "subject": self._codes([r["subject"] for r in records]),
+            "buy": np.asarray([_to_int(r["buy_price"]) for r in records], dtype=COLUMNS["buy"]),
+            "sell": np.asarray([_to_int(r["sell_price"]) for r in records], dtype=COLUMNS["sell"]),
+        }
+        self.append_columns(columns)
+        return len(records)
+
+    def append_columns(self, columns: Dict[str, np.ndarray]) -> None:
+        """Append already-typed column arrays of equal length."""
+        n = len(self)
+        # Drop the tail of any column left longer than the others by an interrupted append.
+        for name, dtype in COLUMNS.items():
+            col_path = self._column_path(name)
+            if os.path.exists(col_path) and os.path.getsize(col_path) != n * dtype.itemsize:
+                os.truncate(col_path, n * dtype.itemsize)
+        for name, dtype in COLUMNS.items():
+            with open(self._column_path(name), "ab") as f:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+
+    # ---- reading ------------------------------------------------------------
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def __len__(self) -> int:
+        sizes = []
+        for name, dtype in COLUMNS.items():
+            col_path = self._column_path(name)
+            sizes.append(os.path.getsize(col_path) // dtype.itemsize if os.path.exists(col_path) else 0)
+        return min(sizes)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Return read-only memory-mapped columns (empty arrays for an empty store)."""
+        n = len(self)
+        if n == 0:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        return {name: np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(n,))
+                for name, dtype in COLUMNS.items()}
+
+    def latest_snapshot(self) -> Tuple[Optional[int], Dict[str, Tuple[int, int]]]:
+        """
+        Return ``(ts, {subject: (buy, sell)})`` for the newest timestamp.
+
+        Only the rows sharing the last timestamp are read. Within that
+        snapshot the last row per subject wins.
+        """
+        cols = self.columns()
+        n = len(cols["ts"])
+        if n == 0:
+            return None, {}
+        last_ts = int(cols["ts"][-1])
+        start = n - 1
+        while start > 0 and cols["ts"][start - 1] == last_ts:
+            start -= 1
+        subjects = self.subjects
+        prices = {}
+        for i in range(start, n):
+            prices[subjects[cols["subject"][i]]] = (int(cols["buy"][i]), int(cols["sell"][i]))
+        return last_ts, prices
+
+    def latest(self, subjects: Optional[List[str]] = None) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Return ``{subject: (buy, sell, ts)}`` from each subject's most recent row.
+
+        The tail is scanned backwards in chunks that double in size, each
+        searched at once (``np.unique`` of the reversed codes), until every
+        subject in ``subjects`` (default: all known ones) is found, so a
+        subject that stopped appearing costs a few vectorized passes rather
+        than a Python loop over the whole history.
+        """
+        cols = self.columns()
+        names = self.subjects
+        wanted = set(range(len(names))) if subjects is None else {names.index(s) for s in subjects if s in names}
+        found: Dict[int, int] = {}  # subject code → row of its newest price
+        end, step = len(cols["ts"]), TAIL_CHUNK
+        while end > 0 and len(found) < len(wanted):
+            start = max(0, end - step)
+            codes, first = np.unique(np.asarray(cols["subject"][start:end])[::-1], return_index=True)
+            for code, i in zip(codes.tolist(), first.tolist()):
+                if code in wanted and code not in found:
+                    found[code] = end - 1 - i
+            end, step = start, step * 2
+        return {names[code]: (int(cols["buy"][j]), int(cols["sell"][j]), int(cols["ts"][j]))
+                for code, j in sorted(found.items())}
+
+    def to_dataframe(self, start_ts: Optional[int] = None, end_ts: Optional[int] = None):
+        """
+        Return the history as a DataFrame with the ``prices_history.csv`` columns (typed).
+
+        ``start_ts`` / ``end_ts`` (inclusive, epoch seconds) limit it to a time
+        range; rows are in time order, so only that slice of the columns is read.
+        """
+        import pandas as pd
+        cols = self.columns()
+        lo = 0 if start_ts is None else int(np.searchsorted(cols["ts"], start_ts, side="left"))
+        hi = len(cols["ts"]) if end_ts is None else int(np.searchsorted(cols["ts"], end_ts, side="right"))
+        return pd.DataFrame({
+            "subject": pd.Categorical.from_codes(np.asarray(cols["subject"][lo:hi], dtype=np.int32),
+                                                 categories=self.subjects or ["_"]),
+            "buy_price": np.asarray(cols["buy"][lo:hi]),
+            "sell_price": np.asarray(cols["sell"][lo:hi]),
+            "date": pd.to_datetime(np.asarray(cols["ts"][lo:hi]), unit="s"),
+        })
+
+
+def iter_csv_chunks(csv_path: str = "prices_history.csv", chunk_rows: int = 200_000):
+    """
+    Read ``prices_history.csv`` ``chunk_rows`` rows at a time.
+
+    Yields ``(chunk, skipped)``: the chunk with numeric prices, parsed dates
+    and plain-string subjects, and the number of its rows dropped because the
+    date or a price could not be parsed. Only the prices are read as text
+    (they carry thousands separators); nothing is type-inferred.
+    """
+    import pandas as pd
+
+    if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
+        return
+    for chunk in pd.read_csv(csv_path, usecols=["subject", "buy_price", "sell_price", "date"],
+                             dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        yield parse_price_frame(chunk)
+
+
+def parse_price_frame(chunk):
+    """
+    Type a frame of ``prices_history.csv`` text columns.
+
+    Returns ``(frame, skipped)`` like ``iter_csv_chunks``: numeric prices,
+    parsed dates, and the number of rows dropped as unparsable.
+    """
+    import pandas as pd
+
+    dates = pd.to_datetime(chunk["date"], format=DATE_FORMAT, errors="coerce")
+    buy = pd.to_numeric(chunk["buy_price"].str.replace(",", "", regex=False), errors="coerce")
+    sell = pd.to_numeric(chunk["sell_price"].str.replace(",", "", regex=False), errors="coerce")
+    ok = dates.notna() & buy.notna() & sell.notna()
+    return (pd.DataFrame({"subject": chunk["subject"][ok], "buy_price": buy[ok], "sell_price": sell[ok],
+                          "date": dates[ok]}),
+            int((~ok).sum()))
+
+
+def migrate_csv(csv_path: str = "prices_history.csv", store_path: Optional[str] = None,
+                chunk_rows: int = 200_000) -> PriceStore:
+    """
+    Build a columnar store from an existing ``prices_history.csv``.
+
+    The CSV is read in chunks so migration memory stays bounded. Rows whose
+    date or prices cannot be parsed are skipped. Rows are written in file order.
+    """
+    import pandas as pd
+
+    store = PriceStore(store_path or store_path_for(csv_path))
+    if store.exists and len(store):
+        raise FileExistsError(f"Store already contains data: {store.path}")
+    store._codes([])  # create the directory and an empty subject table
+
+    written = skipped = 0
+    for chunk, bad in iter_csv_chunks(csv_path, chunk_rows):
+        skipped += bad
+        if chunk.empty:
+            continue
+        uniques = list(chunk["subject"].unique())
+        code_of = dict(zip(uniques, store._codes(uniques)))
+        store.append_columns({
+            "ts": ((chunk["date"] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy(),
+            "subject": chunk["subject"].map(code_of).to_numpy(),
+            "buy": chunk["buy_price"].to_numpy(),
+            "sell": chunk["sell_price"].to_numpy(),
+        })
+        written += len(chunk)
+    logging.info(f"✅ Migrated {written} rows from {csv_path} to {store.path} ({skipped} skipped)")
+    return store
+
+
+def open_store(csv_path: str = "prices_history.csv") -> PriceStore:
+    """Return the store mirroring ``csv_path``, migrating the CSV on first use."""
+    store = PriceStore(store_path_for(csv_path))
+    if not store.exists:
+        migrate_csv(csv_path, store.path)
+    return store
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Columnar price history store.")
+    parser.add_argument("command", choices=["migrate", "latest", "info"])
+    parser.add_argument("--csv", default="prices_history.csv")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        migrate_csv(args.csv)
+        return
+
+    store = PriceStore(store_path_for(args.csv))
+    if args.command == "info":
+        print(f"{store.path}: {len(store):,} rows, {len(store.subjects)} subjects")
+    else:
+        ts, prices = store.latest_snapshot()
+        print(f"Latest snapshot: {from_epoch(ts) if ts is not None else '-'}")
+        for subject, (buy, sell) in prices.items():
+            print(f"  • {subject}: buy {buy:,} / sell {sell:,}")
+
+
+if __name__ == "__main__":
+    main()
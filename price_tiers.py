@@ -0,0 +1,531 @@
+"""
+OHLC tiers for ``prices_history.csv``.
+
+Raw snapshots older than ``--raw-days`` are rolled into per-subject bars at
+three tiers (minute, hour, day): open / high / low / close of the buy and
+the sell price, the number of snapshots and the time of the last one. Each
+tier keeps its bars for its own retention period (``DEFAULT_RETENTION_DAYS``;
+0 keeps them forever) and the compacted rows leave the CSV, so the raw
+history stays a few days long however often prices are polled.
+
+    python price_tiers.py compact [--raw-days 7] [--keep minute=30 hour=365 day=0]
+    python price_tiers.py info
+    python price_tiers.py query --start "2024-01-01 00:00:00" [--end ...] [--resolution hour]
+
+The tiers live in ``prices_history_tiers/``: ``state.json`` plus one
+directory per tier with a NumPy column file per bar field, sorted by bar
+start and memory-mapped by readers (subjects are codes into the tier's
+``subjects.json``, like ``price_store``). Compaction works on whole days
+and never touches the newest snapshot, so every bar of a compacted period
+is complete, re-running it is harmless and the latest-prices index stays valid.
+
+The tiers are there for retention, not speed: reading a slice of the raw
+columnar store is cheaper per row than reading and decoding bars
+(``python -m benchmarks.bench_tiers``), so readers get raw rows wherever
+they are still kept. Range reads (``load_bars`` / ``load_history``) use the
+coarsest tier no longer than the ``resolution`` asked for (default: raw)
+that still holds the start of the range, else the finest one that does.
+Raw rows not compacted yet are folded into the same bars on the fly.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import latest_index
+from file_lock import lock_file
+from price_store import (COLUMNS, DATE_FORMAT, SUBJECTS_FILE, PriceStore, from_epoch, iter_csv_chunks,
+                         migrate_csv, parse_price_frame, store_path_for, to_epoch)
+
+TIERS = ["minute", "hour", "day"]
+TIER_SECONDS = {"raw": 0, "minute": 60, "hour": 3600, "day": 86400}
+TIER_FREQ = {"minute": "min", "hour": "h", "day": "D"}
+DEFAULT_RAW_DAYS = 7
+DEFAULT_RETENTION_DAYS = {"minute": 30, "hour": 365, "day": 0}  # 0 = keep forever
+STATE_FILE = "state.json"
+CHUNK_ROWS = 200_000
+OHLC = {"open": "first", "high": "max", "low": "min", "close": "last"}
+# How partial bars of the same (subject, start) combine; rows must be in time order.
+MERGE = {**{f"{side}_{part}": how for side in ("buy", "sell") for part, how in OHLC.items()},
+         "snapshots": "sum", "last": "max"}
+PRICE_COLUMNS = list(MERGE)[:-2]
+BAR_COLUMNS = ["subject", "start"] + PRICE_COLUMNS + ["snapshots", "last"]
+
+
+def tiers_path_for(csv_path: str) -> str:
+    """Directory of the tiers next to ``csv_path`` (``prices_history.csv`` → ``prices_history_tiers``)."""
+    return os.path.splitext(csv_path)[0] + "_tiers"
+
+
+# ---- bars ----------------------------------------------------------------------
+
+def _empty_bars() -> pd.DataFrame:
+    return pd.DataFrame({col: pd.Series(dtype="datetime64[ns]" if col in ("start", "last") else
+                                        str if col == "subject" else "int64") for col in BAR_COLUMNS})
+
+
+def merge_bars(bars: pd.DataFrame) -> pd.DataFrame:
+    """Combine bars (or partial bars) of the same subject and period, given in time order."""
+    if bars.empty:
+        return _empty_bars()
+    merged = bars.groupby(["subject", "start"], sort=False).agg(MERGE).reset_index()
+    return merged.sort_values(["start", "subject"], kind="stable", ignore_index=True)[BAR_COLUMNS]
+
+
+def make_bars(raw: pd.DataFrame, tier: str) -> pd.DataFrame:
+    """
+    Bars of ``tier`` from raw rows (``subject, buy_price, sell_price, date``, in time order).
+
+    For ``tier == "raw"`` every row becomes a one-snapshot bar starting at its own time.
+    """
+    if raw.empty:
+        return _empty_bars()
+    buy, sell = raw["buy_price"].astype("int64"), raw["sell_price"].astype("int64")
+    start = raw["date"] if tier == "raw" else raw["date"].dt.floor(TIER_FREQ[tier])
+    bars = pd.DataFrame({"subject": raw["subject"].astype(str), "start": start,
+                         **{col: buy if col.startswith("buy") else sell for col in PRICE_COLUMNS},
+                         "snapshots": 1, "last": raw["date"]})
+    if tier == "raw" or not bars.duplicated(["subject", "start"]).any():
+        # Already one row per subject and period (e.g. minute bars of minute snapshots): nothing to merge
+        return bars[BAR_COLUMNS] if tier == "raw" else bars.sort_values(["start", "subject"], kind="stable",
+                                                                         ignore_index=True)[BAR_COLUMNS]
+    return merge_bars(bars)
+
+
+def _swap_dir(tmp_path: str, path: str) -> None:
+    """Put the directory ``tmp_path`` in place of ``path``."""
+    old_path = path + ".old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def read_tier(tiers_dir: str, tier: str, start: Optional[datetime] = None,
+              end: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Bars of ``tier`` that overlap ``[start, end]`` (default: all).
+
+    Columns are memory-mapped and sorted by bar start, so only the slice
+    for the range is read.
+    """
+    path = os.path.join(tiers_dir, tier)
+    if not os.path.exists(os.path.join(path, "last.npy")):
+        return _empty_bars()
+    cols = {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r") for col in BAR_COLUMNS}
+    lo, hi = 0, len(cols["start"])
+    if start is not None:
+        lo = int(np.searchsorted(cols["start"], to_epoch(start.strftime(DATE_FORMAT)) - TIER_SECONDS[tier],
+                                 side="right"))
+    if end is not None:
+        hi = int(np.searchsorted(cols["start"], to_epoch(end.strftime(DATE_FORMAT)), side="right"))
+    bars = pd.DataFrame({col: (pd.to_datetime(np.asarray(values[lo:hi]), unit="s") if col in ("start", "last")
+                               else np.asarray(values[lo:hi])) for col, values in cols.items()})
+    if start is not None:
+        bars = bars[bars["last"] >= start]
+    with open(os.path.join(path, SUBJECTS_FILE), "r", encoding="utf-8") as f:
+        subjects = json.load(f)
+    bars["subject"] = pd.Categorical.from_codes(bars["subject"].astype(np.int32),
+                                                categories=subjects or ["_"]).astype(str)
+    return bars.reset_index(drop=True)
+
+
+def write_tier(tiers_dir: str, tier: str, bars: pd.DataFrame) -> None:
+    """Write ``bars`` (sorted by start) as one ``.npy`` column file each, replacing the tier directory."""
+    path = os.path.join(tiers_dir, tier)
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    subjects = pd.Categorical(bars["subject"])
+    with open(os.path.join(tmp_path, SUBJECTS_FILE), "w", encoding="utf-8") as f:
+        json.dump(list(subjects.categories), f, ensure_ascii=False)
+    for col in BAR_COLUMNS:
+        if col in ("start", "last"):
+            values = ((bars[col] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy(dtype="int64")
+        elif col == "subject":
+            values = subjects.codes.astype(COLUMNS["subject"])
+        else:
+            values = bars[col].to_numpy(dtype="int64")
+        np.save(os.path.join(tmp_path, f"{col}.npy"), values)
+    _swap_dir(tmp_path, path)
+
+
+def load_state(tiers_dir: str) -> Dict:
+    try:
+        with open(os.path.join(tiers_dir, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"compacted_until": None, "tiers": {}}
+
+
+def save_state(tiers_dir: str, state: Dict) -> None:
+    path = os.path.join(tiers_dir, STATE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ---- compaction ----------------------------------------------------------------
+
+def _rebuild_store(csv_path: str) -> None:
+    """Rebuild the columnar store (if there is one) from the compacted CSV and swap it in."""
+    path = store_path_for(csv_path)
+    if not PriceStore(path).exists:
+        return
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    migrate_csv(csv_path, tmp_path)
+    _swap_dir(tmp_path, path)
+
+
+def compact(csv_path: str = "prices_history.csv", raw_days: float = DEFAULT_RAW_DAYS,
+            retention_days: Optional[Dict[str, float]] = None, now: Optional[datetime] = None) -> Dict:
+    """
+    Move raw rows older than ``raw_days`` into the tiers and apply the retention rules.
+
+    The cut is at midnight and never past the day of the newest snapshot.
+    Old rows are aggregated ``CHUNK_ROWS`` at a time while the rows kept are
+    copied through unchanged into the new CSV, so memory does not grow with
+    the history. Bars for the compacted days replace any already stored for
+    them. The CSV, the latest-prices index and the columnar store are
+    replaced afterwards, all under ``file_lock.lock_file``. Returns the new state.
+    """
+    retention = {**DEFAULT_RETENTION_DAYS, **(retention_days or {})}
+    now = now or datetime.now()
+    tiers_dir = tiers_path_for(csv_path)
+    os.makedirs(tiers_dir, exist_ok=True)
+    state = load_state(tiers_dir)
+    keep_from = {tier: now - timedelta(days=days) for tier, days in retention.items() if days}
+
+    with lock_file(csv_path):
+        index = latest_index.load_index(csv_path)
+        if index["latest_date"] is None:
+            return state
+        cutoff = min(now - timedelta(days=raw_days), datetime.strptime(index["latest_date"], DATE_FORMAT))
+        cutoff = cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+        cutoff_str = cutoff.strftime(DATE_FORMAT)
+
+        partial = {tier: [] for tier in TIERS}
+        counts = {"rolled": 0, "kept": 0, "skipped": 0}
+
+        def fold(rows, header):
+            frame = pd.DataFrame(rows, columns=header)[["subject", "buy_price", "sell_price", "date"]]
+            clean, skipped = parse_price_frame(frame)
+            counts["skipped"] += skipped
+            for tier in TIERS:
+                bars = make_bars(clean, tier)
+                if tier in keep_from:
+                    bars = bars[bars["start"] >= keep_from[tier]]
+                partial[tier].append(bars)
+
+        tmp_csv = csv_path + ".tmp"
+        line = [""]  # raw text of the row the reader is on, copied through for kept rows
+
+        def lines(f):
+            for raw in f:
+                line[0] = raw
+                yield raw
+
+        with open(csv_path, "r", encoding="utf-8", newline="") as src, \
+                open(tmp_csv, "w", encoding="utf-8", newline="") as dst:
+            reader = csv.reader(lines(src))
+            header = next(reader, None)
+            dst.write(line[0])
+            date_at = header.index("date")
+            rows = []
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) > date_at and row[date_at] < cutoff_str:
+                    rows.append(row[:len(header)])
+                    counts["rolled"] += 1
+                    if len(rows) >= CHUNK_ROWS:
+                        fold(rows, header)
+                        rows = []
+                else:
+                    dst.write(line[0])
+                    counts["kept"] += 1
+            if rows:
+                fold(rows, header)
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        for tier in TIERS:
+            new = merge_bars(pd.concat(partial[tier], ignore_index=True)) if partial[tier] else _empty_bars()
+            bars = read_tier(tiers_dir, tier)
+            if not new.empty:
+                replaced = bars.set_index(["subject", "start"]).index.isin(new.set_index(["subject", "start"]).index)
+                bars = pd.concat([bars[~replaced], new], ignore_index=True)
+            if tier in keep_from:
+                bars = bars[bars["start"] >= keep_from[tier]]
+            bars = bars.sort_values(["start", "subject"], kind="stable", ignore_index=True)
+            write_tier(tiers_dir, tier, bars)
+            state["tiers"][tier] = {
+                "bars": len(bars),
+                "first": bars["start"].min().strftime(DATE_FORMAT) if len(bars) else None,
+                "last": bars["start"].max().strftime(DATE_FORMAT) if len(bars) else None,
+                "kept_from": keep_from[tier].strftime(DATE_FORMAT) if tier in keep_from else None,
+            }
+
+        if counts["rolled"]:
+            os.replace(tmp_csv, csv_path)
+            latest_index.write_index(csv_path, latest_index.build_index(csv_path))
+            _rebuild_store(csv_path)
+        else:
+            os.remove(tmp_csv)
+
+    state["compacted_until"] = max(state.get("compacted_until") or "", cutoff_str)
+    state.update(raw_days=raw_days, retention_days=retention, updated=now.strftime(DATE_FORMAT))
+    save_state(tiers_dir, state)
+    sizes = ", ".join(f"{tier} {state['tiers'][tier]['bars']:,}" for tier in TIERS)
+    logging.info(f"✅ Rolled {counts['rolled']:,} raw rows before {cutoff_str} into bars ({sizes}); "
+                 f"{counts['kept']:,} raw rows kept, {counts['skipped']} unparsable dropped")
+    return state
+
+
+# ---- queries -------------------------------------------------------------------
+
+def _first_raw_date(csv_path: str) -> Optional[datetime]:
+    """Date of the first data row of the CSV (its oldest raw snapshot)."""
+    try:
+        with open(csv_path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    return datetime.strptime(row["date"], DATE_FORMAT)
+                except (TypeError, ValueError, KeyError):
+                    continue
+    except OSError:
+        pass
+    return None
+
+
+def _available_from(state: Dict, tier: str) -> Optional[datetime]:
+    """Oldest time ``tier`` can still answer for (``None``: nothing was dropped)."""
+    if tier == "raw":
+        until = state.get("compacted_until")
+        return datetime.strptime(until, DATE_FORMAT) if until else None
+    kept_from = state.get("tiers", {}).get(tier, {}).get("kept_from")
+    return datetime.strptime(kept_from, DATE_FORMAT) if kept_from else None
+
+
+def choose_tier(start: datetime, state: Dict, resolution: str = "raw") -> str:
+    """
+    The coarsest tier with bars no longer than ``resolution`` that still
+    reaches back to ``start``; if none that fine does, the finest tier that does.
+    """
+    order = ["raw"] + TIERS
+
+    def covers(tier):
+        since = _available_from(state, tier)
+        return since is None or start >= since
+
+    candidates = [tier for tier in order if TIER_SECONDS[tier] <= TIER_SECONDS[resolution] and covers(tier)]
+    if candidates:
+        return candidates[-1]
+    for tier in order:
+        if covers(tier):
+            return tier
+    return order[-1]
+
+
+def _last_raw_date(csv_path: str) -> Optional[datetime]:
+    """Date of the last data row of the CSV, read from its tail."""
+    try:
+        with open(csv_path, "rb") as f:
+            header = next(csv.reader([f.readline().decode("utf-8")]))
+            f.seek(max(f.tell(), f.seek(0, os.SEEK_END) - 64 * 1024))
+            lines = f.read().decode("utf-8", errors="replace").splitlines()
+    except (OSError, StopIteration):
+        return None
+    for record in reversed(list(csv.DictReader(lines[1:], fieldnames=header))):
+        try:
+            return datetime.strptime(record["date"], DATE_FORMAT)
+        except (TypeError, ValueError, KeyError):
+            continue
+    return None
+
+
+def _last_date(csv_path: str, state: Dict) -> Optional[datetime]:
+    """
+    Time of the newest snapshot: from the latest-prices index, else the
+    columnar store, the CSV tail or, with no raw rows left, the newest bar.
+    """
+    index = latest_index.read_index(csv_path)
+    if index and index["latest_date"]:
+        return datetime.strptime(index["latest_date"], DATE_FORMAT)
+    store = PriceStore(store_path_for(csv_path))
+    if store.exists and len(store):
+        return datetime.strptime(from_epoch(store.columns()["ts"][-1]), DATE_FORMAT)
+    last_raw = _last_raw_date(csv_path)
+    if last_raw is not None:
+        return last_raw
+    return max((datetime.strptime(info["last"], DATE_FORMAT) + timedelta(seconds=TIER_SECONDS[tier] - 1)
+                for tier, info in state.get("tiers", {}).items() if info.get("last")), default=None)
+
+
+def load_raw(csv_path: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Raw rows in ``[start, end]`` as ``subject, buy_price, sell_price, date``
+    (numeric prices, datetime dates): a slice of the columnar store when
+    there is one, otherwise the CSV read chunk by chunk.
+    """
+    store = PriceStore(store_path_for(csv_path))
+    if store.exists and len(store):
+        df = store.to_dataframe(None if start is None else to_epoch(start.strftime(DATE_FORMAT)),
+                                None if end is None else to_epoch(end.strftime(DATE_FORMAT)))
+        df["subject"] = df["subject"].astype(str)
+        return df
+    chunks = []
+    for chunk, _ in iter_csv_chunks(csv_path):
+        if start is not None:
+            chunk = chunk[chunk["date"] >= start]
+        if end is not None:
+            chunk = chunk[chunk["date"] <= end]
+        chunks.append(chunk)
+    if not chunks:
+        return pd.DataFrame(columns=["subject", "buy_price", "sell_price", "date"])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_bars(csv_path: str = "prices_history.csv", start: Optional[datetime] = None,
+              end: Optional[datetime] = None, resolution: str = "raw") -> Tuple[str, pd.DataFrame]:
+    """
+    Bars over ``[start, end]`` (default: all history) from the tier
+    ``choose_tier`` picks; returns ``(tier, bars)`` with ``BAR_COLUMNS``.
+
+    Compacted periods come from the tier file, the raw rows after them are
+    aggregated into the same bars (for ``"raw"``, one bar per row).
+    """
+    tiers_dir, state, start, end, tier = _plan(csv_path, start, end, resolution)
+    if start is None or end is None:  # no history at all
+        return tier, _empty_bars()
+    compacted_until = _available_from(state, "raw")
+    parts = []
+    if tier != "raw" and compacted_until is not None and start < compacted_until:
+        bars = read_tier(tiers_dir, tier, start, end)
+        parts.append(bars[bars["start"] < compacted_until])
+    raw_from = start if compacted_until is None else max(start, compacted_until)
+    if raw_from <= end:
+        parts.append(make_bars(load_raw(csv_path, raw_from, end), tier))
+    parts = [p for p in parts if not p.empty]
+    bars = pd.concat(parts, ignore_index=True) if parts else _empty_bars()
+    return tier, bars
+
+
+def _plan(csv_path: str, start: Optional[datetime], end: Optional[datetime],
+          resolution: str) -> Tuple[str, Dict, Optional[datetime], Optional[datetime], str]:
+    """
+    ``(tiers_dir, state, start, end, tier)`` for a query. A missing ``start``
+    / ``end`` is the oldest / newest time in the data (``None`` when there
+    is no data at all, with tier ``"raw"``).
+    """
+    tiers_dir = tiers_path_for(csv_path)
+    state = load_state(tiers_dir)
+    if start is None:
+        firsts = [datetime.strptime(info["first"], DATE_FORMAT)
+                  for info in state.get("tiers", {}).values() if info.get("first")]
+        first_raw = _first_raw_date(csv_path)
+        start = min(firsts + ([first_raw] if first_raw else []), default=None)
+    if end is None:
+        end = _last_date(csv_path, state)
+    if start is None or end is None:
+        return tiers_dir, state, start, end, "raw"
+    return tiers_dir, state, start, end, choose_tier(start, state, resolution)
+
+
+def load_history(csv_path: str = "prices_history.csv", start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, resolution: str = "raw") -> pd.DataFrame:
+    """
+    Close prices of ``load_bars`` in the raw row format (``subject, buy_price,
+    sell_price, date``), each dated at the last snapshot of its bar. When the
+    raw tier is chosen the raw rows are returned as they are.
+
+    ``resolution="raw"`` over a range reaching into compacted history
+    returns the finest bars left for the compacted part and every raw row
+    after it.
+    """
+    _, state, start, end, tier = _plan(csv_path, start, end, resolution)
+    if tier == "raw" or start is None or end is None:
+        return load_raw(csv_path, start, end)
+    raw = None
+    if resolution == "raw":
+        compacted_until = _available_from(state, "raw")
+        raw = load_raw(csv_path, compacted_until, end)
+        end = compacted_until - timedelta(seconds=1)
+    _, bars = load_bars(csv_path, start, end, tier)
+    history = pd.DataFrame({"subject": bars["subject"], "buy_price": bars["buy_close"],
+                            "sell_price": bars["sell_close"], "date": bars["last"]})
+    history = history.sort_values("date", kind="stable", ignore_index=True)
+    return history if raw is None else pd.concat([history, raw], ignore_index=True)
+
+
+# ---- CLI -----------------------------------------------------------------------
+
+def _parse_keep(items) -> Dict[str, float]:
+    keep = {}
+    for item in items or []:
+        tier, _, days = item.partition("=")
+        try:
+            if tier not in TIER_FREQ:
+                raise ValueError(tier)
+            keep[tier] = float(days)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected TIER=DAYS with TIER in {TIERS}, got {item!r}")
+    return keep
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.strptime(value, DATE_FORMAT) if " " in value else datetime.strptime(value, "%Y-%m-%d")
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="OHLC tiers (minute/hour/day) of the price history.")
+    parser.add_argument("command", choices=["compact", "info", "query"])
+    parser.add_argument("--csv", default="prices_history.csv")
+    parser.add_argument("--raw-days", type=float, default=DEFAULT_RAW_DAYS,
+                        help="compact: raw snapshots older than this many days are rolled into the tiers")
+    parser.add_argument("--keep", nargs="+", metavar="TIER=DAYS",
+                        help="compact: retention per tier, e.g. minute=30 hour=365 day=0 (0 = forever)")
+    parser.add_argument("--start", help="query: 'YYYY-MM-DD[ HH:MM:SS]' (default: oldest data)")
+    parser.add_argument("--end", help="query: 'YYYY-MM-DD[ HH:MM:SS]' (default: newest snapshot)")
+    parser.add_argument("--resolution", choices=["raw"] + TIERS, default="raw",
+                        help="query: coarsest bars wanted (default: raw rows where they are still kept)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        try:
+            keep = _parse_keep(args.keep)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+        compact(args.csv, args.raw_days, keep)
+    elif args.command == "info":
+        state = load_state(tiers_path_for(args.csv))
+        print(f"Raw rows from {state.get('compacted_until') or 'the start'} on: {args.csv} "
+              f"({os.path.getsize(args.csv) / 1e6:.1f} MB)" if os.path.exists(args.csv) else f"No {args.csv}")
+        for tier in TIERS:
+            info = state.get("tiers", {}).get(tier)
+            if info:
+                kept = f"kept from {info['kept_from']}" if info.get("kept_from") else "kept forever"
+                print(f"  • {tier:<6} {info['bars']:>9,} bars  {info['first']} → {info['last']}  ({kept})")
+    else:
+        tier, bars = load_bars(args.csv, parse_time(args.start), parse_time(args.end), args.resolution)
+        print(f"{len(bars):,} {tier} bars")
+        if not bars.empty:
+            print(bars.tail(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Opt-in per-stage profiling (``--profile`` on update.py, get_report.py and
+generate_pdf_report.py).
+
+Every outermost ``metrics`` span of a thread (a DAG node, ``create_report``,
+``execute_notebook`` ...) runs under its own ``cProfile`` profiler, so stages
+running side by side in the DAG threads are profiled separately. From Python
+3.12 cProfile allows only one active profiler per process, so there the DAG
+runs one step at a time while profiling (``dag_jobs``). Work outside
+this process is covered too:
+
+* forked multiprocessing workers (chart and image pools) profile themselves
+  from start-up until they exit;
+* Python child processes are started under ``python -m cProfile``
+  (``python_command``), and Jupyter kernels get an IPython startup script
+  through ``IPYTHONDIR`` (``child_env``).
+
+Everything goes to ``profiles/<run>/``: one ``.pstats`` file per stage or
+process (open with ``python -m pstats`` or snakeviz) plus a ``.collapsed``
+file in the folded-stack format flamegraph.pl, inferno and speedscope read.
+cProfile records callers rather than full stacks, so each function's own time
+is folded onto its heaviest call path. At exit the hottest functions are
+printed and ``summary.txt`` lists the top functions of every stage.
+"""
+import atexit
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PROFILE_ROOT = "profiles"
+PROFILE_ENV = "AUTOINVEST_PROFILE_DIR"
+STAGE_ENV = "AUTOINVEST_PROFILE_STAGE"
+TOP_N = 15
+PER_THREAD = sys.version_info < (3, 12)  # 3.12+: one cProfile profiler per process, not per thread
+
+_run_dir: Optional[str] = None
+_owner_pid: Optional[int] = None  # the process that created the run directory summarizes it
+_top = TOP_N
+_local = threading.local()
+_lock = threading.Lock()
+_used_names: Dict[str, int] = {}
+_exclusive: Optional[cProfile.Profile] = None  # the running stage profiler when not PER_THREAD
+
+KERNEL_STARTUP = '''\
+# Written by profiling.py: profile this IPython kernel until it exits.
+import atexit as _atexit, cProfile as _cProfile, os as _os
+_profile_dir = _os.environ.get("{env}")
+if _profile_dir:
+    _profiler = _cProfile.Profile()
+    _profiler.enable()
+
+    def _dump_profile():
+        _profiler.disable()
+        _stage = _os.environ.get("{stage_env}", "kernel")
+        _profiler.dump_stats(_os.path.join(_profile_dir, f"kernel-{{_stage}}-{{_os.getpid()}}.pstats"))
+
+    _atexit.register(_dump_profile)
+'''
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "stage"
+
+
+def _unique(name: str) -> str:
+    with _lock:
+        n = _used_names.get(name, 0) + 1
+        _used_names[name] = n
+    return name if n == 1 else f"{name}-{n}"
+
+
+def enable(run_dir: Optional[str] = None, top: int = TOP_N) -> str:
+    """
+    Turn profiling on for this process (and the processes it starts) and return the run directory.
+
+    ``run_dir`` defaults to ``profiles/<timestamp>``; a child started with
+    ``--profile-dir`` passes its parent's directory so one run stays together.
+    """
+    global _run_dir, _owner_pid, _top
+    import metrics
+
+    _owner_pid = os.getpid() if run_dir is None else None
+    _run_dir = run_dir or os.path.join(PROFILE_ROOT, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    _top = top
+    os.makedirs(_run_dir, exist_ok=True)
+    os.environ[PROFILE_ENV] = os.path.abspath(_run_dir)
+    metrics.profiler = sys.modules[__name__]
+    from multiprocessing import util
+    util.register_after_fork(sys.modules[__name__], _profile_forked_child)
+    atexit.register(finish)
+    print(f"🔬 Profiling into {_run_dir}/")
+    return _run_dir
+
+
+def enabled() -> bool:
+    return _run_dir is not None
+
+
+def dag_jobs(jobs: int) -> int:
+    """Threads for a DAG run: ``jobs``, or 1 while profiling where profilers cannot run side by side."""
+    if _run_dir is None or PER_THREAD or jobs <= 1:
+        return jobs
+    print(f"🔬 Python {sys.version_info[0]}.{sys.version_info[1]} profiles one step at a time; running the DAG with 1 job")
+    return 1
+
+
+# ---- stages (called by metrics.Span) -----------------------------------------
+
+def start(name: str, labels: Dict[str, str]):
+    """
+    Start profiling a stage on this thread.
+
+    Returns ``None`` if a stage is already profiled on this thread, or on any
+    thread when only one profiler can be active per process.
+    """
+    global _exclusive
+    if _run_dir is None or getattr(_local, "active", False):
+        return None
+    profiler = cProfile.Profile()
+    if not PER_THREAD:
+        with _lock:
+            if _exclusive is not None:
+                return None
+            _exclusive = profiler
+    label = "-".join(_safe(v) for v in labels.values())
+    try:
+        profiler.enable()
+    except ValueError:  # another profiling tool is already active
+        _exclusive = None
+        return None
+    _local.active = True
+    return profiler, _safe(name) + (f"-{label}" if label else "")
+
+
+def stop(handle) -> None:
+    global _exclusive
+    profiler, name = handle
+    profiler.disable()
+    _local.active = False
+    _exclusive = None
+    profiler.dump_stats(os.path.join(_run_dir, _unique(name) + ".pstats"))
+
+
+# ---- child processes -----------------------------------------------------------
+
+def _profile_forked_child(_module) -> None:
+    """After-fork hook of multiprocessing: profile the whole child (a pool worker) and dump it when it exits."""
+    global _used_names, _exclusive
+    from multiprocessing import util
+
+    _used_names = {}
+    if _exclusive is not None:  # inherited from the parent's stage; it would block this child's profiler
+        _exclusive.disable()
+        _exclusive = None
+    _local.active = True  # the child is one stage; spans inside it are not split out
+    profiler = cProfile.Profile()
+
+    def dump():
+        profiler.disable()
+        profiler.dump_stats(os.path.join(_run_dir, f"worker-{os.getpid()}.pstats"))
+
+    # Pool workers leave through os._exit, which skips atexit but runs multiprocessing finalizers.
+    util.Finalize(None, dump, exitpriority=100)
+    profiler.enable()
+
+
+def python_command(args: List[str], name: str) -> List[str]:
+    """``[sys.executable, *args]``, under ``-m cProfile`` writing ``<name>.pstats`` when profiling."""
+    if _run_dir is None:
+        return [sys.executable, *args]
+    out = os.path.join(_run_dir, _unique(_safe(name)) + ".pstats")
+    return [sys.executable, "-m", "cProfile", "-o", out, *args]
+
+
+def child_env(stage: str) -> Optional[Dict[str, str]]:
+    """Environment for a child that starts Jupyter kernels: kernels profile themselves as ``stage``."""
+    if _run_dir is None:
+        return None
+    ipython_dir = os.path.abspath(os.path.join(_run_dir, ".ipython"))
+    startup = os.path.join(ipython_dir, "profile_default", "startup")
+    os.makedirs(startup, exist_ok=True)
+    with open(os.path.join(startup, "00-autoinvest-profile.py"), "w", encoding="utf-8") as f:
+        f.write(KERNEL_STARTUP.format(env=PROFILE_ENV, stage_env=STAGE_ENV))
+    return dict(os.environ, IPYTHONDIR=ipython_dir, **{STAGE_ENV: _safe(stage)})
+
+
+# ---- output --------------------------------------------------------------------
+
+def _func_name(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # built-in
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64) -> Dict[str, float]:
+    """
+    Folded stacks (``caller;...;function`` → seconds of own time).
+
+    Each function's own time is attributed to the call path through its
+    heaviest caller at every level, which is exact for functions reached by
+    a single path and an approximation otherwise.
+    """
+    raw = stats.stats  # func → (cc, nc, tottime, cumtime, callers{caller: (cc, nc, tt, ct)})
+    stacks: Dict[str, float] = {}
+    for func, (_, _, tottime, _, _) in raw.items():
+        if tottime <= 0:
+            continue
+        path = [func]
+        seen = {func}
+        while len(path) < max_depth:
+            callers = raw.get(path[-1], (0, 0, 0, 0, {}))[4]
+            callers = {c: v for c, v in callers.items() if c not in seen}
+            if not callers:
+                break
+            caller = max(callers, key=lambda c: callers[c][3])
+            path.append(caller)
+            seen.add(caller)
+        key = ";".join(_func_name(f) for f in reversed(path))
+        stacks[key] = stacks.get(key, 0.0) + tottime
+    return stacks
+
+
+def write_collapsed(stats: pstats.Stats, path: str) -> None:
+    stacks = collapsed_stacks(stats)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, seconds in sorted(stacks.items()):
+            micros = int(seconds * 1e6)
+            if micros:
+                f.write(f"{stack} {micros}\n")
+
+
+def top_functions(stats: pstats.Stats, n: int) -> List[tuple]:
+    """``(own seconds, cumulative seconds, calls, function)`` of the ``n`` functions with the most own time."""
+    rows = [(tt, ct, nc, _func_name(func)) for func, (_, nc, tt, ct, _) in stats.stats.items()]
+    return sorted(rows, reverse=True)[:n]
+
+
+def finish() -> None:
+    """Write the collapsed stacks and summary for every profile in the run directory and print the hot spots."""
+    global _run_dir
+    run_dir = _run_dir
+    if run_dir is None or os.getpid() != _owner_pid:
+        return
+    _run_dir = None
+
+    files = sorted(f for f in os.listdir(run_dir) if f.endswith(".pstats"))
+    if not files:
+        return
+    overall: Dict[str, List] = {}
+    lines = []
+    for name in files:
+        try:
+            stats = pstats.Stats(os.path.join(run_dir, name))
+        except (OSError, EOFError, TypeError, ValueError):
+            continue
+        stage = name[:-len(".pstats")]
+        write_collapsed(stats, os.path.join(run_dir, stage + ".collapsed"))
+        lines.append(f"\n== {stage}: {stats.total_tt:.3f} s profiled ==")
+        lines.append(f"{'own s':>9} {'cum s':>9} {'calls':>9}  function")
+        for tt, ct, nc, func in top_functions(stats, _top):
+            lines.append(f"{tt:>9.3f} {ct:>9.3f} {nc:>9}  {func}")
+            entry = overall.setdefault(func, [0.0, {}])
+            entry[0] += tt
+            entry[1][stage] = entry[1].get(stage, 0.0) + tt
+    with open(os.path.join(run_dir, "summary.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines).lstrip("\n") + "\n")
+
+    print(f"\n🔬 Hottest functions (own time) across {len(files)} profiles in {run_dir}/:")
+    for func, (seconds, stages) in sorted(overall.items(), key=lambda kv: -kv[1][0])[:_top]:
+        stage = max(stages, key=stages.get)
+        print(f"  {seconds:>8.3f} s  {func}  [{stage}]")
+    print(f"  per-stage top {_top}: {os.path.join(run_dir, 'summary.txt')}; "
+          f"flamegraphs: flamegraph.pl {run_dir}/<stage>.collapsed > stage.svg")
+
@@ -1,11 +1,33 @@
+import argparse
 import logging
+import os
+import signal
 import sys
+import threading
 import time
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+from selenium.webdriver.support.ui import WebDriverWait
+from typing import Optional
+from urllib3.exceptions import HTTPError
+import metrics
+from http_fetch import STATE_SUFFIX, fetch_page_http
+from price_parser import TARGETS, PriceTable, load_price_table
 ###########################################################
 
+DEFAULT_URL = "https://www.sarafiyaran.com/"
+DEFAULT_OUTPUT = "page.html"
+TABLE_WAIT_TIMEOUT = 10  # seconds
+
+# True once any <table> on the page contains one of the target subjects.
+_TABLE_READY_JS = """
+const targets = arguments[0];
+return Array.from(document.querySelectorAll('table'))
+    .some(t => targets.some(x => t.textContent.includes(x)));
+"""
+
+
 def init_driver(headless: bool = True) -> webdriver.Chrome:
     """Initialize and return a configured Chrome WebDriver."""
     options = Options()
@@ -13,36 +35,163 @@ def init_driver(headless: bool = True) -> webdriver.Chrome:
         options.add_argument("--headless")
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    # Return from driver.get() at DOMContentLoaded; wait_for_price_table covers the rest.
+    options.page_load_strategy = "eager"
     return webdriver.Chrome(options=options)
 
 
-def fetch_page(driver: webdriver.Chrome, url: str, output_path: str) -> None:
-    """Navigate to a URL and save the page HTML to a file."""
+def wait_for_price_table(driver: webdriver.Chrome, timeout: float = TABLE_WAIT_TIMEOUT) -> bool:
+    """Wait until the price table is present in the DOM. Returns False on timeout."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(_TABLE_READY_JS, TARGETS)
+        )
+        return True
+    except TimeoutException:
+        logging.warning(f"⚠️ Price table did not appear within {timeout}s")
+        return False
+
+
+@metrics.timed("fetch_page")
+def fetch_page(driver: webdriver.Chrome, url: str, output_path: str,
+               timeout: float = TABLE_WAIT_TIMEOUT) -> None:
+    """Navigate to a URL, wait for the price table and save the page HTML to a file."""
     logging.info(f"🌐 Navigating to {url}")
     driver.get(url)
-    time.sleep(2)  # Wait for dynamic content
+    wait_for_price_table(driver, timeout)
     html = driver.page_source
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(html)
+    metrics.count("chars", len(html))
     logging.info(f"💾 Saved page HTML to {output_path}")
 
 
-def parse_html(html_path: str) -> dict:
-    """Parse HTML and extract desired data (e.g., coin price)."""
-    with open(html_path, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f.read(), "html.parser")
+def parse_html(html_path: str) -> PriceTable:
+    """Parse the saved HTML once and return its price table (cached for later stages)."""
+    table = load_price_table(html_path)
+    if not table.rows:
+        logging.warning("⚠️ Price table not found in HTML")
+    return table
+
+
+class WarmFetcher:
+    """
+    Keep one Chrome session alive and re-fetch the page on demand.
+
+    Browser startup is paid once; each ``fetch()`` only navigates and waits
+    for the price table. A driver that fails to start or crashes is
+    replaced and the fetch retried once.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, output_path: str = DEFAULT_OUTPUT,
+                 headless: bool = True, timeout: float = TABLE_WAIT_TIMEOUT):
+        self.url = url
+        self.output_path = output_path
+        self.headless = headless
+        self.timeout = timeout
+        self.driver = None
+
+    def fetch(self) -> PriceTable:
+        """Fetch one snapshot, save it to ``output_path`` and return its price table."""
+        for attempt in (1, 2):
+            start = time.perf_counter()
+            try:
+                # Inside the retry: a browser that fails to start gets a second try too
+                if self.driver is None:
+                    self.driver = init_driver(headless=self.headless)
+                fetch_page(self.driver, self.url, self.output_path, self.timeout)
+            except WebDriverException:
+                if attempt == 2:
+                    raise
+                logging.warning("⚠️ WebDriver failed, restarting browser")
+                self.close()
+                continue
+            logging.info(f"⏱️ Fetched snapshot in {time.perf_counter() - start:.2f}s")
+            return parse_html(self.output_path)
+
+    def close(self) -> None:
+        if self.driver:
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+            self.driver = None
+
+    def __enter__(self):
+        return self
 
-    # TODO: Customize this selector to your actual HTML element
-    price_tag = soup.select_one("#coin-price")
-    if not price_tag:
-        logging.warning("⚠️ Price element not found in HTML")
-        return {}
+    def __exit__(self, *exc):
+        self.close()
 
-    price = price_tag.get_text(strip=True)
-    return {"coin_price": price}
 
+def fetch_snapshot(url: str, output_path: str, fetcher: str = "auto",
+                   headless: bool = True, timeout: float = TABLE_WAIT_TIMEOUT) -> Optional[PriceTable]:
+    """
+    Fetch one snapshot and return its price table, or None if the page is unchanged.
 
-def main():
+    ``fetcher`` is ``"http"`` (plain HTTP only), ``"selenium"`` (browser only)
+    or ``"auto"``: try plain HTTP first and start the browser only when the
+    server-rendered HTML does not contain the price table.
+    """
+    if fetcher in ("auto", "http"):
+        try:
+            result = fetch_page_http(url, output_path, timeout)
+        except HTTPError:
+            if fetcher == "http":
+                raise
+            logging.warning("⚠️ HTTP fetch failed, falling back to browser")
+            result = None
+
+        if result is not None and result.status == 304:
+            return None
+        if result is not None and result.modified:
+            table = parse_html(output_path)
+            if table.rows or fetcher == "http":
+                return table
+            logging.info("🧭 Price table missing from server HTML, falling back to browser")
+            # Validators of the table-less HTML say nothing about the rendered prices.
+            os.remove(output_path + STATE_SUFFIX)
+        elif fetcher == "http":
+            raise RuntimeError(f"HTTP {result.status} for {url}")
+
+    with WarmFetcher(url, output_path, headless=headless, timeout=timeout) as browser:
+        return browser.fetch()
+
+
+def run_daemon(fetcher: WarmFetcher, interval: float) -> None:
+    """
+    Re-fetch every ``interval`` seconds with a warm driver until SIGINT/SIGTERM.
+
+    Sending SIGUSR1 to the process triggers an immediate fetch. Only the page
+    and its parsed sidecar are refreshed; ``poller.py`` stores the snapshots.
+    """
+    wake = threading.Event()
+    stop = threading.Event()
+
+    def _request_stop(*_):
+        stop.set()
+        wake.set()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *_: wake.set())
+
+    logging.info(f"🔁 Daemon started: every {interval}s (SIGUSR1 to fetch now)")
+    with fetcher:
+        while not stop.is_set():
+            try:
+                table = fetcher.fetch()
+                logging.info(f"✅ Extracted {len(table.rows)} prices ({table.backend})")
+            except Exception:
+                logging.exception("❌ Fetch failed, will retry on next tick.")
+            wake.wait(interval)
+            wake.clear()
+    logging.info("👋 Daemon stopped.")
+
+
+def main(argv=None):
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(levelname)s] %(message)s",
@@ -52,24 +201,33 @@ def main():
         ]
     )
 
-    url = "https://www.sarafiyaran.com/"
-    output_path = "page.html"
-    driver = None
+    parser = argparse.ArgumentParser(description="Fetch the exchange page and save it as HTML.")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--timeout", type=float, default=TABLE_WAIT_TIMEOUT,
+                        help="seconds to wait for the price table")
+    parser.add_argument("--fetcher", choices=["auto", "http", "selenium"], default="auto",
+                        help="auto: plain HTTP first, browser only if the price table is missing")
+    parser.add_argument("--daemon", action="store_true", help="keep the browser warm and re-fetch periodically")
+    parser.add_argument("--interval", type=float, default=60, help="seconds between fetches in daemon mode")
+    parser.add_argument("--no-headless", dest="headless", action="store_false")
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        run_daemon(WarmFetcher(args.url, args.output, headless=args.headless, timeout=args.timeout), args.interval)
+        return
 
     try:
-        driver = init_driver(headless=True)
-        fetch_page(driver, url, output_path)
-        data = parse_html(output_path)
-        logging.info(f"✅ Extracted Data: {data}")
+        data = fetch_snapshot(args.url, args.output, args.fetcher, args.headless, args.timeout)
+        if data is None:
+            logging.info("✅ Page unchanged since last fetch, nothing to parse.")
+            return
+        logging.info(f"✅ Extracted {len(data.rows)} prices ({data.backend}): {data.sell_prices()}")
 
     except Exception as e:
         logging.exception("❌ An unexpected error occurred.")
         sys.exit(1)
 
-    finally:
-        if driver:
-            driver.quit()
-
 
 if __name__ == "__main__":
     main()
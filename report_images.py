@@ -0,0 +1,116 @@
+import hashlib
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Tuple
+
+REPORT_IMAGE_DPI = 150  # pixels per inch of the image as drawn on the page
+CACHE_DIR = ".report_images"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers (SOF0..SOF15 except DHT, JPG and DAC)
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def image_size(path: str) -> Tuple[int, int]:
+    """
+    Return ``(width, height)`` in pixels from the PNG or JPEG header, without decoding pixels.
+    Other formats fall back to Pillow, which also only reads the header.
+    """
+    with open(path, "rb") as f:
+        head = f.read(24)
+        if head[:8] == PNG_SIGNATURE and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    break
+                if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                    continue  # markers without a length field
+                length = struct.unpack(">H", f.read(2))[0]
+                if marker[1] in JPEG_SOF:
+                    height, width = struct.unpack(">xHH", f.read(5))
+                    return width, height
+                f.seek(length - 2, os.SEEK_CUR)
+    from PIL import Image
+    with Image.open(path) as img:
+        return img.size
+
+
+def fit(iw: int, ih: int, max_w: float, max_h: float) -> Tuple[float, float]:
+    """Largest ``(w, h)`` with the aspect ratio of ``iw x ih`` that fits in ``max_w x max_h``."""
+    aspect = iw / ih
+    if (max_w / max_h) > aspect:
+        return max_h * aspect, max_h
+    return max_w, max_w / aspect
+
+
+def _cache_name(path: str, max_px: Tuple[int, int]) -> str:
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{max_px[0]}x{max_px[1]}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + ".png"
+
+
+def prepare_image(job: Tuple[str, Tuple[int, int], str]) -> str:
+    """
+    Downsample one image to at most ``max_px`` pixels and return the path to embed.
+
+    ``job`` is ``(path, max_px, cache_dir)``. Results are cached under
+    ``cache_dir`` by source path, mtime, size and target size, so unchanged
+    charts are not resampled on the next report. Images already small enough,
+    or any image when Pillow is not installed, are returned unchanged.
+    """
+    path, max_px, cache_dir = job
+    iw, ih = image_size(path)
+    if iw <= max_px[0] and ih <= max_px[1]:
+        return path
+    out_path = os.path.join(cache_dir, _cache_name(path, max_px))
+    if os.path.exists(out_path):
+        return out_path
+    try:
+        from PIL import Image
+    except ImportError:
+        return path
+
+    tmp_path = out_path + f".{os.getpid()}.tmp"
+    try:
+        with Image.open(path) as img:
+            img.draft("RGB", max_px)  # lets JPEG decode at a reduced scale
+            img = img.convert("RGB")
+            img.thumbnail(max_px, Image.LANCZOS)
+            img.save(tmp_path, "PNG", optimize=True)
+    except OSError as e:
+        print(f"⚠️ Could not downsample {path}: {e}")
+        return path
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def prepare_images(jobs: List[Tuple[str, Tuple[int, int], str]], workers: int = 1) -> Iterator[str]:
+    """Yield ``prepare_image`` results in order, using a process pool when ``workers > 1``."""
+    if jobs:
+        os.makedirs(jobs[0][2], exist_ok=True)
+    workers = max(1, min(workers, len(jobs)))
+    if workers == 1:
+        for job in jobs:
+            yield prepare_image(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(prepare_image, jobs)
+
+
+def prune_cache(cache_dir: str, keep: Iterable[str]) -> None:
+    """Remove cached images not used by the current report."""
+    if not os.path.isdir(cache_dir):
+        return
+    keep = {os.path.basename(p) for p in keep}
+    for name in os.listdir(cache_dir):
+        if name not in keep:
+            os.remove(os.path.join(cache_dir, name))
+
+
+def pixel_box(w_pt: float, h_pt: float, dpi: int) -> Tuple[int, int]:
+    """Pixel size needed to draw ``w_pt x h_pt`` points at ``dpi``."""
+    return max(1, round(w_pt / 72 * dpi)), max(1, round(h_pt / 72 * dpi))
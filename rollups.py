@@ -0,0 +1,160 @@
+import argparse
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+import summary_log
+
+ROLLUP_SUFFIX = ".rollups.json"
+COLUMNS = ["total_toman", "total_dollar", "cash_toman"]
+# level → length of the "YYYY-MM-DD HH:MM:SS" prefix that identifies the period
+LEVELS = {"year": 4, "month": 7, "day": 10}
+PERIOD_FREQ = {"month": "M", "day": "D"}
+
+
+def rollup_path_for(json_path: str) -> str:
+    """Rollup file next to ``json_path`` (``portfolio_summary.json`` → ``portfolio_summary.rollups.json``)."""
+    return os.path.splitext(json_path)[0] + ROLLUP_SUFFIX
+
+
+@dataclass
+class Rollups:
+    """
+    Last value per year / month / day of every summary column.
+
+    ``levels[level][key]`` holds the newest record of that period (its
+    ``datetime`` plus ``COLUMNS``). ``log_offset`` and ``log_inode`` mark how
+    far into ``portfolio_summary.jsonl`` the rollup has been folded.
+    """
+    levels: Dict[str, Dict[str, Dict]] = field(default_factory=lambda: {level: {} for level in LEVELS})
+    log_offset: int = 0
+    log_inode: int = 0
+
+    @property
+    def latest_datetime(self) -> str:
+        days = self.levels["day"]
+        return max((r["datetime"] for r in days.values()), default="")
+
+    def fold(self, df: pd.DataFrame) -> None:
+        """Merge records (a DataFrame with ``datetime`` and ``COLUMNS``) in one vectorized pass per level."""
+        if df.empty:
+            return
+        df = df.sort_values("datetime", kind="stable")
+        for level, width in LEVELS.items():
+            last = df.assign(_key=df["datetime"].str[:width]).drop_duplicates("_key", keep="last")
+            current = self.levels[level]
+            for row in last[["_key", "datetime"] + COLUMNS].itertuples(index=False):
+                key = row[0]
+                if key not in current or row[1] >= current[key]["datetime"]:
+                    current[key] = dict(zip(["datetime"] + COLUMNS, row[1:]))
+
+    def series(self, level: str, column: str) -> pd.Series:
+        """Last value per period, indexed like the notebooks (int year, monthly/daily ``Period``)."""
+        items = sorted(self.levels[level].items())
+        if level == "year":
+            index = pd.Index([int(k) for k, _ in items], name=level)
+        else:
+            index = pd.PeriodIndex([k for k, _ in items], freq=PERIOD_FREQ[level], name=level)
+        return pd.Series([r[column] for _, r in items], index=index, name=column, dtype="float64")
+
+    def diffs(self, level: str, column: str) -> pd.Series:
+        """Change of the last value from the previous period (profit/loss)."""
+        return self.series(level, column).diff().dropna()
+
+    def to_dict(self) -> Dict:
+        return {"log_offset": self.log_offset, "log_inode": self.log_inode, "levels": self.levels}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Rollups":
+        return cls(levels=data["levels"], log_offset=data["log_offset"], log_inode=data["log_inode"])
+
+
+def _frame(records: List[Dict]) -> pd.DataFrame:
+    df = pd.DataFrame(records, columns=["datetime"] + COLUMNS)
+    return df.dropna(subset=["datetime"]).fillna(0)
+
+
+def load_rollups(json_path: str = "portfolio_summary.json") -> Rollups:
+    try:
+        with open(rollup_path_for(json_path), "r", encoding="utf-8") as f:
+            return Rollups.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return Rollups()
+
+
+def save_rollups(json_path: str, rollups: Rollups) -> None:
+    path = rollup_path_for(json_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(rollups.to_dict(), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _catch_up(json_path: str, log_path: str) -> Tuple[Rollups, bool]:
+    """The persisted rollup with the log lines appended since it was saved folded in; whether any were."""
+    st = os.stat(log_path)
+    rollups = load_rollups(json_path)
+    if rollups.log_inode != st.st_ino or rollups.log_offset > st.st_size:
+        rollups = Rollups(log_inode=st.st_ino)
+    if rollups.log_offset == st.st_size:
+        return rollups, False
+    for records, offset in summary_log.iter_log_chunks(log_path, rollups.log_offset):
+        rollups.fold(_frame(records))
+        rollups.log_offset = offset
+    return rollups, True
+
+
+def update_rollups(json_path: str = "portfolio_summary.json") -> Rollups:
+    """
+    Bring the persisted rollup up to date with the summary log and return it.
+
+    Only log lines appended since the last update are read, in chunks of
+    ``summary_log.CHUNK_RECORDS``, so even a rebuild over years of snapshots
+    holds one chunk plus the periods in memory. If the log was rewritten
+    (compaction gives it a new inode) or shrank, the rollup is rebuilt from
+    scratch.
+    """
+    rollups, changed = _catch_up(json_path, summary_log.migrate(json_path))
+    if changed:
+        save_rollups(json_path, rollups)
+    return rollups
+
+
+def read_rollups(json_path: str = "portfolio_summary.json") -> Rollups:
+    """
+    Like ``update_rollups`` but without writing anything: new log lines are
+    folded in memory only. For readers such as the notebooks, which should
+    not race the pipeline over the rollup file.
+    """
+    log_path = summary_log.log_path_for(json_path)
+    if not os.path.exists(log_path):
+        rollups = Rollups()
+        rollups.fold(_frame(summary_log.read_records(json_path)))
+        return rollups
+    return _catch_up(json_path, log_path)[0]
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Year/month/day last-value rollups of the portfolio summary.")
+    parser.add_argument("command", choices=["update", "rebuild", "show"])
+    parser.add_argument("--json", default="portfolio_summary.json")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild" and os.path.exists(rollup_path_for(args.json)):
+        os.remove(rollup_path_for(args.json))
+    rollups = update_rollups(args.json)
+    if args.command == "show":
+        for level in LEVELS:
+            print(f"{level}: {len(rollups.levels[level])} periods")
+        print(f"latest: {rollups.latest_datetime}")
+    else:
+        logging.info(f"✅ Rollups up to date ({len(rollups.levels['day'])} days)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import json
+import logging
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from file_lock import lock_file
+
+LOG_SUFFIX = ".jsonl"
+TAIL_BLOCK = 4096  # bytes read per step when looking for the last line
+CHUNK_RECORDS = 50_000  # records per chunk for the streaming readers
+
+
+def log_path_for(json_path: str) -> str:
+    """Line-delimited log next to ``json_path`` (``portfolio_summary.json`` → ``portfolio_summary.jsonl``)."""
+    return os.path.splitext(json_path)[0] + LOG_SUFFIX
+
+
+def _fsync_dir(path: str) -> None:
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _write_atomic(path: str, text: Union[str, Iterable[str]]) -> None:
+    """Replace ``path`` with ``text`` (a string or an iterable of string pieces, written as they come)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        if isinstance(text, str):
+            f.write(text)
+        else:
+            f.writelines(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def _load_json_list(json_path: str) -> List[Dict]:
+    if os.path.exists(json_path) and os.path.getsize(json_path) > 0:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    return []
+
+
+def migrate(json_path: str = "portfolio_summary.json") -> str:
+    """Create the log from the existing JSON list (no-op if the log already exists)."""
+    log_path = log_path_for(json_path)
+    if not os.path.exists(log_path):
+        records = _load_json_list(json_path)
+        _write_atomic(log_path, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        logging.info(f"✅ Migrated {len(records)} records from {json_path} to {log_path}")
+    return log_path
+
+
+def append_record(json_path: str, record: Dict) -> None:
+    """
+    Append one summary record in O(1) and fsync it.
+
+    A trailing line left without a newline by an interrupted write is
+    terminated first so the new record starts on its own line. Holds
+    ``lock_file`` on ``json_path`` so it never lands in a log ``compact`` is replacing.
+    """
+    with lock_file(json_path):
+        log_path = migrate(json_path)
+        with open(log_path, "ab") as f:
+            if f.tell() > 0:
+                with open(log_path, "rb") as tail:
+                    tail.seek(-1, os.SEEK_END)
+                    if tail.read(1) != b"\n":
+                        f.write(b"\n")
+            f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def iter_records(json_path: str = "portfolio_summary.json") -> Iterator[Dict]:
+    """Yield summary records oldest first, skipping torn or corrupt lines."""
+    log_path = log_path_for(json_path)
+    if not os.path.exists(log_path):
+        yield from _load_json_list(json_path)
+        return
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logging.warning(f"⚠️ Skipping corrupt line in {log_path}")
+
+
+def iter_log_chunks(log_path: str, offset: int = 0,
+                    chunk_records: int = CHUNK_RECORDS) -> Iterator[Tuple[List[Dict], int]]:
+    """
+    Yield ``(records, end_offset)`` for the complete log lines after byte ``offset``.
+
+    At most ``chunk_records`` records are held at a time; ``end_offset`` is
+    where the next read should start. A torn last line is left for later.
+    """
+    records = []
+    yielded = offset
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logging.warning(f"⚠️ Skipping corrupt line in {log_path}")
+            if len(records) >= chunk_records:
+                yield records, offset
+                records, yielded = [], offset
+    if records or offset != yielded:
+        yield records, offset
+
+
+def _json_list(records: Iterable[Dict]) -> Iterator[str]:
+    """``json.dumps(list(records), ensure_ascii=False, indent=2)`` piece by piece."""
+    first = True
+    for record in records:
+        body = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        yield ("[\n  " if first else ",\n  ") + body
+        first = False
+    yield "[]" if first else "\n]"
+
+
+def read_records(json_path: str = "portfolio_summary.json") -> List[Dict]:
+    """Compatibility reader: the same list of dicts ``portfolio_summary.json`` used to hold."""
+    return list(iter_records(json_path))
+
+
+def last_record(json_path: str = "portfolio_summary.json") -> Optional[Dict]:
+    """Return the newest record by reading backwards from the end of the log."""
+    log_path = log_path_for(json_path)
+    if not os.path.exists(log_path):
+        records = _load_json_list(json_path)
+        return records[-1] if records else None
+
+    with open(log_path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        buf = b""
+        while end > 0:
+            start = max(0, end - TAIL_BLOCK)
+            f.seek(start)
+            buf = f.read(end - start) + buf
+            end = start
+            lines = buf.split(b"\n")
+            # lines[0] may be partial unless we reached the start of the file
+            for line in reversed(lines if start == 0 else lines[1:]):
+                if line.strip():
+                    try:
+                        return json.loads(line)
+                    except ValueError:
+                        continue
+            buf = lines[0] if start > 0 else b""
+    return None
+
+
+def compact(json_path: str = "portfolio_summary.json") -> int:
+    """
+    Refresh ``json_path`` from the log, rewriting the log too if it has torn lines.
+
+    Both files are replaced atomically, so the notebooks always see either
+    the previous or the new complete ``portfolio_summary.json``. A clean log
+    is left in place (readers that track offsets into it stay valid).
+    Holds ``lock_file`` on ``json_path`` like ``append_record``, so no record
+    is appended between reading the log and replacing it. Returns the number of records.
+    """
+    with lock_file(json_path):
+        log_path = migrate(json_path)
+        # Streamed in two passes so memory does not grow with the history.
+        records = sum(1 for _ in iter_records(json_path))
+        with open(log_path, "rb") as f:
+            lines = sum(1 for line in f if line.strip())
+        if lines != records:
+            _write_atomic(log_path, (json.dumps(r, ensure_ascii=False) + "\n" for r in iter_records(json_path)))
+        _write_atomic(json_path, _json_list(iter_records(json_path)))
+    return records
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Append-only portfolio summary log.")
+    parser.add_argument("command", choices=["migrate", "compact", "last"])
+    parser.add_argument("--json", default="portfolio_summary.json")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        migrate(args.json)
+    elif args.command == "compact":
+        n = compact(args.json)
+        logging.info(f"✅ Compacted {n} records into {args.json}")
+    else:
+        print(last_record(args.json))
+
+
+if __name__ == "__main__":
+    main()
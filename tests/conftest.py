@@ -0,0 +1,123 @@
+"""
+Shared fixtures: a local static HTTP server standing in for the exchange site.
+
+The server serves pages from memory with an ETag and a Last-Modified date,
+answers conditional requests with ``304``, and can be told to fail
+(``fail``: statuses returned first, in order), to stall (``delay``) or to
+trickle the body out a few bytes at a time (``trickle``: seconds between pieces).
+Every request and every new TCP connection is recorded.
+"""
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FixtureServer:
+    def __init__(self):
+        self.pages = {}  # path → (body, etag, last_modified)
+        self.charsets = {}  # path → charset named in the Content-Type
+        self.fail = []
+        self.delay = 0.0
+        self.trickle = 0.0
+        self.requests = []  # (path, headers)
+        self.connections = 0
+        self.version = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path: str = "/page.html") -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def publish(self, body: str, path: str = "/page.html", etag: bool = True, charset: str = "utf-8") -> None:
+        """
+        Serve ``body`` at ``path``, encoded in ``charset``, with a new ETag
+        (unless ``etag=False``) and a later Last-Modified.
+        """
+        self.version += 1
+        self.charsets[path] = charset
+        # Last-Modified has one-second resolution: every version gets its own second
+        self.pages[path] = (body.encode(charset), f'"v{self.version}"' if etag else None,
+                            formatdate(time.time() + self.version, usegmt=True))
+
+
+def _handler(server: FixtureServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+        def setup(self):
+            server.connections += 1
+            super().setup()
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                if value:
+                    self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                if not server.trickle:
+                    self.wfile.write(body)
+                    return
+                for i in range(0, len(body), 64):
+                    self.wfile.write(body[i:i + 64])
+                    self.wfile.flush()
+                    time.sleep(server.trickle)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # the client gave up (e.g. a timeout test)
+
+        def do_GET(self):
+            server.requests.append((self.path, dict(self.headers)))
+            if server.fail:
+                self._send(server.fail.pop(0))
+                return
+            if server.delay:
+                time.sleep(server.delay)
+            if self.path not in server.pages:
+                self._send(404)
+                return
+            body, etag, last_modified = server.pages[self.path]
+            validators = {"ETag": etag, "Last-Modified": last_modified}
+            if (etag and self.headers.get("If-None-Match") == etag) or \
+                    (not etag and self.headers.get("If-Modified-Since") == last_modified):
+                self._send(304, headers=validators)
+                return
+            self._send(200, body, {"Content-Type": f"text/html; charset={server.charsets[self.path]}",
+                                **validators})
+
+    return Handler
+
+
+@pytest.fixture
+def make_server():
+    """Factory for extra servers (e.g. several price sources), all stopped after the test."""
+    servers = []
+
+    def make() -> FixtureServer:
+        server = FixtureServer()
+        server.thread.start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.httpd.shutdown()
+        server.httpd.server_close()
+
+
+@pytest.fixture
+def fixture_server(make_server):
+    return make_server()
+
+
+@pytest.fixture
+def price_page():
+    from benchmarks.synthetic import make_price_page
+    return make_price_page(n_rows=20, n_tables=1)
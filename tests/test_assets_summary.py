@@ -0,0 +1,40 @@
+import csv
+import json
+import subprocess
+import sys
+
+import assets_summary
+from holdings_ledger import HoldingsLedger
+from price_parser import parse_price_table
+from benchmarks.synthetic import SUBJECTS, make_price_page
+
+DOLLAR, COIN = "دلار آمریکا", "تمام امامی(86)"
+
+
+def test_values_the_ledger_holdings(tmp_path):
+    assets_json = tmp_path / "user_assets.json"
+    assets_json.write_text(json.dumps({DOLLAR: 10, "ریال": 500_000}), encoding="utf-8")
+    HoldingsLedger(str(assets_json)).record({COIN: 2})
+    table = parse_price_table(make_price_page(n_rows=20, n_tables=1))
+    prices = table.buy_prices()
+    summary_csv = tmp_path / "assets_summary.csv"
+
+    row = assets_summary.main(table, str(assets_json), str(summary_csv))
+
+    expected = 10 * prices[DOLLAR] + 2 * prices[COIN] + 500_000
+    assert row["assets_rial"] == expected
+    assert row["assets_dollar"] == round(expected / (prices[DOLLAR] + 10000), 2)
+    with open(summary_csv, encoding="utf-8", newline="") as f:
+        assert [int(r["assets_rial"]) for r in csv.DictReader(f)] == [expected]
+
+
+def test_missing_prices_count_as_zero():
+    row = assets_summary.compute_assets_summary({SUBJECTS[1]: 1_000}, {SUBJECTS[1]: 3, "unknown": 5})
+
+    assert (row["assets_rial"], row["assets_dollar"]) == (3_000, 0)
+
+
+def test_does_not_import_pandas():
+    code = "import sys, assets_summary; print('pandas' in sys.modules or 'numpy' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
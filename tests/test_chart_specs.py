@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+import chart_specs
+
+
+def test_every_spec_has_a_known_kind_and_formatter():
+    for spec in chart_specs.CHART_SPECS:
+        assert spec.kind in ("year", "month", "day", "monthly_pl", "daily_pl")
+        assert spec.formatter is None or spec.formatter in chart_specs.FORMATTERS
+
+
+def test_vector_charts_do_not_import_matplotlib():
+    code = "import sys, vector_charts; print('matplotlib' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
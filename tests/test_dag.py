@@ -0,0 +1,87 @@
+import pytest
+
+import dag
+
+
+@pytest.fixture
+def files(tmp_path):
+    src = tmp_path / "input.txt"
+    src.write_text("v1", encoding="utf-8")
+    return src, tmp_path / "output.txt", str(tmp_path / "state.json")
+
+
+def build(src, out, calls):
+    def step(ctx):
+        calls.append("build")
+        out.write_text(src.read_text(encoding="utf-8").upper(), encoding="utf-8")
+        return "built"
+    return [dag.Node("build", step, inputs=[str(src)], outputs=[str(out)])]
+
+
+def statuses(run):
+    return {name: status for name, status, _ in run.timings}
+
+
+def test_unchanged_inputs_and_outputs_are_skipped(files):
+    src, out, state = files
+    calls = []
+
+    assert statuses(dag.execute(build(src, out, calls), state_path=state)) == {"build": "ran"}
+    assert statuses(dag.execute(build(src, out, calls), state_path=state)) == {"build": "skipped"}
+
+    src.write_text("version 2", encoding="utf-8")
+    assert statuses(dag.execute(build(src, out, calls), state_path=state)) == {"build": "ran"}
+    out.unlink()
+    assert statuses(dag.execute(build(src, out, calls), state_path=state)) == {"build": "ran"}
+    assert statuses(dag.execute(build(src, out, calls), force=True, state_path=state)) == {"build": "ran"}
+    assert calls == ["build"] * 4
+    assert out.read_text(encoding="utf-8") == "VERSION 2"
+
+
+def test_always_nodes_and_disabled_state_never_skip(files):
+    src, out, state = files
+    calls = []
+    nodes = [dag.Node("fetch", lambda ctx: calls.append("fetch"), inputs=[str(src)], always=True)]
+
+    dag.execute(nodes, state_path=state)
+    dag.execute(nodes, state_path=state)
+    dag.execute(build(src, out, calls), state_path=None)
+    dag.execute(build(src, out, calls), state_path=None)
+
+    assert calls == ["fetch", "fetch", "build", "build"]
+
+
+def test_results_are_passed_to_later_nodes(tmp_path):
+    nodes = [dag.Node("a", lambda ctx: 2),
+             dag.Node("b", lambda ctx: 3),
+             dag.Node("sum", lambda ctx: ctx["a"] + ctx["b"], after=["a", "b"])]
+
+    run = dag.execute(nodes, jobs=2, state_path=None)
+
+    assert run.results == {"a": 2, "b": 3, "sum": 5}
+
+
+def test_failure_blocks_dependents_but_not_siblings(tmp_path):
+    def fail(ctx):
+        raise RuntimeError("boom")
+
+    nodes = [dag.Node("bad", fail),
+             dag.Node("child", lambda ctx: "child", after=["bad"]),
+             dag.Node("grandchild", lambda ctx: "grandchild", after=["child"]),
+             dag.Node("sibling", lambda ctx: "sibling")]
+
+    run = dag.execute(nodes, jobs=2, state_path=str(tmp_path / "state.json"))
+
+    assert statuses(run) == {"bad": "failed", "child": "blocked", "grandchild": "blocked", "sibling": "ran"}
+    assert run.failed == ["bad"]
+    assert "bad" not in dag.load_state(str(tmp_path / "state.json"))
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="unknown"):
+        dag.execute([dag.Node("a", lambda ctx: 1, after=["missing"])], state_path=None)
+    with pytest.raises(ValueError, match="cycle"):
+        dag.execute([dag.Node("a", lambda ctx: 1, after=["b"]), dag.Node("b", lambda ctx: 1, after=["a"])],
+                    state_path=None)
+    with pytest.raises(ValueError, match="Duplicate"):
+        dag.execute([dag.Node("a", lambda ctx: 1), dag.Node("a", lambda ctx: 1)], state_path=None)
@@ -0,0 +1,55 @@
+import json
+
+from holdings_ledger import SEED_EFFECTIVE, HoldingsLedger, ledger_path_for
+
+
+def make_ledger(tmp_path, assets=None):
+    assets_json = tmp_path / "user_assets.json"
+    assets_json.write_text(json.dumps(assets or {"gold": 2, "ریال": 1_000}), encoding="utf-8")
+    return HoldingsLedger(str(assets_json))
+
+
+def test_seeded_from_user_assets(tmp_path):
+    ledger = make_ledger(tmp_path)
+
+    assert ledger.path == ledger_path_for(str(tmp_path / "user_assets.json"))
+    assert ledger.as_of("2000-01-01 00:00:00") == {"gold": 2, "ریال": 1_000}
+    assert ledger.newest_effective == SEED_EFFECTIVE
+
+
+def test_as_of_follows_changes_including_back_dated_ones(tmp_path):
+    ledger = make_ledger(tmp_path)
+    ledger.record({"gold": 3}, effective="2024-03-01 00:00:00")
+    ledger.record({"gold": 5, "coin": 1}, effective="2024-05-01 00:00:00")
+    ledger.record({"gold": 4}, effective="2024-04-01 00:00:00")  # back-dated
+
+    assert ledger.amount_as_of("gold", "2024-02-28 23:59:59") == 2
+    assert ledger.amount_as_of("gold", "2024-03-01 00:00:00") == 3
+    assert ledger.amount_as_of("gold", "2024-04-15 00:00:00") == 4
+    assert ledger.as_of("2024-06-01 00:00:00") == {"gold": 5, "ریال": 1_000, "coin": 1}
+    assert ledger.amount_as_of("coin", "2024-04-30 00:00:00") == 0
+    # the newest change by time, not the last one written
+    assert ledger.newest_effective == "2024-05-01 00:00:00"
+    assert ledger.latest() == {"gold": 5, "ریال": 1_000, "coin": 1}
+
+
+def test_only_real_changes_are_written_and_survive_a_reload(tmp_path):
+    ledger = make_ledger(tmp_path)
+
+    assert ledger.record({"gold": 2, "ریال": 900}, effective="2024-01-01 00:00:00") == {"ریال": 900}
+    assert ledger.record({"ریال": 900}, effective="2024-01-02 00:00:00") == {}
+    ledger.record({"gold": 1}, effective="2024-01-01 00:00:00")  # same time: ledger order wins
+
+    reloaded = HoldingsLedger(ledger.assets_json)
+    assert reloaded.as_of("2024-01-01 00:00:00") == {"gold": 1, "ریال": 900}
+    with open(ledger.assets_json, encoding="utf-8") as f:
+        assert json.load(f) == {"gold": 1, "ریال": 900}
+    with open(ledger.path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 4
+
+
+def test_empty_ledger_has_no_newest_change(tmp_path):
+    ledger = HoldingsLedger(str(tmp_path / "user_assets.json"))
+
+    assert ledger.newest_effective is None
+    assert ledger.as_of("2024-01-01 00:00:00") == {}
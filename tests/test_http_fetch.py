@@ -0,0 +1,71 @@
+import json
+import os
+
+import http_fetch
+import price_parser
+
+
+def test_validators_are_stored_and_sent_back(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page)
+    out = str(tmp_path / "page.html")
+
+    first = http_fetch.fetch_page_http(fixture_server.url(), out)
+    second = http_fetch.fetch_page_http(fixture_server.url(), out)
+
+    _, etag, last_modified = fixture_server.pages["/page.html"]
+    with open(out + http_fetch.STATE_SUFFIX, encoding="utf-8") as f:
+        assert json.load(f) == {"url": fixture_server.url(), "etag": etag, "last_modified": last_modified}
+    assert (first.status, first.modified, first.size) == (200, True, len(price_page.encode("utf-8")))
+    assert (second.status, second.modified) == (304, False)
+    assert "If-None-Match" not in fixture_server.requests[0][1]
+    assert fixture_server.requests[1][1]["If-None-Match"] == etag
+    assert fixture_server.requests[1][1]["If-Modified-Since"] == last_modified
+
+
+def test_validators_of_another_url_are_not_sent(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page)
+    fixture_server.publish(price_page, path="/other.html")
+    out = str(tmp_path / "page.html")
+
+    http_fetch.fetch_page_http(fixture_server.url(), out)
+    result = http_fetch.fetch_page_http(fixture_server.url("/other.html"), out)
+
+    assert result.status == 200
+    assert "If-None-Match" not in fixture_server.requests[1][1]
+
+
+def test_not_modified_keeps_snapshot_and_parsed_sidecar(fixture_server, price_page, tmp_path, monkeypatch):
+    fixture_server.publish(price_page)
+    out = str(tmp_path / "page.html")
+    http_fetch.fetch_page_http(fixture_server.url(), out)
+    table = price_parser.load_price_table(out)
+    sidecar = out + price_parser.SIDECAR_SUFFIX
+    stamps = (os.stat(out).st_mtime_ns, os.stat(sidecar).st_mtime_ns)
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("the page was parsed again")
+
+    monkeypatch.setattr(price_parser, "parse_price_table", no_parse)
+    assert not http_fetch.fetch_page_http(fixture_server.url(), out).modified
+    assert price_parser.load_price_table(out) == table
+    assert (os.stat(out).st_mtime_ns, os.stat(sidecar).st_mtime_ns) == stamps
+
+
+def test_pool_reuses_the_connection(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page)
+    out = str(tmp_path / "page.html")
+
+    for _ in range(3):
+        http_fetch.fetch_page_http(fixture_server.url(), out)
+
+    assert http_fetch.get_pool() is http_fetch.get_pool()
+    assert len(fixture_server.requests) == 3
+    assert fixture_server.connections == 1
+
+
+def test_decode_body_falls_back_to_utf8():
+    text = "دلار آمریکا"
+
+    assert http_fetch.decode_body(text.encode("utf-16"), 'text/html; charset="UTF-16"') == text
+    assert http_fetch.decode_body(text.encode("utf-8"), "text/html") == text
+    assert http_fetch.decode_body(text.encode("utf-8"), "text/html; charset=no-such-codec") == text
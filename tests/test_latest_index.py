@@ -0,0 +1,59 @@
+import pytest
+
+import extract_prices
+import latest_index
+from benchmarks.synthetic import SUBJECTS
+
+
+def snapshot(date, base):
+    return [{"subject": subject, "buy_price": f"{base + i:,}", "sell_price": f"{base + i + 10:,}", "date": date}
+            for i, subject in enumerate(SUBJECTS)]
+
+
+@pytest.fixture
+def prices_csv(tmp_path):
+    path = str(tmp_path / "prices_history.csv")
+    extract_prices.save_prices_to_csv(snapshot("2024-01-01 10:00:00", 1_000), path)
+    extract_prices.save_prices_to_csv(snapshot("2024-01-01 10:01:00", 2_000)[:3], path)
+    return path
+
+
+def test_incremental_index_matches_a_rebuild(prices_csv):
+    index = latest_index.read_index(prices_csv)
+
+    assert index == latest_index.build_index(prices_csv)
+    assert index["latest_date"] == "2024-01-01 10:01:00"
+    assert latest_index.latest_prices(index)[SUBJECTS[0]] == (2_000, 2_010)
+    assert latest_index.latest_prices(index)[SUBJECTS[4]] == (1_004, 1_014)
+    assert latest_index.latest_snapshot(index) == (
+        "2024-01-01 10:01:00", {SUBJECTS[i]: (2_000 + i, 2_010 + i) for i in range(3)})
+
+
+def test_offsets_point_at_each_subjects_last_line(prices_csv):
+    index = latest_index.read_index(prices_csv)
+
+    with open(prices_csv, "rb") as f:
+        for subject, entry in index["subjects"].items():
+            f.seek(entry["offset"])
+            line = f.readline().decode("utf-8")
+            assert line.startswith(subject + ",")
+            assert line.rstrip().endswith(entry["date"])
+
+
+def test_index_is_stale_after_an_outside_edit(prices_csv):
+    with open(prices_csv, "a", encoding="utf-8") as f:
+        f.write(f"{SUBJECTS[0]},\"3,000\",\"3,010\",2024-01-01 10:02:00\n")
+
+    assert latest_index.read_index(prices_csv) is None
+    assert latest_index.latest_prices(latest_index.load_index(prices_csv))[SUBJECTS[0]] == (3_000, 3_010)
+    assert latest_index.read_index(prices_csv) is not None
+
+
+def test_verify_compares_offsets(prices_csv):
+    latest_index.main(["verify", "--csv", prices_csv])
+
+    index = latest_index.read_index(prices_csv)
+    index["subjects"][SUBJECTS[0]]["offset"] = 0
+    latest_index.write_index(prices_csv, index)
+    with pytest.raises(SystemExit):
+        latest_index.main(["verify", "--csv", prices_csv])
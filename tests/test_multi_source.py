@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import multi_source
+from benchmarks.synthetic import make_price_page
+from multi_source import ExtractionProfile, Source
+
+
+def _source(server, name, **kwargs):
+    return Source(name, server.url(), **kwargs)
+
+
+def test_sources_are_fetched_and_reconciled(make_server):
+    servers = [make_server() for _ in range(3)]
+    for seed, server in enumerate(servers):
+        server.publish(make_price_page(n_rows=20, n_tables=1, seed=seed))
+    sources = [_source(server, f"s{i}") for i, server in enumerate(servers)]
+
+    tables = asyncio.run(multi_source.fetch_all(sources))
+    table = multi_source.reconcile(tables)
+
+    assert sorted(tables) == ["s0", "s1", "s2"]
+    dollar = sorted(t.get("دلار آمریکا").sell_price for t in tables.values())
+    assert table.get("دلار آمریکا").sell_price == dollar[1]
+
+
+def test_aliases_map_source_subjects_to_canonical_names(fixture_server):
+    fixture_server.publish("<table><tr><td>USD</td><td>100,000</td><td>101,000</td></tr></table>")
+    profile = ExtractionProfile(targets=["USD"], aliases={"USD": "دلار آمریکا"})
+
+    table = asyncio.run(multi_source.fetch_source(_source(fixture_server, "usd-only", profile=profile)))
+
+    assert [(r.subject, r.buy_price, r.sell_price) for r in table.rows] == [("دلار آمریکا", 100_000, 101_000)]
+
+
+def test_body_is_decoded_with_the_declared_charset(fixture_server, price_page):
+    fixture_server.publish(price_page, charset="utf-16")
+
+    table = asyncio.run(multi_source.fetch_source(_source(fixture_server, "utf16")))
+
+    assert table.get("دلار آمریکا") is not None
+
+
+def test_failed_source_is_skipped(make_server, price_page):
+    good, bad = make_server(), make_server()
+    good.publish(price_page)
+    bad.fail = [500]
+
+    tables = asyncio.run(multi_source.fetch_all([_source(good, "good"), _source(bad, "bad")]))
+
+    assert list(tables) == ["good"]
+
+
+def test_stalled_source_times_out_without_blocking_shutdown(make_server, price_page):
+    fast, stalled = make_server(), make_server()
+    fast.publish(price_page)
+    stalled.publish(price_page)
+    stalled.delay = 5
+
+    start = time.perf_counter()
+    # asyncio.run also waits for the worker threads: it returns early only if they really stop
+    tables = asyncio.run(multi_source.fetch_all([_source(fast, "fast"), _source(stalled, "stalled", timeout=0.5)]))
+
+    assert list(tables) == ["fast"]
+    assert time.perf_counter() - start < 2
+
+
+def test_trickling_source_times_out_without_blocking_shutdown(make_server, price_page):
+    fast, slow = make_server(), make_server()
+    fast.publish(price_page)
+    slow.publish(price_page)
+    slow.trickle = 0.2  # every read returns within the socket timeout, the whole body takes far longer
+
+    start = time.perf_counter()
+    tables = asyncio.run(multi_source.fetch_all([_source(fast, "fast"), _source(slow, "slow", timeout=0.5)]))
+
+    assert list(tables) == ["fast"]
+    assert time.perf_counter() - start < 2
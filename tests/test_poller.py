@@ -0,0 +1,95 @@
+import json
+import random
+
+import pytest
+
+import extract_prices
+import poller
+import summary_log
+from benchmarks.synthetic import SUBJECTS, make_price_page
+
+
+def test_next_delay_backs_off_and_caps():
+    assert [poller.next_delay(60, failures, jitter=0, max_backoff=900) for failures in range(6)] == \
+           [60, 120, 240, 480, 900, 900]
+    assert poller.next_delay(60, 100, jitter=0, max_backoff=900) == 900
+    assert poller.next_delay(1_000, 3, jitter=0, max_backoff=900) == 1_000  # never below the interval
+
+
+def test_next_delay_jitter_stays_in_range():
+    random.seed(0)
+    delays = [poller.next_delay(100, jitter=0.1) for _ in range(200)]
+
+    assert all(90 <= d <= 110 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_changed_subjects_compares_every_row_of_a_subject():
+    last = poller.price_key([("a", 1, 2), ("b", 3, 4), ("b", 5, 6)])
+
+    assert poller.changed_subjects(poller.price_key([("a", 1, 2), ("b", 3, 4), ("b", 5, 6)]), last) == []
+    assert poller.changed_subjects(poller.price_key([("a", 1, 2), ("b", 3, 4), ("b", 5, 7)]), last) == ["b"]
+    assert poller.changed_subjects(poller.price_key([("a", 1, 2), ("b", 3, 4)]), last) == ["b"]
+    assert poller.changed_subjects(poller.price_key([("c", 1, 2)]), last) == ["c"]
+
+
+def test_stored_key_is_the_newest_snapshot(tmp_path):
+    prices_csv = str(tmp_path / "prices_history.csv")
+    assert poller.stored_key(prices_csv) == {}
+    for date, base in (("2024-01-01 10:00:00", 1_000), ("2024-01-01 10:01:00", 2_000)):
+        extract_prices.save_prices_to_csv(
+            [{"subject": s, "buy_price": f"{base + i:,}", "sell_price": f"{base + i + 1:,}", "date": date}
+             for i, s in enumerate(SUBJECTS[:2])], prices_csv)
+
+    assert poller.stored_key(prices_csv) == {SUBJECTS[0]: ((2_000, 2_001),), SUBJECTS[1]: ((2_001, 2_002),)}
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # assets_summary.csv is written to the working directory
+    (tmp_path / "user_assets.json").write_text(json.dumps({SUBJECTS[0]: 1, "ریال": 1_000}), encoding="utf-8")
+    return tmp_path
+
+
+def make_poller(server, workdir):
+    return poller.Poller(server.url(), "http", html_path=str(workdir / "page.html"),
+                         prices_csv=str(workdir / "prices_history.csv"),
+                         assets_json=str(workdir / "user_assets.json"),
+                         output_json=str(workdir / "portfolio_summary.json"),
+                         heartbeat_path=str(workdir / "heartbeat.json"))
+
+
+def test_only_changed_prices_are_stored(fixture_server, workdir):
+    page = make_price_page(n_rows=20, n_tables=1)
+    fixture_server.publish(page)
+    p = make_poller(fixture_server, workdir)
+    prices_csv = workdir / "prices_history.csv"
+
+    assert p.poll() == "changed"
+    size = prices_csv.stat().st_size
+    assert p.poll() == "not-modified"
+    fixture_server.publish(page.replace("</body>", "<p>ad</p></body>"))  # new ETag, same prices
+    assert p.poll() == "unchanged"
+    assert prices_csv.stat().st_size == size
+    assert len(summary_log.read_records(str(workdir / "portfolio_summary.json"))) == 1
+
+    fixture_server.publish(make_price_page(n_rows=20, n_tables=1, seed=1))
+    assert p.poll() == "changed"
+    assert prices_csv.stat().st_size > size
+    assert (p.state["polls"], p.state["changes"], p.state["unchanged"]) == (4, 2, 2)
+
+    # A new poller picks up the stored snapshot and does not store it again
+    fixture_server.publish(make_price_page(n_rows=20, n_tables=1, seed=1))
+    assert make_poller(fixture_server, workdir).poll() == "unchanged"
+
+
+def test_run_writes_a_heartbeat(fixture_server, workdir):
+    fixture_server.publish(make_price_page(n_rows=20, n_tables=1))
+    p = make_poller(fixture_server, workdir)
+
+    poller.run(p, interval=0, jitter=0, max_polls=2)
+
+    with open(p.heartbeat_path, encoding="utf-8") as f:
+        heartbeat = json.load(f)
+    assert (heartbeat["polls"], heartbeat["changes"], heartbeat["failures"]) == (2, 1, 0)
+    assert heartbeat["last_error"] is None
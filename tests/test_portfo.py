@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import portfo
+import summary_log
+from holdings_ledger import HoldingsLedger
+
+DOLLAR, COIN = "دلار آمریکا", "تمام امامی(86)"
+
+
+def test_rerun_is_not_recorded_twice_but_a_back_dated_change_is(tmp_path):
+    assets_json = tmp_path / "user_assets.json"
+    assets_json.write_text('{"%s": 10, "%s": 1, "ریال": 500000}' % (DOLLAR, COIN), encoding="utf-8")
+    output_json = str(tmp_path / "portfolio_summary.json")
+    ledger = HoldingsLedger(str(assets_json))
+    snapshot = (datetime(2024, 1, 1, 12), {DOLLAR: 50_000, COIN: 40_000_000})
+
+    first = portfo.main(assets_json=str(assets_json), output_json=output_json, snapshot=snapshot)
+    portfo.main(assets_json=str(assets_json), output_json=output_json, snapshot=snapshot)
+    assert summary_log.read_records(output_json) == [first]
+
+    ledger.record({COIN: 2}, effective="2024-01-01 08:00:00")  # before the snapshot
+    second = portfo.main(assets_json=str(assets_json), output_json=output_json, snapshot=snapshot)
+
+    assert second["datetime"] == first["datetime"]
+    assert second["total_toman"] == first["total_toman"] + 40_000_000
+    assert summary_log.read_records(output_json) == [first, second]
+    assert summary_log.last_record(output_json) == second
@@ -0,0 +1,31 @@
+import pytest
+
+import price_parser
+from benchmarks.synthetic import make_price_page
+
+BACKENDS = ["bs4", "lxml", "selectolax"]
+
+
+def _backend(name):
+    try:
+        return price_parser.get_backend(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+@pytest.mark.parametrize("html", ["", "  \n\t", "<!-- nothing yet -->"])
+def test_empty_page_gives_an_empty_table(name, html):
+    table = price_parser.parse_price_table(html, backend=_backend(name))
+
+    assert table.rows == []
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backends_agree(name):
+    page = make_price_page(n_rows=20, n_tables=2)
+
+    rows = price_parser.parse_price_table(page, backend=_backend(name)).rows
+
+    assert rows
+    assert rows == price_parser.parse_price_table(page, backend=_backend("bs4")).rows
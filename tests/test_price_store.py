@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+
+import price_store
+from benchmarks.synthetic import SUBJECTS, write_prices_csv
+
+
+def record(subject, buy, sell, date):
+    return {"subject": subject, "buy_price": f"{buy:,}", "sell_price": f"{sell:,}", "date": date}
+
+
+def test_append_and_read_back(tmp_path):
+    store = price_store.PriceStore(str(tmp_path / "store"))
+    store.append([record("a", 1_000, 1_100, "2024-01-01 10:00:00"), record("b", 5, 6, "2024-01-01 10:00:00")])
+    store.append([record("a", 1_200, 1_300, "2024-01-01 10:01:00")])
+
+    assert len(store) == 3
+    assert price_store.PriceStore(store.path).subjects == ["a", "b"]
+    df = store.to_dataframe()
+    assert list(df["subject"]) == ["a", "b", "a"]
+    assert list(df["sell_price"]) == [1_100, 6, 1_300]
+    ts = price_store.to_epoch("2024-01-01 10:01:00")
+    assert list(store.to_dataframe(start_ts=ts)["buy_price"]) == [1_200]
+    assert price_store.from_epoch(ts) == "2024-01-01 10:01:00"
+
+
+def test_interrupted_append_is_trimmed(tmp_path):
+    store = price_store.PriceStore(str(tmp_path / "store"))
+    store.append([record("a", 1, 2, "2024-01-01 10:00:00")])
+    with open(os.path.join(store.path, "ts.bin"), "ab") as f:  # a crash after writing one column
+        f.write(np.asarray([123], dtype="<i8").tobytes())
+
+    assert len(store) == 1
+    store.append([record("a", 3, 4, "2024-01-01 10:01:00")])
+    assert len(store) == 2
+    assert list(store.to_dataframe()["buy_price"]) == [1, 3]
+
+
+def test_latest_finds_subjects_that_stopped_appearing(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "TAIL_CHUNK", 4)
+    store = price_store.PriceStore(str(tmp_path / "store"))
+    store.append([record("old", 7, 8, "2024-01-01 09:00:00")])
+    store.append([record(s, i, i + 1, f"2024-01-01 10:{i // 2 % 60:02d}:00")
+                  for i, s in enumerate(["a", "b"] * 50)])
+
+    latest = store.latest()
+
+    assert latest == {"old": (7, 8, price_store.to_epoch("2024-01-01 09:00:00")),
+                      "a": (98, 99, price_store.to_epoch("2024-01-01 10:49:00")),
+                      "b": (99, 100, price_store.to_epoch("2024-01-01 10:49:00"))}
+    assert store.latest(["b", "missing"]) == {"b": latest["b"]}
+    assert price_store.PriceStore(str(tmp_path / "empty")).latest() == {}
+
+
+def test_latest_snapshot_reads_the_newest_timestamp(tmp_path):
+    store = price_store.PriceStore(str(tmp_path / "store"))
+    store.append([record("a", 1, 2, "2024-01-01 10:00:00"), record("b", 3, 4, "2024-01-01 10:00:00")])
+    store.append([record("a", 5, 6, "2024-01-01 10:05:00")])
+
+    assert store.latest_snapshot() == (price_store.to_epoch("2024-01-01 10:05:00"), {"a": (5, 6)})
+
+
+def test_migrate_skips_bad_rows_and_refuses_a_full_store(tmp_path):
+    csv_path = str(tmp_path / "prices_history.csv")
+    write_prices_csv(csv_path, 10)
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("a,not a price,1,2024-01-01 00:00:00\n")
+
+    store = price_store.open_store(csv_path)
+
+    assert store.path == price_store.store_path_for(csv_path)
+    assert len(store) == 10 * len(SUBJECTS)
+    assert store.subjects == SUBJECTS
+    with pytest.raises(FileExistsError):
+        price_store.migrate_csv(csv_path)
+    assert price_store.open_store(csv_path).path == store.path  # existing store: no second migration
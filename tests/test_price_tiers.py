@@ -0,0 +1,120 @@
+import csv
+from datetime import datetime, timedelta
+
+import pytest
+
+import latest_index
+import price_store
+import price_tiers
+from benchmarks.synthetic import SUBJECTS, write_prices_csv
+
+STEP = 3600  # one snapshot an hour
+DAYS = 20
+START = datetime(2020, 1, 1, 9)
+LAST = START + timedelta(seconds=STEP * (DAYS * 24 - 1))
+
+
+@pytest.fixture
+def history(tmp_path):
+    """Hourly prices over 20 days with a columnar store and an index, as the pipeline leaves them."""
+    csv_path = str(tmp_path / "prices_history.csv")
+    write_prices_csv(csv_path, DAYS * 24, step_seconds=STEP)
+    price_store.migrate_csv(csv_path)
+    latest_index.write_index(csv_path, latest_index.build_index(csv_path))
+    return csv_path
+
+
+def read_rows(csv_path):
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_compaction_moves_old_rows_into_bars(history):
+    before = read_rows(history)
+    state = price_tiers.compact(history, raw_days=5, now=LAST)
+
+    cutoff = state["compacted_until"]
+    assert cutoff == "2020-01-16 00:00:00"
+    kept = read_rows(history)
+    assert kept == [row for row in before if row["date"] >= cutoff]
+    assert len(price_store.PriceStore(price_store.store_path_for(history))) == len(kept)
+    assert latest_index.read_index(history) == latest_index.build_index(history)
+    assert latest_index.read_index(history)["latest_date"] == LAST.strftime(price_store.DATE_FORMAT)
+
+    tiers_dir = price_tiers.tiers_path_for(history)
+    rolled = len(before) - len(kept)
+    for tier in price_tiers.TIERS:
+        bars = price_tiers.read_tier(tiers_dir, tier)
+        assert bars["snapshots"].sum() == rolled
+        assert state["tiers"][tier]["bars"] == len(bars)
+    day = price_tiers.read_tier(tiers_dir, "day")
+    assert len(day) == 15 * len(SUBJECTS)
+    assert (day["last"] < datetime(2020, 1, 16)).all()
+
+    # Compacting again with the same cut changes nothing
+    again = price_tiers.compact(history, raw_days=5, now=LAST)
+    assert read_rows(history) == kept
+    assert again["tiers"] == state["tiers"]
+
+
+def test_bars_hold_the_ohlc_of_their_rows(history):
+    rows = [row for row in read_rows(history)
+            if row["subject"] == SUBJECTS[0] and row["date"].startswith("2020-01-02")]
+    price_tiers.compact(history, raw_days=5, now=LAST)
+
+    day = price_tiers.read_tier(price_tiers.tiers_path_for(history), "day")
+    bar = day[(day["subject"] == SUBJECTS[0]) & (day["start"] == datetime(2020, 1, 2))].iloc[0]
+    sells = [int(row["sell_price"].replace(",", "")) for row in rows]
+    assert (bar["sell_open"], bar["sell_high"], bar["sell_low"], bar["sell_close"]) == \
+           (sells[0], max(sells), min(sells), sells[-1])
+    assert bar["snapshots"] == 24
+    assert bar["last"] == datetime(2020, 1, 2, 23)
+
+
+def test_retention_trims_each_tier(history):
+    state = price_tiers.compact(history, raw_days=5, retention_days={"minute": 8, "hour": 12, "day": 0}, now=LAST)
+
+    tiers_dir = price_tiers.tiers_path_for(history)
+    for tier, days in (("minute", 8), ("hour", 12)):
+        bars = price_tiers.read_tier(tiers_dir, tier)
+        assert (bars["start"] >= LAST - timedelta(days=days)).all()
+        assert bars["start"].min() < LAST - timedelta(days=days - 1)
+        assert state["tiers"][tier]["kept_from"] == (LAST - timedelta(days=days)).strftime(price_store.DATE_FORMAT)
+    day = price_tiers.read_tier(tiers_dir, "day")
+    assert day["start"].min() == datetime(2020, 1, 1)
+    assert state["tiers"]["day"]["kept_from"] is None
+
+
+def test_load_history_stitches_bars_and_raw_rows(history):
+    raw_before = price_tiers.load_raw(history)
+    state = price_tiers.compact(history, raw_days=5, retention_days={"minute": 8}, now=LAST)
+    compacted_until = datetime.strptime(state["compacted_until"], price_store.DATE_FORMAT)
+
+    # The minute tier no longer reaches back 10 days, so the compacted part comes from hour bars
+    start = LAST - timedelta(days=10)
+    history_rows = price_tiers.load_history(history, start, LAST)
+
+    old = history_rows[history_rows["date"] < compacted_until]
+    new = history_rows[history_rows["date"] >= compacted_until]
+    assert old["date"].min() >= start
+    assert old["date"].is_monotonic_increasing
+    # hour bars of hourly snapshots: one close per subject and hour, dated at its snapshot
+    expected_old = raw_before[(raw_before["date"] >= start) & (raw_before["date"] < compacted_until)]
+    assert len(old) == len(expected_old)
+    assert sorted(old["sell_price"]) == sorted(expected_old["sell_price"])
+    expected_new = raw_before[raw_before["date"] >= compacted_until].reset_index(drop=True)
+    assert new.reset_index(drop=True)[["subject", "buy_price", "sell_price"]].equals(
+        expected_new[["subject", "buy_price", "sell_price"]])
+    assert list(new["date"]) == list(expected_new["date"])
+
+
+def test_coarser_resolution_reads_day_bars(history):
+    raw_before = price_tiers.load_raw(history)
+    price_tiers.compact(history, raw_days=5, now=LAST)
+
+    tier, bars = price_tiers.load_bars(history, datetime(2020, 1, 3), LAST, resolution="day")
+
+    assert tier == "day"
+    # 19 days from Jan 3 to Jan 21: compacted bars up to Jan 15, the rest folded from raw rows
+    assert len(bars) == 19 * len(SUBJECTS)
+    assert bars["snapshots"].sum() == (raw_before["date"] >= datetime(2020, 1, 3)).sum()
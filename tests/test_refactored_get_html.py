@@ -0,0 +1,102 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError
+
+import refactored_get_html
+from http_fetch import STATE_SUFFIX
+
+
+def test_http_fetch_saves_and_parses_the_page(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page)
+    out = tmp_path / "page.html"
+
+    table = refactored_get_html.fetch_snapshot(fixture_server.url(), str(out), fetcher="http")
+
+    assert out.read_text(encoding="utf-8") == price_page
+    assert [row.subject for row in table.rows] == ["دلار آمریکا", "تمام امامی(86)", "تمام بهار آزادی",
+                                                    "نیم بهار آزادی", "ربع بهار آزادی"]
+    assert (tmp_path / ("page.html" + STATE_SUFFIX)).exists()
+
+
+def test_unchanged_page_is_not_modified_via_etag(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page)
+    out = str(tmp_path / "page.html")
+    refactored_get_html.fetch_snapshot(fixture_server.url(), out, fetcher="http")
+
+    assert refactored_get_html.fetch_snapshot(fixture_server.url(), out, fetcher="http") is None
+    etag = fixture_server.pages["/page.html"][1]
+    assert fixture_server.requests[-1][1]["If-None-Match"] == etag
+
+
+def test_unchanged_page_is_not_modified_via_last_modified(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page, etag=False)
+    out = str(tmp_path / "page.html")
+    refactored_get_html.fetch_snapshot(fixture_server.url(), out, fetcher="http")
+
+    assert refactored_get_html.fetch_snapshot(fixture_server.url(), out, fetcher="http") is None
+    headers = fixture_server.requests[-1][1]
+    assert "If-None-Match" not in headers
+    assert headers["If-Modified-Since"] == fixture_server.pages["/page.html"][2]
+
+
+def test_changed_page_is_fetched_again(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page)
+    out = tmp_path / "page.html"
+    refactored_get_html.fetch_snapshot(fixture_server.url(), str(out), fetcher="http")
+
+    changed = price_page.replace("</body>", "<p>updated</p></body>")
+    fixture_server.publish(changed)
+    assert refactored_get_html.fetch_snapshot(fixture_server.url(), str(out), fetcher="http") is not None
+    assert out.read_text(encoding="utf-8") == changed
+
+
+def test_transient_server_errors_are_retried(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page)
+    fixture_server.fail = [503, 502]
+
+    table = refactored_get_html.fetch_snapshot(fixture_server.url(), str(tmp_path / "page.html"), fetcher="http")
+
+    assert table.rows
+    assert len(fixture_server.requests) == 3
+
+
+def test_persistent_server_errors_raise(fixture_server, price_page, tmp_path):
+    fixture_server.publish(price_page)
+    fixture_server.fail = [503] * 5
+
+    with pytest.raises(HTTPError):
+        refactored_get_html.fetch_snapshot(fixture_server.url(), str(tmp_path / "page.html"), fetcher="http")
+
+
+class FakeDriver:
+    def __init__(self, html):
+        self.page_source = html
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        return True
+
+    def quit(self):
+        pass
+
+
+def test_browser_that_fails_to_start_is_retried(monkeypatch, price_page, tmp_path):
+    driver = FakeDriver(price_page)
+    starts = []
+
+    def init_driver(headless=True):
+        starts.append(headless)
+        if len(starts) == 1:
+            raise WebDriverException("chrome not reachable")
+        return driver
+
+    monkeypatch.setattr(refactored_get_html, "init_driver", init_driver)
+    with refactored_get_html.WarmFetcher("http://example.invalid/", str(tmp_path / "page.html")) as browser:
+        table = browser.fetch()
+
+    assert len(starts) == 2
+    assert driver.visited == ["http://example.invalid/"]
+    assert len(table.rows) == 5
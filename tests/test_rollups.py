@@ -0,0 +1,70 @@
+import os
+
+import rollups
+import summary_log
+from benchmarks.synthetic import iter_summary_records
+
+
+def test_incremental_updates_match_a_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.setattr(summary_log, "CHUNK_RECORDS", 7)
+    json_path = str(tmp_path / "portfolio_summary.json")
+    records = list(iter_summary_records(200))
+    for i, record in enumerate(records):
+        summary_log.append_record(json_path, record)
+        if i % 37 == 0:
+            rollups.update_rollups(json_path)
+    incremental = rollups.update_rollups(json_path)
+
+    os.remove(rollups.rollup_path_for(json_path))
+    full = rollups.update_rollups(json_path)
+
+    assert incremental.levels == full.levels
+    assert incremental.log_offset == os.path.getsize(summary_log.log_path_for(json_path))
+    last_of_day = {}
+    for record in records:
+        last_of_day[record["datetime"][:10]] = record
+    assert {day: r["total_toman"] for day, r in full.levels["day"].items()} == \
+           {day: r["total_toman"] for day, r in last_of_day.items()}
+    assert full.latest_datetime == records[-1]["datetime"]
+
+
+def test_compacted_log_triggers_a_rebuild(tmp_path):
+    json_path = str(tmp_path / "portfolio_summary.json")
+    for record in iter_summary_records(20):
+        summary_log.append_record(json_path, record)
+    before = rollups.update_rollups(json_path)
+    with open(summary_log.log_path_for(json_path), "a", encoding="utf-8") as f:
+        f.write("torn\n")
+    summary_log.compact(json_path)  # rewrites the log: new inode
+
+    after = rollups.update_rollups(json_path)
+
+    assert after.log_inode == os.stat(summary_log.log_path_for(json_path)).st_ino
+    assert after.levels == before.levels
+
+
+def test_read_rollups_writes_nothing(tmp_path):
+    json_path = str(tmp_path / "portfolio_summary.json")
+    records = list(iter_summary_records(30))
+    for record in records[:20]:
+        summary_log.append_record(json_path, record)
+    rollups.update_rollups(json_path)
+    for record in records[20:]:
+        summary_log.append_record(json_path, record)
+    path = rollups.rollup_path_for(json_path)
+    saved = os.stat(path).st_mtime_ns
+
+    read = rollups.read_rollups(json_path)
+
+    assert read.latest_datetime == records[-1]["datetime"]
+    assert os.stat(path).st_mtime_ns == saved
+    assert rollups.load_rollups(json_path).latest_datetime == records[19]["datetime"]
+    assert read.levels == rollups.update_rollups(json_path).levels
+
+
+def test_read_rollups_without_a_log(tmp_path):
+    json_path = tmp_path / "portfolio_summary.json"
+    json_path.write_text("[]", encoding="utf-8")
+
+    assert rollups.read_rollups(str(json_path)).levels == {level: {} for level in rollups.LEVELS}
+    assert sorted(os.listdir(tmp_path)) == ["portfolio_summary.json"]
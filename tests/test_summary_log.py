@@ -0,0 +1,84 @@
+import json
+import threading
+
+import summary_log
+
+
+def record(i):
+    return {"datetime": f"2024-01-01 10:{i // 60:02d}:{i % 60:02d}", "total_toman": 1_000 + i}
+
+
+def test_append_and_read_back(tmp_path):
+    json_path = str(tmp_path / "portfolio_summary.json")
+    for i in range(3):
+        summary_log.append_record(json_path, record(i))
+
+    assert summary_log.read_records(json_path) == [record(0), record(1), record(2)]
+    assert summary_log.last_record(json_path) == record(2)
+
+
+def test_existing_json_list_is_migrated(tmp_path):
+    json_path = tmp_path / "portfolio_summary.json"
+    json_path.write_text(json.dumps([record(0), record(1)]), encoding="utf-8")
+
+    summary_log.append_record(str(json_path), record(2))
+
+    assert summary_log.read_records(str(json_path)) == [record(0), record(1), record(2)]
+
+
+def test_torn_line_is_skipped_and_compacted_away(tmp_path):
+    json_path = str(tmp_path / "portfolio_summary.json")
+    summary_log.append_record(json_path, record(0))
+    log_path = summary_log.log_path_for(json_path)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write('{"datetime": "2024-01-01 10:0')  # a write cut off half-way
+    summary_log.append_record(json_path, record(1))
+
+    assert summary_log.read_records(json_path) == [record(0), record(1)]
+    assert summary_log.last_record(json_path) == record(1)
+
+    assert summary_log.compact(json_path) == 2
+    with open(log_path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [record(0), record(1)]
+    with open(json_path, encoding="utf-8") as f:
+        assert json.load(f) == [record(0), record(1)]
+
+
+def test_chunks_stop_before_an_unfinished_line(tmp_path):
+    json_path = str(tmp_path / "portfolio_summary.json")
+    for i in range(5):
+        summary_log.append_record(json_path, record(i))
+    log_path = summary_log.log_path_for(json_path)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write('{"datetime": ')
+
+    chunks = list(summary_log.iter_log_chunks(log_path, chunk_records=2))
+
+    assert [len(records) for records, _ in chunks] == [2, 2, 1]
+    end = chunks[-1][1]
+    with open(log_path, "rb") as f:
+        assert f.read()[end:] == b'{"datetime": '
+    assert list(summary_log.iter_log_chunks(log_path, end)) == []
+
+
+def test_appends_are_not_lost_while_compacting(tmp_path):
+    json_path = str(tmp_path / "portfolio_summary.json")
+    summary_log.append_record(json_path, record(0))
+    with open(summary_log.log_path_for(json_path), "a", encoding="utf-8") as f:
+        f.write("torn\n")  # makes every compact rewrite the log
+    done = threading.Event()
+
+    def compact_repeatedly():
+        while not done.is_set():
+            summary_log.compact(json_path)
+
+    compactor = threading.Thread(target=compact_repeatedly)
+    compactor.start()
+    try:
+        for i in range(1, 100):
+            summary_log.append_record(json_path, record(i))
+    finally:
+        done.set()
+        compactor.join()
+
+    assert summary_log.read_records(json_path) == [record(i) for i in range(100)]
@@ -1,5 +1,10 @@
+import argparse
 import json
 import os
+import sys
+from datetime import datetime
+
+from holdings_ledger import HoldingsLedger
 
 ASSETS_FILE = 'user_assets.json'
 
@@ -21,31 +26,107 @@ default_assets = {
     "ریال": 0
 }
 
-if not os.path.exists(ASSETS_FILE):
-    with open(ASSETS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(default_assets, f, ensure_ascii=False, indent=2)
-    print("Created 'user_assets.json' with default values.")
-
-with open(ASSETS_FILE, 'r', encoding='utf-8') as f:
-    user_assets = json.load(f)
-
-change = input("Has there been any change in your assets? (yes/no): ").strip().lower()
-if change not in ["yes", "y"]:
-    print("No changes made.")
-    exit()
-
-for eng_key, fa_key in asset_map.items():
-    answer = input(f"Has '{eng_key}' ({fa_key}) changed? (yes/no): ").strip().lower()
-    if answer in ["yes", "y"]:
-        while True:
-            new_val = input(f"Enter new integer value for '{eng_key}' ({fa_key}): ").strip()
-            if new_val.isdigit():
-                user_assets[fa_key] = int(new_val)
-                break
-            else:
-                print("Please enter a valid integer number.")
-
-with open(ASSETS_FILE, 'w', encoding='utf-8') as f:
-    json.dump(user_assets, f, ensure_ascii=False, indent=2)
-
-print("Assets updated successfully.")
+
+def load_assets(path: str = ASSETS_FILE) -> dict:
+    """Read the user's holdings, creating the file with zero holdings the first time."""
+    if not os.path.exists(path):
+        save_assets(default_assets, path)
+        print(f"Created '{path}' with default values.")
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_assets(user_assets: dict, path: str = ASSETS_FILE) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(user_assets, f, ensure_ascii=False, indent=2)
+
+
+def prompt_changes(user_assets: dict) -> bool:
+    """Ask the user which holdings changed and update ``user_assets`` in place. Returns True if anything changed."""
+    change = input("Has there been any change in your assets? (yes/no): ").strip().lower()
+    if change not in ["yes", "y"]:
+        print("No changes made.")
+        return False
+
+    for eng_key, fa_key in asset_map.items():
+        answer = input(f"Has '{eng_key}' ({fa_key}) changed? (yes/no): ").strip().lower()
+        if answer in ["yes", "y"]:
+            while True:
+                new_val = input(f"Enter new integer value for '{eng_key}' ({fa_key}): ").strip()
+                if new_val.isdigit():
+                    user_assets[fa_key] = int(new_val)
+                    break
+                else:
+                    print("Please enter a valid integer number.")
+    return True
+
+
+def parse_assignments(pairs) -> dict:
+    """``["usd=5", "ریال=1000000"]`` → ``{"دلار آمریکا": 5, "ریال": 1000000}`` (short or Persian names)."""
+    changes = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        key, value = key.strip(), value.strip().replace(",", "")
+        if not sep or not value.lstrip("-").isdigit():
+            raise ValueError(f"Expected NAME=INTEGER, got '{pair}'")
+        changes[asset_map.get(key, key)] = int(value)
+    return changes
+
+
+def read_changes_file(path: str) -> dict:
+    """Holdings changes from a JSON object (name → amount) or a ``name,amount`` CSV/text file."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".json"):
+        return parse_assignments(f"{key}={value}" for key, value in json.loads(text).items())
+    lines = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+    return parse_assignments(line.replace(",", "=", 1) if "=" not in line else line for line in lines)
+
+
+def apply_changes(changes: dict, path: str = ASSETS_FILE, effective: str = None) -> dict:
+    """Record ``changes`` in the holdings ledger (from ``effective`` on, default now). Returns the latest holdings."""
+    unknown = [name for name in changes if name not in default_assets]
+    if unknown:
+        print(f"⚠️ Not in the default holdings (kept anyway): {unknown}")
+    load_assets(path)
+    ledger = HoldingsLedger(path)
+    written = ledger.record(changes, effective)
+    print(f"Assets updated successfully ({len(written)} changed)." if written else "No changes made.")
+    return ledger.latest()
+
+
+def interactive(path: str = ASSETS_FILE) -> dict:
+    """Interactive update of the holdings. Returns the (possibly updated) holdings."""
+    user_assets = load_assets(path)
+    before = dict(user_assets)
+    if prompt_changes(user_assets):
+        return apply_changes({k: v for k, v in user_assets.items() if before.get(k) != v}, path)
+    return user_assets
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(
+        description="Update the user's holdings. Without arguments the changes are asked for interactively.")
+    parser.add_argument("changes", nargs="*", metavar="NAME=AMOUNT",
+                        help=f"new amounts, e.g. usd=100 rial=5000000 (names: {', '.join(asset_map)} or Persian)")
+    parser.add_argument("--from-file", help="JSON object or NAME,AMOUNT lines with the new amounts")
+    parser.add_argument("--at", dest="effective", default=None,
+                        help="when the change took effect (%%Y-%%m-%%d %%H:%%M:%%S, default now)")
+    parser.add_argument("--assets", default=ASSETS_FILE)
+    args = parser.parse_args(argv)
+
+    if not args.changes and not args.from_file:
+        return interactive(args.assets)
+    try:
+        if args.effective:
+            datetime.strptime(args.effective, "%Y-%m-%d %H:%M:%S")
+        changes = read_changes_file(args.from_file) if args.from_file else {}
+        changes.update(parse_assignments(args.changes))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    return apply_changes(changes, args.assets, args.effective)
+
+
+if __name__ == "__main__":
+    main()
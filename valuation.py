@@ -0,0 +1,180 @@
+import argparse
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+CASH = "ریال"  # held in toman, price 1
+DOLLAR = "دلار آمریکا"
+DOLLAR_SPREAD = 10_000  # added to the dollar price when converting totals, as in portfo.py
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+HOLDINGS_COLUMNS = ["portfolio", "subject", "amount", "effective"]
+EPOCH = pd.Timestamp("1970-01-01")
+
+
+@dataclass
+class PriceMatrix:
+    """
+    Price history in wide form: one row per snapshot time, one column per subject.
+
+    A subject missing from a snapshot keeps its previous price (forward fill);
+    before its first quote the price is NaN.
+    """
+    times: np.ndarray  # datetime64[ns], ascending
+    subjects: List[str]
+    values: np.ndarray  # float64, len(times) x len(subjects)
+
+    def column(self, subject: str) -> np.ndarray:
+        return self.values[:, self.subjects.index(subject)]
+
+
+def load_price_history(csv_path: str = "prices_history.csv", start=None, end=None,
+                       resolution: str = "raw") -> pd.DataFrame:
+    """
+    Price history as ``subject, buy_price, sell_price, date`` with numeric prices and datetime dates.
+
+    By default every raw snapshot in ``[start, end]`` (default: all of it)
+    is returned; periods already compacted into OHLC tiers contribute the
+    closes of the finest bars left. ``resolution`` ``"minute"`` / ``"hour"`` / ``"day"``
+    returns the close of each bar instead (see ``price_tiers.load_history``).
+    """
+    from price_tiers import load_history
+    return load_history(csv_path, start, end, resolution)
+
+
+def price_matrix(prices: pd.DataFrame, side: str = "sell") -> PriceMatrix:
+    """Pivot a long price history (``load_price_history``) into a ``PriceMatrix`` of buy or sell prices."""
+    wide = prices.pivot_table(index="date", columns="subject", values=f"{side}_price",
+                              aggfunc="last", observed=True).sort_index().ffill()
+    return PriceMatrix(times=wide.index.values.astype("datetime64[ns]"), subjects=[str(c) for c in wide.columns],
+                       values=wide.to_numpy(dtype="float64"))
+
+
+def holdings_from_assets(assets: Dict[str, float], portfolio: str = "default",
+                         effective=EPOCH) -> pd.DataFrame:
+    """Holdings frame for one ``user_assets.json``-style dict, valid from ``effective`` on."""
+    return pd.DataFrame({"portfolio": portfolio, "subject": list(assets), "amount": list(assets.values()),
+                         "effective": pd.Timestamp(effective)}, columns=HOLDINGS_COLUMNS)
+
+
+def load_holdings(path: str) -> pd.DataFrame:
+    """
+    Read holdings from ``user_assets.json`` or a CSV with ``HOLDINGS_COLUMNS``.
+
+    In the CSV each row sets a portfolio's amount of one subject from
+    ``effective`` on; amounts not mentioned in a later change carry over.
+    For ``user_assets.json`` the full history in its holdings ledger is used
+    when there is one, otherwise the current holdings count for all time.
+    """
+    if path.endswith(".json"):
+        from holdings_ledger import HoldingsLedger, ledger_path_for
+        if os.path.exists(ledger_path_for(path)):
+            return HoldingsLedger(path).to_frame()[HOLDINGS_COLUMNS]
+        with open(path, "r", encoding="utf-8") as f:
+            return holdings_from_assets(json.load(f))
+    df = pd.read_csv(path, dtype={"portfolio": str, "subject": str})
+    df["effective"] = pd.to_datetime(df["effective"])
+    return df[HOLDINGS_COLUMNS]
+
+
+@metrics.timed("valuation.revalue")
+def revalue(holdings: pd.DataFrame, prices: PriceMatrix, dollar_subject: str = DOLLAR) -> pd.DataFrame:
+    """
+    Value every portfolio at every price snapshot.
+
+    ``holdings`` has ``HOLDINGS_COLUMNS`` (amounts set from ``effective`` on).
+    Holdings are joined onto the snapshot times as-of (the newest change at
+    or before each snapshot, via ``searchsorted``) and multiplied with the
+    price matrix row by row, so a portfolio costs a few array operations
+    however long the history is. Snapshots before a portfolio's first
+    holdings, or where a held subject has no price yet, are left out.
+
+    Returns ``portfolio, datetime, total_toman, total_dollar, cash_toman``
+    — the ``portfolio_summary`` record format plus the portfolio name.
+    """
+    subjects = list(prices.subjects)
+    extra = [s for s in holdings["subject"].unique() if s not in subjects and s != CASH]
+    if extra:
+        logging.warning(f"⚠️ No prices for {extra}; snapshots holding them are skipped")
+    columns = subjects + extra + [CASH]
+    price_values = np.column_stack([prices.values, np.full((len(prices.times), len(extra)), np.nan),
+                                    np.ones(len(prices.times))])
+    dollar = prices.column(dollar_subject) if dollar_subject in subjects else np.full(len(prices.times), np.nan)
+
+    # One row per (portfolio, change time); amounts carried forward per subject.
+    wide = (holdings.pivot_table(index=["portfolio", "effective"], columns="subject", values="amount", aggfunc="last")
+            .reindex(columns=columns)
+            .groupby(level="portfolio").ffill()
+            .fillna(0.0))
+    portfolios = wide.index.get_level_values("portfolio").to_numpy()
+    effective = wide.index.get_level_values("effective").values.astype("datetime64[ns]")
+    amounts = wide.to_numpy(dtype="float64")
+    bounds = np.flatnonzero(np.r_[True, portfolios[1:] != portfolios[:-1], True])
+
+    # Portfolio and datetime are returned as categoricals: millions of rows share a few thousand labels.
+    stamps = pd.DatetimeIndex(prices.times).strftime(DATE_FORMAT)
+    names = pd.unique(portfolios)
+    parts = {"portfolio": [], "datetime": [], "total_toman": [], "total_dollar": [], "cash_toman": []}
+    for code, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        # As-of join: index of the newest holdings row at or before each snapshot.
+        idx = np.searchsorted(effective[start:end], prices.times, side="right") - 1
+        rows = np.flatnonzero(idx >= 0)
+        held = amounts[start + idx[rows]]
+        total = np.where(held != 0, held * price_values[rows], 0.0).sum(axis=1)
+        ok = np.isfinite(total)
+        rows, held, total_toman = rows[ok], held[ok], np.trunc(total[ok])
+        parts["portfolio"].append(np.full(len(rows), code, dtype=np.int32))
+        parts["datetime"].append(rows.astype(np.int32))
+        parts["total_toman"].append(total_toman.astype("int64"))
+        parts["total_dollar"].append(np.round(total_toman / (dollar[rows] + DOLLAR_SPREAD), 2))
+        parts["cash_toman"].append(held[:, -1])
+    if not parts["portfolio"]:
+        return pd.DataFrame(columns=list(parts))
+    columns = {name: np.concatenate(arrays) for name, arrays in parts.items()}
+    metrics.count("valuations", len(columns["portfolio"]))
+    columns["portfolio"] = pd.Categorical.from_codes(columns["portfolio"], categories=names)
+    columns["datetime"] = pd.Categorical.from_codes(columns["datetime"], categories=stamps)
+    return pd.DataFrame(columns)
+
+
+def value_snapshot(holdings: Dict[str, float], prices: Dict[str, float]) -> float:
+    """Value of ``holdings`` at one set of prices (``{subject: price}``); subjects without a price count as 0."""
+    names = list(holdings)
+    amounts = np.array([holdings[n] for n in names], dtype="float64")
+    quotes = np.array([1.0 if n == CASH else prices.get(n, 0) for n in names], dtype="float64")
+    return float(amounts @ quotes)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Revalue portfolios against the full price history.")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--holdings", default="user_assets.json",
+                        help="user_assets.json or a CSV with portfolio,subject,amount,effective")
+    parser.add_argument("--prices", default="prices_history.csv")
+    parser.add_argument("--output", default="portfolio_backfill.csv")
+    parser.add_argument("--start", help="first snapshot to value, 'YYYY-MM-DD[ HH:MM:SS]' (default: oldest)")
+    parser.add_argument("--end", help="last snapshot to value (default: newest)")
+    parser.add_argument("--resolution", choices=["raw", "minute", "hour", "day"], default="raw",
+                        help="value every raw snapshot (default) or the close of each minute/hour/day bar")
+    args = parser.parse_args(argv)
+
+    from price_tiers import parse_time
+    prices = price_matrix(load_price_history(args.prices, parse_time(args.start), parse_time(args.end),
+                                             args.resolution), side="sell")
+    result = revalue(load_holdings(args.holdings), prices)
+    tmp_path = args.output + ".tmp"
+    result.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, args.output)
+    logging.info(f"✅ Wrote {len(result):,} valuations of {result['portfolio'].nunique()} portfolios "
+                 f"over {len(prices.times):,} snapshots to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.shapes import Drawing, Group, Line, String
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from chart_specs import FORMATTERS, ChartSpec, plan_charts
+from rollups import Rollups
+
+FONT = "Helvetica"
+
+
+def _value_format(spec: ChartSpec):
+    if spec.formatter:
+        formatter = FORMATTERS[spec.formatter]
+        return lambda x: formatter(x, None)
+    return lambda x: f"{x:,.0f}"
+
+
+def chart_drawing(spec: ChartSpec, series: pd.Series, latest_month, width: float, height: float) -> Drawing:
+    """
+    Draw one chart of ``CHART_SPECS`` as ReportLab vector graphics of ``width x height`` points.
+
+    Same bars, colours, titles and axis formatting as ``charts.render_chart``,
+    but nothing is rasterised: the PDF stores a few hundred drawing operators
+    instead of an image.
+    """
+    # Font sizes follow the drawing so small grid cells stay readable
+    base = max(4.0, min(9.0, height / 22))
+    d = Drawing(width, height)
+    d.add(String(width / 2, height - base * 1.4, spec.title.format(month=latest_month),
+                 fontName=FONT, fontSize=base * 1.2, textAnchor="middle"))
+
+    labels = [str(i) for i in series.index]
+    label_size = base * 0.9
+    label_w = max((stringWidth(x, FONT, label_size) for x in labels), default=0)
+    plot_w = max(1.0, width - base * 10)
+    # Vertical tick labels when asked for or when they would overlap (pandas rotates them too)
+    rotate = spec.rotate_xticks or label_w > plot_w / max(1, len(labels)) * 0.9
+    label_space = label_w + base if rotate else base * 2
+
+    bc = VerticalBarChart()
+    bc.x = base * 9
+    bc.y = label_space + base * 1.6
+    bc.width = plot_w
+    bc.height = max(1.0, height - bc.y - base * 2.6)
+    bc.data = [[float(v) for v in series]]
+    bc.strokeColor = None
+    bc.barSpacing = 0
+    bc.groupSpacing = bc.width / max(1, len(labels)) * 0.2
+    bc.bars.strokeColor = None
+    if spec.color:
+        bc.bars[0].fillColor = colors.toColor(spec.color)
+    else:
+        for i, val in enumerate(series):
+            bc.bars[(0, i)].fillColor = colors.green if val >= 0 else colors.red
+
+    bc.valueAxis.labelTextFormat = _value_format(spec)
+    bc.valueAxis.labels.fontName = FONT
+    bc.valueAxis.labels.fontSize = base
+    bc.valueAxis.visibleGrid = True
+    bc.valueAxis.gridStrokeColor = colors.lightgrey
+    bc.valueAxis.gridStrokeWidth = 0.3
+    bc.valueAxis.strokeWidth = 0.5
+    if bc.data[0] and min(bc.data[0]) >= 0:
+        bc.valueAxis.valueMin = 0
+
+    bc.categoryAxis.categoryNames = labels
+    bc.categoryAxis.labels.fontName = FONT
+    bc.categoryAxis.labels.fontSize = label_size
+    bc.categoryAxis.strokeWidth = 0.5
+    if rotate:
+        bc.categoryAxis.labels.angle = 90
+        bc.categoryAxis.labels.boxAnchor = "e"
+        bc.categoryAxis.labels.dy = -base * 0.3
+    else:
+        bc.categoryAxis.labels.boxAnchor = "n"
+    # Keep the category axis at the bottom, like matplotlib; the zero line is drawn separately.
+    bc.categoryAxis.joinAxisMode = "bottom"
+    d.add(bc)
+
+    if spec.zero_line:
+        bc.valueAxis.setPosition(bc.x, bc.y, bc.height)
+        bc.valueAxis.configure(bc.data)
+        y0 = bc.valueAxis.scale(0)
+        if bc.y <= y0 <= bc.y + bc.height:
+            d.add(Line(bc.x, y0, bc.x + bc.width, y0, strokeColor=colors.black,
+                       strokeWidth=0.6, strokeDashArray=[3, 2]))
+
+    d.add(String(bc.x + bc.width / 2, base * 0.4, spec.xlabel, fontName=FONT, fontSize=base, textAnchor="middle"))
+    ylabel = Group(String(0, 0, spec.ylabel, fontName=FONT, fontSize=base, textAnchor="middle"))
+    ylabel.translate(base, bc.y + bc.height / 2)
+    ylabel.rotate(90)
+    d.add(ylabel)
+    return d
+
+
+def plan_vector_charts(rollup: Rollups, categories: Optional[List[str]] = None
+                       ) -> Tuple[Optional[pd.Period], Dict[str, List[Tuple[ChartSpec, pd.Series]]]]:
+    """Group the non-empty charts by category (the report's folders), in ``CHART_SPECS`` order."""
+    if not rollup.levels["day"]:
+        return None, {}
+    latest_month = pd.Period(rollup.latest_datetime[:7], freq="M")
+    by_category: Dict[str, List[Tuple[ChartSpec, pd.Series]]] = {}
+    for spec, series in plan_charts(rollup, categories):
+        by_category.setdefault(spec.category, []).append((spec, series))
+    return latest_month, dict(sorted(by_category.items()))